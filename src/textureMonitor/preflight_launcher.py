@@ -0,0 +1,25 @@
+"""
+Headless pre-flight check of the textures of a scene, see script/preflight.py
+
+usage:
+    katana --script preflight_launcher.py <scene.katana> [--engine Arnold] [--no-retex] [--allow-unbaked]
+                                                          [--report report.json]
+
+Python 2.7 only
+Katana script, tested on 3.6v4
+"""
+import os
+import sys
+
+# make the textureMonitor package importable whatever the location Katana is launched from
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from textureMonitor.script import preflight
+except Exception:
+    # exit 1 would be read as missing textures, 3 is PreflightStatus.error
+    import traceback
+    traceback.print_exc()
+    sys.exit(3)
+
+sys.exit(preflight.main(sys.argv[1:]))
@@ -2,7 +2,10 @@
 
 """
 
-from .ui import TextureMonitorUI
+try:
+    from .ui import TextureMonitorUI
+except ImportError:  # Katana launched in script mode, only the headless features (ex: preflight) can be used
+    TextureMonitorUI = None
 from .constants import VERSION
 
 
@@ -0,0 +1,296 @@
+"""
+Thread budget of the bake: the texture processors are multi-threaded themselves, running several of them in
+parallel each using all the cores oversubscribe the host and is slower than baking one file at a time.
+
+The cores of the host are a budget shared by the bake workers: each processor invocation is given a thread count
+(from the size of the file baked) and reserve that many cores before running. Small files are baked in parallel with
+one thread each, big files get more threads and run with less concurrency.
+
+A calibration measure the bake throughput for several concurrency levels on the current host and store the optimum
+in a json file, used afterward to choose the thread count given to the biggest files.
+
+All python version
+All OS
+"""
+
+import os
+import json
+import time
+import socket
+import logging
+import threading
+import multiprocessing
+
+try:
+    from queue import Queue, Empty
+except ImportError:  # python 2
+    from Queue import Queue, Empty
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MEGABYTE = 1024 * 1024
+
+
+def get_core_count(cores=0):
+    """
+    Args:
+        cores(int): number of cores requested, 0 or less to use all the cores of the host
+
+    Returns:
+        int: number of cores available for the bake
+    """
+    try:
+        host_cores = multiprocessing.cpu_count()
+    except NotImplementedError:
+        host_cores = 1
+    if cores and cores > 0:
+        return min(cores, host_cores)
+    return host_cores
+
+
+class CoreBudget(object):
+    """
+    Cores shared between the bake workers, a worker reserve the threads of its job before running it.
+    """
+
+    def __init__(self, cores):
+        """
+        Args:
+            cores(int): total number of cores in the budget
+        """
+        self.cores = max(1, cores)
+        self._available = self.cores
+        self._condition = threading.Condition()
+
+    @property
+    def available(self):
+        return self._available
+
+    def acquire(self, threads):
+        """ Block until the given number of cores is available and reserve them.
+
+        Args:
+            threads(int): a job can't reserve more than the total budget
+
+        Returns:
+            int: number of cores reserved, to give back to release()
+        """
+        threads = max(1, min(threads, self.cores))
+        with self._condition:
+            while self._available < threads:
+                self._condition.wait()
+            self._available -= threads
+        return threads
+
+    def release(self, threads):
+        with self._condition:
+            self._available = min(self.cores, self._available + threads)
+            self._condition.notify_all()
+
+
+class ThreadPolicy(object):
+    """
+    Decide the thread count of each processor invocation and the number of bake workers from the files sizes.
+    """
+
+    def __init__(self, cores, supports_thread_count=True, small_file_size=16 * MEGABYTE,
+                 large_file_size=256 * MEGABYTE, calibration=None):
+        """
+        Args:
+            cores(int): total number of cores in the budget
+            supports_thread_count(bool): False if the processor has no thread count option, each job then use
+                cores/concurrency threads, concurrency being 1 without calibration
+            small_file_size(int): files up to this size in bytes are baked with one thread
+            large_file_size(int): files from this size in bytes are baked with the maximum threads per job
+            calibration(dict or None): see calibrate()
+        """
+        self.cores = max(1, cores)
+        self.supports_thread_count = supports_thread_count
+        self.small_file_size = small_file_size
+        self.large_file_size = max(large_file_size, small_file_size + 1)
+
+        self.max_job_threads = self.cores
+        if calibration and calibration.get("cores") == self.cores:
+            self.max_job_threads = max(1, calibration["job_threads"])
+        elif calibration:
+            # calibrated with an other budget, keep the same ratio
+            self.max_job_threads = max(1, self.cores * calibration["job_threads"] // max(1, calibration["cores"]))
+
+    def __repr__(self):
+        return "ThreadPolicy(cores={}, max_job_threads={}, supports_thread_count={})".format(
+            self.cores, self.max_job_threads, self.supports_thread_count)
+
+    def get_job_threads(self, file_size):
+        """
+        Args:
+            file_size(int): size in bytes of the file to bake
+
+        Returns:
+            int: number of threads given to the processor for this file
+        """
+        if not self.supports_thread_count:
+            return self.max_job_threads
+        if file_size <= self.small_file_size:
+            return 1
+        if file_size >= self.large_file_size:
+            return self.max_job_threads
+        ratio = float(file_size - self.small_file_size) / (self.large_file_size - self.small_file_size)
+        return max(1, int(round(1 + ratio * (self.max_job_threads - 1))))
+
+    def get_worker_count(self, file_sizes):
+        """ Number of jobs that can run at the same time: the budget divided by the threads of a median file.
+        The budget still prevent a worker to start a job if there is not enough cores left.
+
+        Args:
+            file_sizes(list of int): sizes in bytes of the files to bake
+
+        Returns:
+            int:
+        """
+        if not file_sizes:
+            return 1
+        median_size = sorted(file_sizes)[len(file_sizes) // 2]
+        workers = self.cores // self.get_job_threads(median_size)
+        return max(1, min(workers, len(file_sizes)))
+
+
+def get_file_size(file_path):
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+def run_jobs(file_paths, bake_function, policy, budget=None, abort_function=None):
+    """ Bake the given files with policy.get_worker_count() threads sharing the core budget.
+    The files are started in the given order.
+
+    Args:
+        file_paths(list of str):
+        bake_function(function): take (file path, thread count), called from the worker threads
+        policy(ThreadPolicy):
+        budget(CoreBudget or None): created from the policy if not specified
+        abort_function(function or None): return True to stop starting new jobs
+    """
+    file_sizes = dict((file_path, get_file_size(file_path)) for file_path in file_paths)
+    budget = budget or CoreBudget(policy.cores)
+    worker_count = policy.get_worker_count(list(file_sizes.values()))
+
+    jobs = Queue()
+    for file_path in file_paths:
+        jobs.put(file_path)
+
+    def worker():
+        while not (abort_function and abort_function()):
+            try:
+                file_path = jobs.get_nowait()
+            except Empty:
+                return
+            threads = budget.acquire(policy.get_job_threads(file_sizes[file_path]))
+            try:
+                bake_function(file_path, threads)
+            finally:
+                budget.release(threads)
+
+    logger.info("[run_jobs] {} files with {} workers, {}".format(len(file_paths), worker_count, policy))
+    if worker_count == 1:
+        worker()
+        return
+    workers = [threading.Thread(target=worker) for _ in range(worker_count)]
+    for worker_thread in workers:
+        worker_thread.daemon = True
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+
+
+def get_concurrency_levels(cores):
+    """
+    Returns:
+        list of int: 1, 2, 4 ... up to the number of cores
+    """
+    levels = []
+    level = 1
+    while level < cores:
+        levels.append(level)
+        level *= 2
+    levels.append(cores)
+    return levels
+
+
+def calibrate(file_paths, bake_function, cores, concurrency_levels=None):
+    """ Bake the given sample files with an increasing number of concurrent jobs, each job using cores/concurrency
+    threads, and return the concurrency with the best throughput.
+
+    Args:
+        file_paths(list of str): sample files, ideally of a representative size, baked once per concurrency level
+        bake_function(function): take (file path, thread count)
+        cores(int): total number of cores in the budget
+        concurrency_levels(list of int or None): default to get_concurrency_levels()
+
+    Returns:
+        dict: {"cores", "concurrency", "job_threads", "throughput" (MB/s), "measures": {concurrency: MB/s},
+            "date"}
+    """
+    total_size = sum(get_file_size(file_path) for file_path in file_paths)
+    measures = {}
+    for concurrency in concurrency_levels or get_concurrency_levels(cores):
+        job_threads = max(1, cores // concurrency)
+        policy = ThreadPolicy(cores, supports_thread_count=False,
+                              calibration={"cores": cores, "job_threads": job_threads})
+        start_time = time.time()
+        run_jobs(file_paths, bake_function, policy)
+        duration = max(time.time() - start_time, 1e-6)
+        measures[concurrency] = total_size / float(MEGABYTE) / duration
+        logger.info("[calibrate] concurrency {} x {} threads: {:.1f} MB/s".format(concurrency, job_threads,
+                                                                                measures[concurrency]))
+
+    best_concurrency = max(measures, key=lambda level: measures[level])
+    return {"cores": cores,
+            "concurrency": best_concurrency,
+            "job_threads": max(1, cores // best_concurrency),
+            "throughput": measures[best_concurrency],
+            "measures": dict((str(level), value) for level, value in measures.items()),
+            "date": time.time()}
+
+
+def get_calibration_key(render_engine_name):
+    """ A calibration is only valid for one host and one processor
+    """
+    return "{}:{}".format(socket.gethostname(), render_engine_name)
+
+
+def load_calibration(calibration_path, render_engine_name):
+    """
+    Returns:
+        dict or None: see calibrate(), None if the current host has not been calibrated for this render engine
+    """
+    if not calibration_path or not os.path.exists(calibration_path):
+        return None
+    try:
+        with open(calibration_path, "r") as jsonfile:
+            calibrations = json.load(jsonfile)
+    except (IOError, OSError, ValueError) as excp:
+        logger.warning("[load_calibration] Cannot read {}: {}".format(calibration_path, excp))
+        return None
+    return calibrations.get(get_calibration_key(render_engine_name))
+
+
+def save_calibration(calibration_path, render_engine_name, calibration):
+    """ Store the calibration of the current host, the calibrations of the other hosts are kept.
+    """
+    calibrations = {}
+    if os.path.exists(calibration_path):
+        try:
+            with open(calibration_path, "r") as jsonfile:
+                calibrations = json.load(jsonfile)
+        except (IOError, OSError, ValueError):
+            logger.warning("[save_calibration] {} is not readable, overwritten".format(calibration_path))
+
+    calibrations[get_calibration_key(render_engine_name)] = calibration
+    calibration_dir = os.path.dirname(calibration_path)
+    if calibration_dir and not os.path.exists(calibration_dir):
+        os.makedirs(calibration_dir)
+    with open(calibration_path, "w") as jsonfile:
+        json.dump(calibrations, jsonfile, indent=2)
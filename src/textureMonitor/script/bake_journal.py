@@ -0,0 +1,348 @@
+"""
+Bake journal: a small append-only log of a bake session, so a session interrupted by a crash or an abort can be
+resumed with only the files remaining to bake.
+
+The journal is a json-lines file, one per render engine:
+    {"event": "plan", "render_engine": "Arnold", "files": [...], "created": 1600000000.0}
+    {"event": "start", "file": source path, "output": render engine texture path}
+    {"event": "done", "file": source path, "output": render engine texture path}
+    {"event": "failed", "file": source path}
+The journal is deleted when the session complete without being aborted. It is locked while its session is running
+so the monitors of the other Katana sessions don't offer to resume a bake which is not interrupted.
+
+Each line is flushed to disk as soon as it is written: a crash can only lose the line being written, which is then
+ignored when reading.
+
+All python version
+All OS
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+JOURNAL_EXT = ".journal.jsonl"
+# byte locked on Windows, far after the content so the journal can still be read by the other processes
+_LOCK_OFFSET = 0x7FFFFFFF
+
+
+class JournalEvent:
+    """
+    Type of the journal lines
+    """
+    plan = "plan"
+    start = "start"
+    done = "done"
+    failed = "failed"
+
+
+def get_journal_path(journal_dir, render_engine_name):
+    """
+    Args:
+        journal_dir(str): directory where the journals are written
+        render_engine_name(str):
+
+    Returns:
+        str: path of the journal used for the given render engine
+    """
+    return os.path.join(journal_dir, render_engine_name + JOURNAL_EXT)
+
+
+def _lock_file(journal_file):
+    """ Take an exclusive lock on the opened journal, released by _unlock_file() or when the process dies.
+
+    Raises:
+        IOError or OSError: if the journal is already locked
+    """
+    if fcntl:
+        fcntl.flock(journal_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        position = journal_file.tell()
+        journal_file.seek(_LOCK_OFFSET)
+        try:
+            msvcrt.locking(journal_file.fileno(), msvcrt.LK_NBLCK, 1)
+        finally:
+            journal_file.seek(position)
+
+
+def _unlock_file(journal_file):
+    if fcntl:
+        fcntl.flock(journal_file.fileno(), fcntl.LOCK_UN)
+    else:
+        journal_file.seek(_LOCK_OFFSET)
+        msvcrt.locking(journal_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def is_journal_locked(journal_path):
+    """
+    Args:
+        journal_path(str):
+
+    Returns:
+        bool: True if the session of the journal is still running in an other process or monitor
+    """
+    if not os.path.exists(journal_path):
+        return False
+    try:
+        with open(journal_path, "a") as journal_file:
+            _lock_file(journal_file)
+            _unlock_file(journal_file)
+    except (IOError, OSError):
+        return True
+    return False
+
+
+class BakeJournal(object):
+    """
+    Write the events of a bake session to the journal file.
+    """
+
+    def __init__(self, journal_path):
+        """
+        Args:
+            journal_path(str): see get_journal_path()
+        """
+        self.journal_path = journal_path
+        self._file = None
+        self._lock = threading.Lock()  # the files can be baked in parallel
+
+    def _write(self, entry):
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def open(self, file_paths, render_engine_name):
+        """ Start a new session, any previous journal for this path is overwritten.
+        The journal stays locked until close().
+
+        Args:
+            file_paths(list of str): all the files the session is going to bake
+            render_engine_name(str):
+
+        Raises:
+            IOError: if the journal is locked by a session still running
+        """
+        journal_dir = os.path.dirname(self.journal_path)
+        if journal_dir and not os.path.exists(journal_dir):
+            os.makedirs(journal_dir)
+        # not truncated before being locked, it could be the journal of a running session
+        journal_file = open(self.journal_path, "a")
+        try:
+            _lock_file(journal_file)
+        except (IOError, OSError):
+            journal_file.close()
+            raise IOError("{} is used by a bake session still running".format(self.journal_path))
+        journal_file.seek(0)
+        journal_file.truncate()
+        self._file = journal_file
+        self._write({"event": JournalEvent.plan,
+                     "render_engine": render_engine_name,
+                     "files": list(file_paths),
+                     "created": time.time()})
+
+    def start(self, file_path, output_path):
+        """ Called before the file is baked, output_path might be a partial file if the session doesn't
+        record the file as done.
+        """
+        self._write({"event": JournalEvent.start, "file": file_path, "output": output_path})
+
+    def done(self, file_path, output_path):
+        self._write({"event": JournalEvent.done, "file": file_path, "output": output_path})
+
+    def failed(self, file_path):
+        self._write({"event": JournalEvent.failed, "file": file_path})
+
+    def close(self, completed):
+        """
+        Args:
+            completed(bool): True if the session baked all its files, the journal is then deleted.
+                False to keep it so the session can be resumed.
+        """
+        if self._file:
+            try:
+                _unlock_file(self._file)
+            except (IOError, OSError):
+                pass  # released by close() anyway
+            self._file.close()
+            self._file = None
+        if completed:
+            discard_journal(self.journal_path)
+
+
+class BakeSession(object):
+    """
+    State of an interrupted session, read from its journal.
+    """
+
+    def __init__(self, journal_path, render_engine_name, file_paths, created):
+        self.journal_path = journal_path
+        self.render_engine_name = render_engine_name
+        self.file_paths = file_paths  # full plan
+        self.created = created
+        self.completed = {}  # {file path: output path}
+        self.failed = set()
+        self.interrupted = {}  # {file path: output path} started but not completed
+        self.discarded = {}  # {file path: output path} outputs to delete before resuming, see discard_outputs()
+
+    def __repr__(self):
+        return "BakeSession({}, {}/{} completed)".format(self.render_engine_name, len(self.completed),
+                                                          len(self.file_paths))
+
+    @property
+    def remaining(self):
+        """
+        Returns:
+            list of str: files of the plan not baked yet, in the plan order. The failed files are included.
+        """
+        return [file_path for file_path in self.file_paths if file_path not in self.completed]
+
+
+def read_journal(journal_path):
+    """
+    Args:
+        journal_path(str):
+
+    Returns:
+        BakeSession or None: None if there is no journal or if it is not readable
+    """
+    if not os.path.exists(journal_path):
+        return None
+
+    session = None
+    with open(journal_path, "r") as journal_file:
+        for line in journal_file:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                logger.debug("[read_journal] Ignored truncated line in {}".format(journal_path))
+                continue
+
+            event = entry.get("event")
+            if event == JournalEvent.plan:
+                session = BakeSession(journal_path, entry["render_engine"], entry["files"], entry.get("created"))
+            elif session is None:
+                break  # a journal always start with the plan
+            elif event == JournalEvent.start:
+                session.interrupted[entry["file"]] = entry["output"]
+            elif event == JournalEvent.done:
+                session.interrupted.pop(entry["file"], None)
+                session.failed.discard(entry["file"])
+                session.completed[entry["file"]] = entry["output"]
+            elif event == JournalEvent.failed:
+                session.interrupted.pop(entry["file"], None)
+                session.failed.add(entry["file"])
+
+    if session is None:
+        logger.warning("[read_journal] No bake plan found in {}".format(journal_path))
+    return session
+
+
+def discard_journal(journal_path):
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+
+
+def get_resumable_session(journal_path, verify_output=None):
+    """ Read the journal of an interrupted session, nothing is modified on disk:
+        - outputs of the files interrupted while baking are partial and listed in session.discarded
+        - completed files whose output fail verify_output are baked again, their output is also listed in
+          session.discarded
+    The discarded outputs are only deleted by discard_outputs(), once the session is actually resumed.
+
+    Args:
+        journal_path(str):
+        verify_output(function or None): take (source path, output path) and return False if the output is not
+            valid. ex: a bake manifest verification.
+
+    Returns:
+        BakeSession or None: None if there is nothing to resume or if the session is still running
+    """
+    if is_journal_locked(journal_path):
+        logger.debug("[get_resumable_session] {} is used by a running session".format(journal_path))
+        return None
+    session = read_journal(journal_path)
+    if session is None:
+        return None
+
+    session.discarded = dict(session.interrupted)
+    if verify_output:
+        for file_path, output_path in list(session.completed.items()):
+            if not verify_output(file_path, output_path):
+                session.discarded[file_path] = output_path
+                del session.completed[file_path]
+
+    if not session.remaining:
+        return None
+    return session
+
+
+def discard_outputs(session):
+    """ Delete the partial or invalid outputs of a session before resuming it, see get_resumable_session().
+
+    Args:
+        session(BakeSession):
+    """
+    for output_path in session.discarded.values():
+        logger.info("[discard_outputs] Discarded partial output {}".format(output_path))
+        try:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+        except OSError as excp:
+            logger.warning("[discard_outputs] Cannot remove {}: {}".format(output_path, excp))
+    session.discarded = {}
+
+
+def list_journals(journal_dir):
+    """
+    Returns:
+        list of str: paths of the journals in the given directory
+    """
+    if not os.path.isdir(journal_dir):
+        return []
+    return sorted(os.path.join(journal_dir, filename) for filename in os.listdir(journal_dir)
+                  if filename.endswith(JOURNAL_EXT))
+
+
+def _main(argv):
+    """ Inspect or discard the journals from a shell, the bake itself need a render engine and is resumed from
+    Katana (interface or script mode, see render_engine.common.resume_bake_session()).
+
+    usage: bake_journal.py <journal directory> [--discard]
+    """
+    if not argv or argv[0] in ("-h", "--help"):
+        print(_main.__doc__)
+        return 1
+
+    journal_dir = argv[0]
+    for journal_path in list_journals(journal_dir):
+        if is_journal_locked(journal_path):
+            print("{}: running".format(journal_path))
+            continue
+        session = read_journal(journal_path)
+        if session is None:
+            continue
+        print("{}: {} files, {} completed, {} failed, {} interrupted".format(
+            journal_path, len(session.file_paths), len(session.completed), len(session.failed),
+            len(session.interrupted)))
+        if "--discard" in argv[1:]:
+            discard_journal(journal_path)
+            print("  discarded")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
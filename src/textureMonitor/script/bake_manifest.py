@@ -0,0 +1,212 @@
+"""
+Bake manifest: a small json file written for each baked render engine texture, describing the source and output
+files at bake time. It allows to cheaply verify a render engine texture on scan (stat only, no hashing):
+a truncated output or a source modified after the bake are detected without rebaking everything.
+
+Manifests are written next to the output file (<output>.manifest.json) or in a central store directory.
+
+All python version
+All OS
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+
+from .hashing import hash_file
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MANIFEST_VERSION = 1
+MANIFEST_EXT = ".manifest.json"
+
+
+class ManifestStatus:
+    """
+    Result of a manifest verification
+    """
+    valid = "valid"
+    missing = "missing"  # no manifest for this output (baked before manifests or by an other tool)
+    stale = "stale"  # the source texture changed since the bake
+    corrupt = "corrupt"  # the output doesn't match what was baked (truncated, replaced, deleted)
+
+
+class ManifestSettings(object):
+    """
+    How the manifests are stored and interpreted
+    """
+
+    def __init__(self, store=None, strict=False):
+        """
+        Args:
+            store(str or None): directory where all the manifests are written, None to write them next to the outputs
+            strict(bool): True to consider outputs without manifest as not baked
+        """
+        self.store = store
+        self.strict = strict
+
+
+def get_manifest_path(output_path, settings):
+    """
+    Args:
+        output_path(str): render engine texture path
+        settings(ManifestSettings):
+
+    Returns:
+        str: path of the manifest for the given output
+    """
+    if not settings.store:
+        return output_path + MANIFEST_EXT
+    # flat store, the output path is hashed to get a unique file name
+    path_hash = hashlib.sha1(os.path.normpath(output_path).encode("utf-8")).hexdigest()
+    return os.path.join(settings.store, path_hash[:2], path_hash + MANIFEST_EXT)
+
+
+def get_processor_fingerprint(processor_path):
+    """ Identify the texture processor install used, its file size and mtime change with every version.
+
+    Args:
+        processor_path(str or None):
+
+    Returns:
+        dict:
+    """
+    fingerprint = {"path": processor_path, "mtime": None, "size": None}
+    if processor_path and os.path.exists(processor_path):
+        processor_stat = os.stat(processor_path)
+        fingerprint["mtime"] = processor_stat.st_mtime
+        fingerprint["size"] = processor_stat.st_size
+    return fingerprint
+
+
+def _describe_file(file_path, file_hash=None):
+    file_stat = os.stat(file_path)
+    return {"path": file_path,
+            "mtime": file_stat.st_mtime,
+            "size": file_stat.st_size,
+            "hash": file_hash or hash_file(file_path)}
+
+
+def write_manifest(source_path, output_path, render_engine, settings, source_hash=None, output_hash=None):
+    """ Write the manifest describing the bake of source_path to output_path.
+
+    Args:
+        source_path(str): source texture path
+        output_path(str): baked render engine texture path
+        render_engine (module):module Representing a RenderEngine
+        settings(ManifestSettings):
+        source_hash(str or None): if already known, avoid to hash the source again
+        output_hash(str or None): if already known, avoid to hash the output again
+
+    Returns:
+        dict: manifest content
+    """
+    manifest = {"version": MANIFEST_VERSION,
+                "render_engine": render_engine.name,
+                "baked_at": time.time(),
+                "processor": get_processor_fingerprint(render_engine.re_textool),
+                "source": _describe_file(source_path, file_hash=source_hash),
+                "output": _describe_file(output_path, file_hash=output_hash)}
+
+    manifest_path = get_manifest_path(output_path, settings)
+    manifest_dir = os.path.dirname(manifest_path)
+    if manifest_dir and not os.path.exists(manifest_dir):
+        os.makedirs(manifest_dir)
+    with open(manifest_path, "w") as jsonfile:
+        json.dump(manifest, jsonfile, indent=2)
+
+    logger.debug("[write_manifest] {}".format(manifest_path))
+    return manifest
+
+
+def read_manifest(output_path, settings):
+    """
+    Returns:
+        dict or None: None if the manifest doesn't exists or is not readable
+    """
+    manifest_path = get_manifest_path(output_path, settings)
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, "r") as jsonfile:
+            return json.load(jsonfile)
+    except (IOError, OSError, ValueError) as excp:
+        logger.warning("[read_manifest] Cannot read {}: {}".format(manifest_path, excp))
+        return None
+
+
+def remove_manifest(output_path, settings):
+    """ Delete the manifest of the given output if it exists
+    """
+    manifest_path = get_manifest_path(output_path, settings)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+
+def verify_manifest(source_path, output_path, settings):
+    """ Cheap verification of a baked output against its manifest, only stat calls are made.
+
+    Args:
+        source_path(str): source texture path
+        output_path(str): render engine texture path
+        settings(ManifestSettings):
+
+    Returns:
+        str: ManifestStatus value, corrupt if the manifest is malformed
+    """
+    manifest = read_manifest(output_path, settings)
+    if manifest is None:
+        return ManifestStatus.missing
+
+    try:
+        output_size = manifest["output"]["size"]
+        source_size = manifest["source"]["size"]
+        source_mtime = manifest["source"]["mtime"]
+    except (KeyError, TypeError, ValueError) as excp:
+        logger.warning("[verify_manifest] Malformed manifest for {}: {!r}".format(output_path, excp))
+        return ManifestStatus.corrupt
+
+    try:
+        output_stat = os.stat(output_path)
+    except OSError:
+        return ManifestStatus.corrupt
+    if output_stat.st_size != output_size:
+        return ManifestStatus.corrupt
+
+    try:
+        source_stat = os.stat(source_path)
+    except OSError:
+        return ManifestStatus.stale
+    if source_stat.st_size != source_size or source_stat.st_mtime != source_mtime:
+        return ManifestStatus.stale
+
+    return ManifestStatus.valid
+
+
+def verify_manifest_content(output_path, settings):
+    """ Expensive verification: hash the output and compare it to the manifest.
+
+    Args:
+        output_path(str): render engine texture path
+        settings(ManifestSettings):
+
+    Returns:
+        str: ManifestStatus value, corrupt if the manifest is malformed
+    """
+    manifest = read_manifest(output_path, settings)
+    if manifest is None:
+        return ManifestStatus.missing
+    try:
+        output_hash = manifest["output"]["hash"]
+    except (KeyError, TypeError, ValueError) as excp:
+        logger.warning("[verify_manifest_content] Malformed manifest for {}: {!r}".format(output_path, excp))
+        return ManifestStatus.corrupt
+    try:
+        if hash_file(output_path) != output_hash:
+            return ManifestStatus.corrupt
+    except (IOError, OSError):
+        return ManifestStatus.corrupt
+    return ManifestStatus.valid
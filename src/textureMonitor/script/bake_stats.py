@@ -0,0 +1,208 @@
+"""
+Statistics of a bake session: per-job timing and bytes, rolling throughput, size-weighted ETA and a final summary
+appended to a bake history file (json-lines) that can be used for capacity planning.
+
+All python version
+All OS
+"""
+
+import os
+import json
+import time
+import socket
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MEGABYTE = 1024 * 1024
+
+
+def format_duration(seconds):
+    """
+    Returns:
+        str: "h:mm:ss" or "m:ss", "--:--" if seconds is None
+    """
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return "{}:{:02d}:{:02d}".format(hours, minutes, seconds)
+    return "{}:{:02d}".format(minutes, seconds)
+
+
+class JobTiming(object):
+    """
+    Result of one processor invocation
+    """
+    __slots__ = ("file_path", "size", "duration", "threads", "success", "end_time")
+
+    def __init__(self, file_path, size, duration, threads=None, success=True, end_time=None):
+        self.file_path = file_path
+        self.size = size  # bytes of the source texture
+        self.duration = duration  # seconds
+        self.threads = threads
+        self.success = success
+        self.end_time = end_time or time.time()
+
+    def to_dict(self):
+        return dict((attr, getattr(self, attr)) for attr in self.__slots__)
+
+
+class BakeStats(object):
+    """
+    Collect the JobTiming of a session. The throughput is computed over a rolling window so it follows the current
+    speed, and the ETA is weighted by the size of the files remaining instead of their count.
+    """
+
+    def __init__(self, file_sizes, render_engine_name=None, window=30.0):
+        """
+        Args:
+            file_sizes(dict): {file path: size in bytes} of all the files to bake
+            render_engine_name(str or None):
+            window(float): seconds of jobs used to compute the rolling throughput
+        """
+        self.file_sizes = file_sizes
+        self.render_engine_name = render_engine_name
+        self.window = window
+        self.start_time = time.time()
+        self.end_time = None
+        self.jobs = []
+        self._recent = deque()  # JobTiming finished in the window
+        self.bytes_done = 0
+
+    @property
+    def total_bytes(self):
+        return sum(self.file_sizes.values())
+
+    @property
+    def elapsed(self):
+        return (self.end_time or time.time()) - self.start_time
+
+    def add(self, job):
+        """
+        Args:
+            job(JobTiming):
+        """
+        self.jobs.append(job)
+        self._recent.append(job)
+        self.bytes_done += job.size
+        self._trim_window(job.end_time)
+
+    def _trim_window(self, now):
+        while len(self._recent) > 1 and now - self._recent[0].end_time > self.window:
+            self._recent.popleft()
+
+    def _window_duration(self, now):
+        """ The window start at the end of the oldest job it contains minus this job duration, so a window with a
+        single job still give a throughput.
+        """
+        if not self._recent:
+            return 0
+        oldest = self._recent[0]
+        return max(now - (oldest.end_time - oldest.duration), 1e-6)
+
+    def get_throughput(self):
+        """
+        Returns:
+            tuple: (MB/s, files/s) over the rolling window
+        """
+        now = time.time()
+        self._trim_window(now)
+        duration = self._window_duration(now)
+        if not duration:
+            return 0.0, 0.0
+        window_bytes = sum(job.size for job in self._recent)
+        return window_bytes / float(MEGABYTE) / duration, len(self._recent) / duration
+
+    def get_eta(self):
+        """
+        Returns:
+            float or None: seconds remaining estimated from the bytes remaining and the rolling throughput,
+                None until a job finished
+        """
+        mb_per_second = self.get_throughput()[0]
+        if not mb_per_second:
+            return None
+        remaining_bytes = max(0, self.total_bytes - self.bytes_done)
+        return remaining_bytes / float(MEGABYTE) / mb_per_second
+
+    def get_progress_text(self):
+        mb_per_second, files_per_second = self.get_throughput()
+        return "{}/{} files - {:.0f}/{:.0f} MB\n{:.1f} MB/s - {:.2f} files/s\nElapsed {} - ETA {}".format(
+            len(self.jobs), len(self.file_sizes), self.bytes_done / float(MEGABYTE),
+            self.total_bytes / float(MEGABYTE), mb_per_second, files_per_second, format_duration(self.elapsed),
+            format_duration(self.get_eta()))
+
+    def get_slowest(self, count=5):
+        """
+        Returns:
+            list of JobTiming: the jobs that took the most time
+        """
+        return sorted(self.jobs, key=lambda job: job.duration, reverse=True)[:count]
+
+    def finish(self):
+        self.end_time = time.time()
+
+    def get_summary(self, slowest_count=5):
+        """
+        Returns:
+            dict: json serializable summary of the session
+        """
+        elapsed = self.elapsed
+        return {"date": self.start_time,
+                "host": socket.gethostname(),
+                "render_engine": self.render_engine_name,
+                "files": len(self.jobs),
+                "files_planned": len(self.file_sizes),
+                "failed": len([job for job in self.jobs if not job.success]),
+                "bytes": self.bytes_done,
+                "elapsed": elapsed,
+                "mb_per_second": self.bytes_done / float(MEGABYTE) / elapsed if elapsed else 0.0,
+                "files_per_second": len(self.jobs) / elapsed if elapsed else 0.0,
+                "slowest": [job.to_dict() for job in self.get_slowest(slowest_count)]}
+
+    def get_summary_text(self, slowest_count=5):
+        summary = self.get_summary(slowest_count=slowest_count)
+        text = "{} files, {:.0f} MB in {} ({:.1f} MB/s, {:.2f} files/s)".format(
+            summary["files"], summary["bytes"] / float(MEGABYTE), format_duration(summary["elapsed"]),
+            summary["mb_per_second"], summary["files_per_second"])
+        if summary["slowest"]:
+            text += "\nSlowest files:"
+        for job in summary["slowest"]:
+            text += "\n  {} ({:.0f} MB): {}".format(format_duration(job["duration"]),
+                                                     job["size"] / float(MEGABYTE), job["file_path"])
+        return text
+
+
+def append_history(history_path, summary):
+    """ Append the summary of a session to the bake history (one json per line).
+
+    Args:
+        history_path(str):
+        summary(dict): see BakeStats.get_summary()
+    """
+    history_dir = os.path.dirname(history_path)
+    if history_dir and not os.path.exists(history_dir):
+        os.makedirs(history_dir)
+    with open(history_path, "a") as history_file:
+        history_file.write(json.dumps(summary) + "\n")
+
+
+def read_history(history_path):
+    """
+    Returns:
+        list of dict: the sessions summaries, oldest first
+    """
+    if not os.path.exists(history_path):
+        return []
+    history = []
+    with open(history_path, "r") as history_file:
+        for line in history_file:
+            try:
+                history.append(json.loads(line))
+            except ValueError:
+                continue
+    return history
@@ -10,9 +10,16 @@ import os
 import json
 import logging
 
-from UI4.App import MainWindow
+try:
+    from UI4.App import MainWindow
+except ImportError:  # Katana launched in script mode (ex: preflight check), there is no interface
+    MainWindow = None
 
 from . import render_engine
+from .locking import LockedRules
+from .bake_manifest import ManifestSettings
+from .stat_service import StatService
+from .shared_index import SharedIndex
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -20,9 +27,11 @@ logger.setLevel(logging.DEBUG)
 VERSION = "1.0.0"
 APPNAME = "Texture Monitor"
 
-KATANA_MAIN_WIND = MainWindow.GetMainWindow()  # UI4.App.MainWindow.KatanaWindow
+KATANA_MAIN_WIND = MainWindow.GetMainWindow() if MainWindow else None  # UI4.App.MainWindow.KatanaWindow
 INSTALL_PATH = os.path.dirname(__file__)  # return a folder path
 RESOURCES_LOCATION = os.path.normpath(os.path.join(INSTALL_PATH, '..', 'resources'))
+# folder where the tool can write its caches/logs for the current user
+USER_DATA_LOCATION = os.path.join(os.path.expanduser("~"), ".textureMonitor")
 
 """ ---------------------
 User settings loading """
@@ -39,12 +48,90 @@ else:
 
 # determine which render engine to use in the script, this must be a module located in ./render_engine
 RENDER_ENGINE = eval("render_engine.{}".format(user_settings.get("default_render_engine"), "Delight"))
-# List of filepaths that when used in an Item will make it lock to the user (qitem.setFlags(QtCore.Qt.NoItemFlags))
-LOCKED_LIST = user_settings.get("locked_paths", [])
+# render engines scanned together in one pass of the node graph, switching between them in the interface is then only
+# a view change instead of a rescan. Leave empty to only scan the current render engine.
+COMBINED_SCAN_ENGINES = user_settings.get("combined_scan_engines", [])
+# Rules (file paths, directory prefixes ending with a separator or glob patterns) that when matching an Item path will
+# make it lock to the user (qitem.setFlags(QtCore.Qt.NoItemFlags)). Use `path in LOCKED_RULES` to test a path.
+LOCKED_RULES = LockedRules(user_settings.get("locked_paths", []))
 # this will enable/disable the render-egine texture specific features including icons.
 ENABLE_RETEX = user_settings.get("enable_retex", True)
 # interface width in pixels
 UI_WIDTH = user_settings.get("default_ui_width", 1200)
+# read the textures headers to flag the untiled/unmipped ones and bake them first. Off by default as every header
+# is read on the interface thread at each scan
+VALIDATE_TEXTURE_HEADERS = user_settings.get("validate_texture_headers", False)
+# tiles bigger than this (in pixels) are flagged as oversized
+MAX_TILE_SIZE = user_settings.get("max_tile_size", 128)
+# hash the textures content to find the identical ones, they are then baked only once
+FIND_DUPLICATES = user_settings.get("find_duplicates", False)
+# frame range [start, end] used to evaluate the path parameters driven by an expression. Leave empty to disable
+EXPRESSION_FRAME_RANGE = user_settings.get("expression_frame_range", [])
+EXPRESSION_FRAME_STEP = user_settings.get("expression_frame_step", 1)
+# list of {graph state variable name: value} applied in turn when evaluating the expressions
+EXPRESSION_GRAPH_STATES = user_settings.get("expression_graph_states", [])
+# maximum number of evaluated values kept in cache per path parameter
+EXPRESSION_CACHE_SIZE = user_settings.get("expression_cache_size", 256)
+# watch the textures directories to update the interface when files are created/deleted/modified outside the tool
+ENABLE_WATCHER = user_settings.get("enable_watcher", False)
+# "auto" (inotify if available else polling), "inotify" or "polling". Polling is needed to see changes made by other
+# hosts on network filesystems
+WATCHER_BACKEND = user_settings.get("watcher_backend", "auto")
+WATCHER_POLL_INTERVAL = user_settings.get("watcher_poll_interval", 5.0)  # seconds
+WATCHER_COALESCE_DELAY = user_settings.get("watcher_coalesce_delay", 0.5)  # seconds
+# write a manifest for each baked render engine texture and verify the existing ones against it
+_bake_manifest = user_settings.get("bake_manifest", True)
+# BAKE_MANIFEST is None when disabled. Manifests are written next to the outputs unless a store directory is set.
+# In strict mode render engine textures without manifest are considered not baked.
+BAKE_MANIFEST = ManifestSettings(store=user_settings.get("bake_manifest_store") or None,
+                                 strict=user_settings.get("bake_manifest_strict", False)) if _bake_manifest else None
+# bake preset used for all the render engines (see BAKE_PRESETS in the render engine modules) and options overriding
+# it per render engine: {render engine name: {option name: value}}
+BAKE_PRESET = user_settings.get("bake_preset", "default")
+BAKE_OPTIONS = user_settings.get("bake_options", {})
+# bake several files in parallel, the cores are shared between the texture processors: small files are baked with one
+# thread each, big ones with more threads (up to the calibrated optimum) and less concurrency
+BAKE_PARALLEL = user_settings.get("bake_parallel", True)
+BAKE_CORES = user_settings.get("bake_cores", 0)  # 0 to use all the cores of the host
+BAKE_SMALL_FILE_SIZE = user_settings.get("bake_small_file_size", 16) * 1024 * 1024  # MB in settings
+BAKE_LARGE_FILE_SIZE = user_settings.get("bake_large_file_size", 256) * 1024 * 1024  # MB in settings
+# json file storing the optimum concurrency measured per host and render engine
+BAKE_CALIBRATION_PATH = user_settings.get("bake_calibration_path") or os.path.join(USER_DATA_LOCATION,
+                                                                                   "bake_calibration.json")
+# a file failing with a transient error (ex: stale NFS file handle) is baked again up to this number of attempts,
+# waiting bake_retry_delay seconds before the first retry, doubled after each retry
+BAKE_RETRY_ATTEMPTS = user_settings.get("bake_retry_attempts", 3)
+BAKE_RETRY_DELAY = user_settings.get("bake_retry_delay", 2.0)
+# json-lines file where the summary of each bake session (throughput, slowest files) is appended. Empty to disable
+_bake_history_path = user_settings.get("bake_history_path", os.path.join(USER_DATA_LOCATION, "bake_history.jsonl"))
+BAKE_HISTORY_PATH = os.path.expanduser(_bake_history_path) if _bake_history_path else None
+# journal the bake sessions so a session interrupted by a crash or an abort can be resumed
+_bake_journal = user_settings.get("bake_journal", True)
+# BAKE_JOURNAL_DIR is None when disabled
+BAKE_JOURNAL_DIR = (user_settings.get("bake_journal_dir") or
+                    os.path.join(USER_DATA_LOCATION, "journals")) if _bake_journal else None
+# json file used to cache the textures hashes, keyed by path+mtime+size
+HASH_CACHE_PATH = user_settings.get("hash_cache_path") or os.path.join(USER_DATA_LOCATION, "hash_cache.json")
+# number of threads used to hash the textures
+HASH_WORKERS = user_settings.get("hash_workers", 4)
+# existence checks of the textures are done in parallel batches: maximum number of batches checked at the same time
+# (network filesystems benefit from more, lower it if the file server is overloaded) and number of paths per batch
+STAT_WORKERS = user_settings.get("stat_workers", 16)
+STAT_BATCH_SIZE = user_settings.get("stat_batch_size", 64)
+# seconds a missing file or directory is remembered without being checked again, 0 to disable. The render engine
+# textures baked by the tool and the files changed seen by the watcher are forgotten right away
+STAT_NEGATIVE_TTL = user_settings.get("stat_negative_ttl", 30.0)
+STAT_SERVICE = StatService(workers=STAT_WORKERS,
+                           batch_size=STAT_BATCH_SIZE,
+                           negative_ttl=STAT_NEGATIVE_TTL)  # shared by all the checks
+# SQLite file on the shared filesystem where the monitors of all the artists share the directory listings, render
+# engine texture states and image headers. Empty to disable
+SHARED_INDEX_PATH = user_settings.get("shared_index_path", "")
+# seconds a render engine texture state of the shared index is used without being checked again
+SHARED_INDEX_RETEX_TTL = user_settings.get("shared_index_retex_ttl", 3600.0)
+# SHARED_INDEX is None when disabled
+SHARED_INDEX = SharedIndex(os.path.expanduser(SHARED_INDEX_PATH),
+                           retex_ttl=SHARED_INDEX_RETEX_TTL) if SHARED_INDEX_PATH else None
 
 # not an user setting
 RENDER_ENGINES_AVAILABLE = render_engine.render_engines  # list of str
@@ -61,33 +148,18 @@ key_name(str): {
 }
 """
 
+# only the visible columns, the per-texture data is stored on the records (see records.TextureRecord)
 TREEW_DATA = {
     "display_path": {"column": 0,  # This is locked, do not touch
                      "pretty_name": "File Path",
                      "visible": True},
 
-    "katana_node": {"column": 1,
-                    "pretty_name": "Katana Node",
-                    "visible": False},
-
-    "file_path": {"column": 2,
-                  "pretty_name": "File Path",
-                  "visible": False},
-
-    "path_parameter": {"column": 3,
-                       "pretty_name": "Path Parameter",
-                       "visible": False},
-
-    "enginetex_baked": {"column": 4,
-                        "pretty_name": "Engine Tex",
-                        "visible": False},
-
 }
 
 
 class DataRole:
     """
-    Variable used to hold information through the QtTreeWidgetItems
+    Variable used to hold the render engine texture status of the TextureRecords
     """
     all_enginetex = 1
     no_enginetex = 0
@@ -0,0 +1,140 @@
+"""
+Index of the content of the texture directories.
+
+The tiles of an udim texture or the frames of a sequence are all in the same directory: listing it once and matching
+the file names in memory replace a glob and a stat per file. Each directory is listed only once until the index is
+invalidated (ex: on refresh). With a shared_index.SharedIndex the listings done by the other monitors are reused
+while the directory is unchanged.
+
+The file names are compared with os.path.normcase() like glob does: case-insensitively on Windows.
+
+All python version
+All OS
+"""
+
+import os
+import errno
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+_CASE_SENSITIVE = os.path.normcase("A") == "A"  # False on Windows
+
+
+class DirectoryIndex(object):
+    """
+    Cache of the file names of each directory listed.
+    """
+
+    def __init__(self, stat_service=None, shared_index=None):
+        """
+        Args:
+            stat_service(stat_service.StatService or None): if specified its negative cache is used for the missing
+                directories
+            shared_index(shared_index.SharedIndex or None): listings read first from it and written to it
+        """
+        self.stat_service = stat_service
+        self.shared_index = shared_index
+        self._listings = {}  # {directory: frozenset of file names or None if the directory doesn't exist}
+        self._normcased = {}  # {directory: frozenset of normcased file names}, only filled where normcase is needed
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._listings)
+
+    def get_filenames(self, directory):
+        """
+        Args:
+            directory(str):
+
+        Returns:
+            frozenset or None: names of the directory content, None if the directory doesn't exist
+        """
+        directory = directory or "."
+        with self._lock:
+            if directory in self._listings:
+                return self._listings[directory]
+
+        negative_cache = self.stat_service.negative_cache if self.stat_service else None
+        filenames = None
+        if negative_cache is None or not negative_cache.is_missing(directory):
+            try:
+                filenames = self._list_directory(directory)
+            except OSError as excp:
+                if negative_cache is not None and excp.errno in (errno.ENOENT, errno.ENOTDIR):
+                    negative_cache.add(directory)
+                logger.debug("[DirectoryIndex] Cannot list {}: {}".format(directory, excp))
+
+        with self._lock:
+            self._listings[directory] = filenames
+        return filenames
+
+    def _list_directory(self, directory):
+        """
+        Returns:
+            frozenset: names of the directory content
+
+        Raises:
+            OSError: the directory can't be listed
+        """
+        if self.shared_index is None:
+            return frozenset(os.listdir(directory))
+
+        mtime = os.stat(directory).st_mtime  # before listing so a change during the listing outdates it
+        filenames = self.shared_index.get_listing(directory, mtime)
+        if filenames is None:
+            filenames = frozenset(os.listdir(directory))
+            self.shared_index.set_listing(directory, mtime, filenames)
+        return filenames
+
+    def exists(self, file_path):
+        """
+        Returns:
+            bool: True if the file is in its directory listing
+        """
+        directory, filename = os.path.split(file_path)
+        filenames = self.get_filenames(directory)
+        if filenames is None:
+            return False
+        if filename in filenames:
+            return True
+        if _CASE_SENSITIVE:
+            return False
+        with self._lock:
+            normcased = self._normcased.get(directory or ".")
+        if normcased is None:
+            normcased = frozenset(os.path.normcase(name) for name in filenames)
+            with self._lock:
+                self._normcased[directory or "."] = normcased
+        return os.path.normcase(filename) in normcased
+
+    def match(self, directory, regex):
+        """
+        Args:
+            directory(str):
+            regex(re.RegexObject): matched against the os.path.normcase() file names, so it must be built from a
+                normcased pattern. It must be anchored to match the whole name.
+
+        Returns:
+            list of tuple: sorted (file path, match object) of the directory files matching the regex
+        """
+        matches = []
+        for filename in sorted(self.get_filenames(directory) or []):
+            match = regex.match(os.path.normcase(filename))
+            if match:
+                matches.append((os.path.join(directory, filename), match))
+        return matches
+
+    def invalidate(self, directory):
+        """ The content of the directory changed, it is listed again when needed.
+        """
+        with self._lock:
+            self._listings.pop(directory or ".", None)
+            self._normcased.pop(directory or ".", None)
+
+    def clear(self):
+        with self._lock:
+            self._listings = {}
+            self._normcased = {}
@@ -7,10 +7,14 @@ Last Modified: 10/01/2020
 All Python versions
 """
 
+import logging
+
 from PyQt5 import QtWidgets
 
 from . import constants
 
+logger = logging.getLogger(__name__)
+
 
 class BaseError(Exception):
     """
@@ -61,6 +65,11 @@ def raise_dialog(message, title):
 
 
     """
+    if constants.KATANA_MAIN_WIND is None:
+        # no interface (Katana script mode), the message is only logged
+        logger.info("[{}] {}".format(title, message))
+        return
+
     dialog = QtWidgets.QDialog(parent=constants.KATANA_MAIN_WIND)
     dialog.setWindowTitle(title)
     dialog.setMinimumWidth(350)
@@ -0,0 +1,154 @@
+"""
+Evaluation of expression driven path parameters.
+
+An expression can return a different path depending on the frame or on the graph state variables, reading the
+parameter at frame 0 only is then not enough. The parameter is sampled over a frame range and a set of graph state
+variables values, the resulting paths are deduplicated and the evaluated values are kept in a bounded cache.
+
+Python 2.7 only
+Katana script, tested on 3.6v4
+"""
+import os
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from Katana import NodegraphAPI, Utils
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class EvaluationCache(object):
+    """
+    Store the evaluated values of parameters, keyed by (expression, frame, graph state).
+    Each parameter keep at most max_entries values, the least recently used are discarded first.
+    """
+
+    def __init__(self, max_entries=256):
+        """
+        Args:
+            max_entries(int): maximum number of evaluated values stored per parameter
+        """
+        self.max_entries = max_entries
+        self._parameters = {}  # {parameter full name: OrderedDict({key: value})}
+
+    def get(self, param_name, key):
+        """
+        Returns:
+            str or None: None if the value is not cached
+        """
+        values = self._parameters.get(param_name)
+        if values is None or key not in values:
+            return None
+        value = values.pop(key)
+        values[key] = value  # move at the end = most recently used
+        return value
+
+    def set(self, param_name, key, value):
+        values = self._parameters.setdefault(param_name, OrderedDict())
+        values.pop(key, None)
+        values[key] = value
+        while len(values) > self.max_entries:
+            values.popitem(last=False)
+
+    def clear(self):
+        self._parameters = {}
+
+
+def get_frame_samples(frame_range, step=1):
+    """ Return the list of frames to sample from a frame range.
+
+    Args:
+        frame_range(list or tuple): [start, end] inclusive
+        step(int):
+
+    Returns:
+        list of int: empty if the frame range is not valid
+    """
+    if not frame_range or len(frame_range) != 2:
+        return []
+    start, end = int(frame_range[0]), int(frame_range[1])
+    return list(range(start, end + 1, max(1, int(step))))
+
+
+@contextmanager
+def apply_graph_state(variables):
+    """ Temporarily set the value of the graph state variables defined on the root node.
+    The previous values are restored on exit. The undo capture is disabled meanwhile so the scan doesn't add
+    entries to the undo stack of the artist.
+
+    Args:
+        variables(dict or None): {variable name: value}
+    """
+    previous_values = {}
+    if not variables:
+        yield
+        return
+    root_node = NodegraphAPI.GetRootNode()
+    undo_enabled = Utils.UndoStack.IsUndoEnabled()
+    if undo_enabled:
+        Utils.UndoStack.DisableCapture()
+    try:
+        for var_name, var_value in (variables or {}).items():
+            var_param = root_node.getParameter("variables.{}.value".format(var_name))
+            if var_param is None:
+                logger.warning("[apply_graph_state] Graph state variable {} doesn't exist".format(var_name))
+                continue
+            previous_values[var_param] = var_param.getValue(0)
+            var_param.setValue(str(var_value), 0)
+        yield
+    finally:
+        for var_param, var_value in previous_values.items():
+            var_param.setValue(var_value, 0)
+        if undo_enabled:
+            Utils.UndoStack.EnableCapture()
+
+
+def evaluate_parameter_paths(file_param, frames, graph_states=None, cache=None):
+    """ Sample the given path parameter for every frame and graph state and return the distinct paths.
+
+    Args:
+        file_param(NodegraphAPI.Parameter): path parameter, usually driven by an expression
+        frames(list of int): frames to sample the parameter at
+        graph_states(list of dict or None): list of {variable name: value}, each one is applied while sampling
+        cache(EvaluationCache or None):
+
+    Returns:
+        list of str: normalized distinct paths in the order they were found
+    """
+    param_name = file_param.getFullName()
+    expression = file_param.getExpression() if file_param.isExpression() else None
+
+    paths = []
+    paths_found = set()
+    for graph_state in (graph_states or [None]):
+        state_key = tuple(sorted((graph_state or {}).items()))
+        keys = [(expression, frame, state_key) for frame in frames]
+
+        values = [cache.get(param_name, key) if cache else None for key in keys]
+        if None in values:
+            # only modify the graph state if there is something to evaluate
+            with apply_graph_state(graph_state):
+                for index, key in enumerate(keys):
+                    if values[index] is not None:
+                        continue
+                    try:
+                        values[index] = str(file_param.getValue(key[1]))
+                    except Exception as excp:
+                        logger.warning("[evaluate_parameter_paths] Cannot evaluate {} at frame {}: {}".format(
+                            param_name, key[1], excp))
+                        values[index] = ""
+                    if cache:
+                        cache.set(param_name, key, values[index])
+
+        for value in values:
+            if not value:
+                continue
+            path = os.path.normpath(value)
+            if path not in paths_found:
+                paths_found.add(path)
+                paths.append(path)
+
+    logger.debug("[evaluate_parameter_paths] {} distinct paths for {}".format(len(paths), param_name))
+    return paths
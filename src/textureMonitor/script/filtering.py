@@ -0,0 +1,134 @@
+"""
+Filtering of the textures displayed.
+
+The text and status of every row are stored once in a FilterIndex (paths already lowercase, status as bit flags)
+so filtering only iterate plain python data and never query the Qt items.
+
+All python version
+All OS
+"""
+
+import re
+import fnmatch
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+class FilterMode:
+    """
+    How the filter text is interpreted
+    """
+    substring = "Substring"
+    regex = "Regex"
+    glob = "Glob"
+
+    all = [substring, regex, glob]
+
+
+class StatusFlag:
+    """
+    Bit flags describing the status of a row, can be combined.
+    """
+    none = 0
+    missing = 1
+    expression = 2
+    no_enginetex = 4
+    locked = 8
+
+    # pretty name: flag, used to build the status filter
+    pretty_names = [("All", none),
+                    ("Missing", missing),
+                    ("Expression", expression),
+                    ("No Engine Tex", no_enginetex),
+                    ("Locked", locked)]
+
+
+def compile_text_filter(text, mode):
+    """ Return a function that tells if a lowercase path match the given filter text.
+
+    Args:
+        text(str): filter text, case insensitive
+        mode(str): FilterMode value
+
+    Returns:
+        function or None: None if the text is empty. The function take a lowercase str and return a bool.
+
+    Raises:
+        ValueError: if the text is not a valid regular expression
+    """
+    text = text.lower()
+    if not text:
+        return None
+
+    if mode == FilterMode.regex:
+        try:
+            compiled = re.compile(text)
+        except re.error as excp:
+            raise ValueError("Invalid regular expression {}: {}".format(text, excp))
+        return lambda path: compiled.search(path) is not None
+
+    if mode == FilterMode.glob:
+        # a glob without wildcard is considered as a substring
+        if not any(char in text for char in "*?["):
+            text = "*{}*".format(text)
+        compiled = re.compile(fnmatch.translate(text))
+        return lambda path: compiled.match(path) is not None
+
+    return lambda path: text in path
+
+
+class FilterIndex(object):
+    """
+    Precomputed data used to filter the rows.
+    Each row is identified by a key (any hashable object) and store its lowercase paths, status flags and group
+    (ex: render engine name).
+    """
+
+    def __init__(self):
+        self._rows = {}  # {key: [tuple of lowercase paths, flags, group]}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def clear(self):
+        self._rows = {}
+
+    def keys(self):
+        return set(self._rows.keys())
+
+    def add(self, key, paths, flags=StatusFlag.none, group=None):
+        """
+        Args:
+            key: row identifier
+            paths(list of str): paths the text filter is matched against
+            flags(int): combination of StatusFlag
+            group: rows can be restricted to a group when filtering
+        """
+        self._rows[key] = [tuple(path.lower() for path in paths), flags, group]
+
+    def set_flags(self, key, flags):
+        self._rows[key][1] = flags
+
+    def filter(self, text_filter=None, status_flag=StatusFlag.none, group=None):
+        """ Return the keys of the rows matching all the given criteria.
+
+        Args:
+            text_filter(function or None): returned by compile_text_filter()
+            status_flag(int): StatusFlag the row must have, none to not filter on status
+            group: only rows from this group are returned, None to not filter on group
+
+        Returns:
+            set: keys of the matching rows
+        """
+        matching = set()
+        for key, (paths, flags, row_group) in self._rows.items():
+            if group is not None and row_group != group:
+                continue
+            if status_flag and not flags & status_flag:
+                continue
+            if text_filter and not any(text_filter(path) for path in paths):
+                continue
+            matching.add(key)
+        return matching
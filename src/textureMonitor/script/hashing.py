@@ -0,0 +1,202 @@
+"""
+Content hashing of texture files, used to find byte-identical textures copied at different locations.
+
+Files are read by chunks so memory usage stay low on big textures, hashed in parallel threads (hashlib release
+the GIL) and the results are cached on disk using the path+mtime+size of the file as key.
+
+All python version
+All OS
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+
+try:
+    import queue
+except ImportError:  # python 2
+    import Queue as queue
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+CHUNK_SIZE = 1024 * 1024  # bytes read at once when hashing a file
+HASH_ALGORITHM = "sha1"
+
+
+def hash_file(file_path, chunk_size=CHUNK_SIZE):
+    """ Return the hex digest of the content of the given file, read by chunks.
+
+    Args:
+        file_path(str):
+        chunk_size(int): number of bytes read at once
+
+    Returns:
+        str: hex digest
+    """
+    hasher = hashlib.new(HASH_ALGORITHM)
+    with open(file_path, "rb") as file_obj:
+        chunk = file_obj.read(chunk_size)
+        while chunk:
+            hasher.update(chunk)
+            chunk = file_obj.read(chunk_size)
+    return hasher.hexdigest()
+
+
+def _replace_file(source_path, target_path):
+    """ Move source_path over target_path, atomically where the OS allows it.
+    """
+    if hasattr(os, "replace"):
+        os.replace(source_path, target_path)
+        return
+    # python 2: os.rename doesn't overwrite an existing file on Windows
+    if os.name == "nt" and os.path.exists(target_path):
+        os.remove(target_path)
+    os.rename(source_path, target_path)
+
+
+class HashCache(object):
+    """
+    Store file hashes on disk in a json file.
+    A cached hash is only valid if the file still has the same mtime and size.
+    """
+
+    def __init__(self, cache_path=None):
+        """
+        Args:
+            cache_path(str or None): json file path, if None the cache only lives in memory
+        """
+        self.cache_path = cache_path
+        self._data = {}  # {file_path: [mtime, size, hash]}
+        self._lock = threading.Lock()
+        self._modified = False
+        self.load()
+
+    def load(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r") as jsonfile:
+                self._data = json.load(jsonfile)
+        except (IOError, OSError, ValueError) as excp:
+            logger.warning("[HashCache] Cannot read cache {}, starting from empty: {}".format(self.cache_path, excp))
+            self._data = {}
+
+    def save(self):
+        """ Write the cache on disk if it was modified since loading.
+        The cache is written to a temporary file then moved over the previous one, so a crash or another Katana
+        session saving at the same time never leaves a truncated cache.
+        """
+        if not self.cache_path or not self._modified:
+            return
+        cache_dir = os.path.dirname(self.cache_path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        with self._lock:
+            temp_fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(self.cache_path) + ".",
+                                                  suffix=".tmp", dir=cache_dir or ".")
+            try:
+                with os.fdopen(temp_fd, "w") as jsonfile:
+                    json.dump(self._data, jsonfile)
+                _replace_file(temp_path, self.cache_path)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            self._modified = False
+
+    def get(self, file_path, mtime, size):
+        """
+        Returns:
+            str or None: hash if cached and still valid
+        """
+        cached = self._data.get(file_path)
+        if cached and cached[0] == mtime and cached[1] == size:
+            return cached[2]
+        return None
+
+    def set(self, file_path, mtime, size, file_hash):
+        with self._lock:
+            self._data[file_path] = [mtime, size, file_hash]
+            self._modified = True
+
+
+def hash_files(file_paths, workers=4, cache=None):
+    """ Hash the given files in parallel.
+
+    Args:
+        file_paths(list of str):
+        workers(int): number of threads used
+        cache(HashCache or None):
+
+    Returns:
+        dict: {file_path: hash}, files that couldn't be read are not included
+    """
+    result = {}
+    file_queue = queue.Queue()
+    for file_path in file_paths:
+        file_queue.put(file_path)
+
+    def _worker():
+        while True:
+            try:
+                file_path = file_queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                file_stat = os.stat(file_path)
+                file_hash = cache.get(file_path, file_stat.st_mtime, file_stat.st_size) if cache else None
+                if not file_hash:
+                    file_hash = hash_file(file_path)
+                    if cache:
+                        cache.set(file_path, file_stat.st_mtime, file_stat.st_size, file_hash)
+                result[file_path] = file_hash
+            except (IOError, OSError) as excp:
+                logger.warning("[hash_files] Cannot hash {}: {}".format(file_path, excp))
+
+    threads = [threading.Thread(target=_worker) for _ in range(max(1, min(workers, len(file_paths))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if cache:
+        cache.save()
+    return result
+
+
+def find_duplicates(file_paths, workers=4, cache=None):
+    """ Group the given files by identical content.
+    Only files sharing the same size are hashed.
+
+    Args:
+        file_paths(list of str):
+        workers(int): number of threads used for hashing
+        cache(HashCache or None):
+
+    Returns:
+        list of list: groups of file paths with the same content, only groups with more than one file are returned
+    """
+    by_size = {}
+    for file_path in set(file_paths):
+        try:
+            by_size.setdefault(os.path.getsize(file_path), []).append(file_path)
+        except OSError:
+            continue  # file doesn't exists
+
+    candidates = []
+    for same_size_paths in by_size.values():
+        if len(same_size_paths) > 1:
+            candidates += same_size_paths
+
+    by_hash = {}
+    for file_path, file_hash in hash_files(candidates, workers=workers, cache=cache).items():
+        by_hash.setdefault(file_hash, []).append(file_path)
+
+    groups = [sorted(group) for group in by_hash.values() if len(group) > 1]
+    logger.info("[find_duplicates] {} duplicate groups found over {} files ({} hashed)".format(
+        len(groups), len(file_paths), len(candidates)))
+    return groups
@@ -0,0 +1,200 @@
+"""
+Minimal image header reader, used to know how a texture is stored on disk (tiled, mipmapped, ...) without
+loading its pixels. Only the first bytes of the file are read.
+
+Supported:
+    - OpenEXR (scanline/tiled, mipmap/ripmap)
+    - TIFF and BigTIFF, which also cover Arnold .tx and 3Delight .tdl files
+    - common scanline only formats (png, jpg, tga, ...) are recognized by their extension
+
+All python version
+All OS
+"""
+
+import os
+import math
+import struct
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+# maximum number of bytes read to find the header, enough for any sane exr header
+HEADER_READ_SIZE = 65536
+# safety to avoid infinite loops on corrupted tiff IFD chains
+TIFF_MAX_DIRECTORIES = 64
+
+# formats that can only store a single scanline image
+SCANLINE_ONLY_EXT = [".png", ".jpg", ".jpeg", ".tga", ".bmp", ".hdr", ".gif", ".psd"]
+
+_EXR_MAGIC = b"\x76\x2f\x31\x01"
+_EXR_TILED_FLAG = 0x200
+_EXR_LEVEL_MODES = {0: "ONE_LEVEL", 1: "MIPMAP_LEVELS", 2: "RIPMAP_LEVELS"}
+
+
+class ImageHeader(object):
+    """
+    Storage information about an image file.
+    Values that couldn't be read are set to None.
+    """
+
+    def __init__(self, file_path, image_format, width=None, height=None, tiled=False, tile_width=None,
+                 tile_height=None, mip_levels=1, error=None):
+        self.file_path = file_path
+        self.image_format = image_format  # str
+        self.width = width  # int
+        self.height = height  # int
+        self.tiled = tiled  # bool
+        self.tile_width = tile_width  # int
+        self.tile_height = tile_height  # int
+        self.mip_levels = mip_levels  # int, 1 means no mipmaps
+        self.error = error  # str, set if the header is truncated or corrupted
+
+    def __repr__(self):
+        return "ImageHeader({}, {}x{}, tiled={} {}x{}, mips={})".format(self.image_format, self.width, self.height,
+                                                                        self.tiled, self.tile_width,
+                                                                        self.tile_height, self.mip_levels)
+
+    @property
+    def mipmapped(self):
+        return self.mip_levels > 1
+
+
+def read_image_header(file_path):
+    """ Read the header of the given image file.
+
+    Args:
+        file_path(str):
+
+    Returns:
+        ImageHeader or None: None if the format is not supported or the file cannot be read, an ImageHeader with
+            an error if the header is truncated or corrupted
+    """
+    extension = os.path.splitext(file_path)[-1].lower()
+    if extension in SCANLINE_ONLY_EXT:
+        return ImageHeader(file_path, image_format=extension[1:])
+
+    image_format = extension[1:]
+    try:
+        with open(file_path, "rb") as image_file:
+            data = image_file.read(HEADER_READ_SIZE)
+            if data[:4] == _EXR_MAGIC:
+                image_format = "exr"
+                return _read_exr_header(file_path, data)
+            if data[:2] in (b"II", b"MM"):
+                image_format = "tiff"
+                return _read_tiff_header(file_path, image_file, data[:2])
+    except (IOError, OSError) as excp:
+        logger.debug("[read_image_header] Cannot read header of {}: {}".format(file_path, excp))
+        return None
+    except (struct.error, ValueError, IndexError) as excp:
+        logger.debug("[read_image_header] Corrupted header for {}: {}".format(file_path, excp))
+        return ImageHeader(file_path, image_format=image_format, error=str(excp) or type(excp).__name__)
+
+    logger.debug("[read_image_header] Unsupported image format for {}".format(file_path))
+    return None
+
+
+def _read_exr_header(file_path, data):
+    """ Parse the header attributes of an OpenEXR file (first part only for multipart files).
+
+    Args:
+        file_path(str):
+        data(bytes): first bytes of the file
+
+    Returns:
+        ImageHeader
+    """
+    version = struct.unpack("<i", data[4:8])[0]
+    header = ImageHeader(file_path, image_format="exr", tiled=bool(version & _EXR_TILED_FLAG))
+    level_mode = 0
+    round_up = False
+
+    position = 8
+    while True:
+        name_end = data.index(b"\x00", position)
+        attr_name = data[position:name_end]
+        if not attr_name:
+            break  # end of the header
+        type_end = data.index(b"\x00", name_end + 1)
+        attr_type = data[name_end + 1:type_end]
+        attr_size = struct.unpack("<i", data[type_end + 1:type_end + 5])[0]
+        value = data[type_end + 5:type_end + 5 + attr_size]
+        position = type_end + 5 + attr_size
+
+        if attr_type == b"tiledesc":
+            header.tile_width, header.tile_height, mode = struct.unpack("<IIB", value[:9])
+            level_mode = mode & 0x0F
+            round_up = bool(mode >> 4)
+            # multipart files don't set the version flag but declare tiles per part
+            header.tiled = True
+        elif attr_name == b"dataWindow":
+            xmin, ymin, xmax, ymax = struct.unpack("<iiii", value[:16])
+            header.width = xmax - xmin + 1
+            header.height = ymax - ymin + 1
+
+    if header.tiled and level_mode != 0 and header.width and header.height:
+        rounding = math.ceil if round_up else math.floor
+        header.mip_levels = int(rounding(math.log(max(header.width, header.height), 2))) + 1
+
+    logger.debug("[_read_exr_header] {} level mode {}".format(header, _EXR_LEVEL_MODES.get(level_mode)))
+    return header
+
+
+def _read_tiff_header(file_path, image_file, byte_order):
+    """ Parse the Image File Directories of a TIFF/BigTIFF file.
+    Each mip level of a .tx/.tdl is stored as a separate directory.
+
+    Args:
+        file_path(str):
+        image_file(file): opened file object
+        byte_order(bytes): b"II" or b"MM"
+
+    Returns:
+        ImageHeader or None: None if the file is not a valid TIFF
+    """
+    endian = "<" if byte_order == b"II" else ">"
+    image_file.seek(2)
+    magic = struct.unpack(endian + "H", image_file.read(2))[0]
+    if magic == 42:
+        offset_fmt, count_fmt, entry_size, value_size = "I", "H", 12, 4
+        next_ifd = struct.unpack(endian + "I", image_file.read(4))[0]
+    elif magic == 43:  # BigTIFF
+        image_file.read(4)  # bytesize of offsets + padding
+        offset_fmt, count_fmt, entry_size, value_size = "Q", "Q", 20, 8
+        next_ifd = struct.unpack(endian + "Q", image_file.read(8))[0]
+    else:
+        return None
+
+    tag_formats = {3: "H", 4: "I", 16: "Q"}  # SHORT, LONG, LONG8
+    header = ImageHeader(file_path, image_format="tiff", mip_levels=0)
+    while next_ifd and header.mip_levels < TIFF_MAX_DIRECTORIES:
+        image_file.seek(next_ifd)
+        count_size = struct.calcsize(count_fmt)
+        entry_count = struct.unpack(endian + count_fmt, image_file.read(count_size))[0]
+        entries = image_file.read(entry_count * entry_size)
+        next_ifd = struct.unpack(endian + offset_fmt, image_file.read(struct.calcsize(offset_fmt)))[0]
+        header.mip_levels += 1
+        if header.mip_levels > 1:
+            continue  # only the first directory (highest resolution) is relevant for the tags
+
+        for index in range(entry_count):
+            entry = entries[index * entry_size:(index + 1) * entry_size]
+            tag, tag_type = struct.unpack(endian + "HH", entry[:4])
+            value_fmt = tag_formats.get(tag_type)
+            if not value_fmt:
+                continue
+            value_offset = entry_size - value_size
+            value = struct.unpack(endian + value_fmt, entry[value_offset:value_offset + struct.calcsize(value_fmt)])[0]
+            if tag == 256:
+                header.width = value
+            elif tag == 257:
+                header.height = value
+            elif tag == 322:
+                header.tile_width = value
+                header.tiled = True
+            elif tag == 323:
+                header.tile_height = value
+
+    header.mip_levels = max(header.mip_levels, 1)
+    return header
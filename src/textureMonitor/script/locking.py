@@ -0,0 +1,121 @@
+"""
+Locked paths rules: textures matching a rule are displayed but can't be edited/baked by the user.
+
+A rule can be:
+    - an exact file path: "R:/textures/wood.exr"
+    - a directory prefix, ending with a path separator: "R:/textures/library/"
+    - a glob pattern: "*/library/*.exr"
+Rules and paths are compared with forward slashes, so a rule written with either separator matches on all the OS.
+
+Exact paths are stored in a set, prefixes in a trie of path components and all the globs are compiled in a single
+regular expression, so a path is tested in about constant time whatever the number of rules. Results are memoized
+per path.
+
+All python version
+All OS
+"""
+
+import os
+import re
+import fnmatch
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+_GLOB_CHARS = "*?["
+_TRIE_END = None  # key marking the end of a prefix in the trie
+
+
+def normalize_path(path):
+    """
+    Returns:
+        str: path normalized for comparison (case insensitive on Windows), using forward slashes
+    """
+    return os.path.normcase(os.path.normpath(path.replace("\\", "/"))).replace("\\", "/")
+
+
+def _split_components(path):
+    return [component for component in path.split("/") if component]
+
+
+class LockedRules(object):
+    """
+    Set of locked rules, use `path in locked_rules` to know if a path is locked.
+    """
+
+    def __init__(self, rules=None):
+        """
+        Args:
+            rules(list of str or None):
+        """
+        self._exact = set()
+        self._prefix_trie = {}
+        self._globs_regex = None
+        self._memo = {}  # {normalized path: bool}
+        self.rules = []
+        self.set_rules(rules or [])
+
+    def __repr__(self):
+        return "LockedRules({})".format(self.rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __contains__(self, file_path):
+        return self.match(file_path)
+
+    def set_rules(self, rules):
+        """ Replace the current rules by the given ones.
+
+        Args:
+            rules(list of str):
+        """
+        self.rules = list(rules)
+        self._exact = set()
+        self._prefix_trie = {}
+        self._memo = {}
+        globs = []
+
+        for rule in self.rules:
+            if any(char in rule for char in _GLOB_CHARS):
+                globs.append(fnmatch.translate(normalize_path(rule)))
+            elif rule.endswith(("/", "\\")):
+                node = self._prefix_trie
+                for component in _split_components(normalize_path(rule)):
+                    node = node.setdefault(component, {})
+                node[_TRIE_END] = True
+            else:
+                self._exact.add(normalize_path(rule))
+
+        self._globs_regex = re.compile("|".join("(?:{})".format(glob) for glob in globs)) if globs else None
+        logger.debug("[LockedRules] {} exact, {} globs".format(len(self._exact), len(globs)))
+
+    def match(self, file_path):
+        """
+        Args:
+            file_path(str):
+
+        Returns:
+            bool: True if the given path is locked by any rule
+        """
+        if not file_path or not self.rules:
+            return False
+
+        path = normalize_path(file_path)
+        result = self._memo.get(path)
+        if result is None:
+            result = path in self._exact or self._match_prefix(path) or bool(
+                self._globs_regex and self._globs_regex.match(path))
+            self._memo[path] = result
+        return result
+
+    def _match_prefix(self, path):
+        node = self._prefix_trie
+        for component in _split_components(path):
+            if _TRIE_END in node:
+                return True
+            node = node.get(component)
+            if node is None:
+                return False
+        return False
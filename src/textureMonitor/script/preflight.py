@@ -0,0 +1,265 @@
+"""
+Pre-flight check: find the missing and not baked textures of the scene before it is submitted to the farm, without
+the interface. The texture nodes are collected like the interface does, the files resolved from their tokens and
+sequences, then all the source and render engine texture paths are stat in bulk by the shared stat service.
+
+Run it headless with preflight_launcher.py:
+    katana --script preflight_launcher.py <scene.katana> [--engine Arnold] [--no-retex] [--allow-unbaked]
+                                                          [--report report.json]
+The exit status is one of PreflightStatus.
+
+Python 2.7 only
+Katana script, tested on 3.6v4
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+from . import constants
+from .utilities import (return_children_textures, return_sequence_textures, compress_frame_range)
+from .directory_index import DirectoryIndex
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class PreflightStatus:
+    """
+    Exit status of the pre-flight check
+    """
+    ok = 0
+    missing = 1  # some textures used by the scene don't exist
+    unbaked = 2  # all the textures exist but some render engine textures are not baked
+    error = 3  # the check couldn't run (no scene, unknown render engine, ...)
+
+
+class PreflightReport(object):
+    """
+    Result of the pre-flight check
+    """
+
+    def __init__(self, render_engine_name, scene_path=None):
+        self.render_engine_name = render_engine_name
+        self.scene_path = scene_path
+        self.nodes_count = 0
+        self.files_count = 0
+        self.missing = {}  # {file path: list of node names}
+        self.missing_frames = {}  # {sequence path: list of int}
+        self.unbaked = {}  # {file path: list of node names}
+        self.retex_checked = False
+        self.duration = 0.0
+
+    def get_status(self, allow_unbaked=False):
+        """
+        Args:
+            allow_unbaked(bool): True to not fail on the render engine textures not baked
+
+        Returns:
+            int: PreflightStatus
+        """
+        if self.missing or self.missing_frames:
+            return PreflightStatus.missing
+        if self.unbaked and not allow_unbaked:
+            return PreflightStatus.unbaked
+        return PreflightStatus.ok
+
+    def to_dict(self):
+        return {"scene": self.scene_path,
+                "render_engine": self.render_engine_name,
+                "nodes": self.nodes_count,
+                "files": self.files_count,
+                "missing": self.missing,
+                "missing_frames": self.missing_frames,
+                "unbaked": self.unbaked if self.retex_checked else None,
+                "duration": self.duration}
+
+    def get_text(self, max_lines=20):
+        """
+        Args:
+            max_lines(int): maximum number of paths listed per category
+
+        Returns:
+            str: compact report
+        """
+        lines = ["{} nodes, {} files checked in {:.1f}s ({})".format(self.nodes_count, self.files_count,
+                                                                     self.duration, self.render_engine_name)]
+        categories = [("missing", self.missing), ("not baked", self.unbaked)]
+        for category_name, paths in categories:
+            if not paths:
+                continue
+            lines.append("{} {}:".format(len(paths), category_name))
+            for file_path in sorted(paths)[:max_lines]:
+                lines.append("  {}  ({})".format(file_path, ", ".join(paths[file_path])))
+            if len(paths) > max_lines:
+                lines.append("  ... and {} more".format(len(paths) - max_lines))
+        for sequence_path, frames in sorted(self.missing_frames.items())[:max_lines]:
+            lines.append("missing frames {}: {}".format(compress_frame_range(frames), sequence_path))
+        if not self.missing and not self.missing_frames and not self.unbaked:
+            lines.append("All textures OK")
+        return "\n".join(lines)
+
+
+def resolve_texture_files(texture_nodes_dict, directory_index=None, path_pattern=None):
+    """ Resolve the files used by each node path: udim tiles, frames of a sequence or the path itself.
+    Paths using a token but matching no file are kept as is so they are reported missing.
+
+    Args:
+        texture_nodes_dict(dict): {KatanaNode: [file_path, file_param]}
+        directory_index(DirectoryIndex or None): each directory is then listed only once
+        path_pattern(dict or None): PATH_PATTERN of the render engine checked, the current render engine one if None
+
+    Returns:
+        tuple: ({file path: list of node names}, {sequence path: list of missing frames})
+    """
+    files_nodes = {}
+    missing_frames = {}
+    for ktn_node, data in texture_nodes_dict.items():
+        file_path = os.path.normpath(data[0])
+        sequence = return_sequence_textures(file_path, directory_index=directory_index, path_pattern=path_pattern)
+        if sequence:
+            file_paths = sequence.file_paths or [file_path]
+            if sequence.missing_frames:
+                missing_frames[file_path] = sequence.missing_frames
+        else:
+            file_paths = return_children_textures(file_path, directory_index=directory_index,
+                                                  path_pattern=path_pattern) or [file_path]
+        for resolved_path in file_paths:
+            files_nodes.setdefault(resolved_path, []).append(ktn_node.getName())
+    return files_nodes, missing_frames
+
+
+def run_preflight(render_engine, check_retex=True, manifest=None, stat_service=None, scene_path=None):
+    """ Check the textures of the currently opened scene.
+
+    Args:
+        render_engine(module): module Representing a RenderEngine, it should be constants.RENDER_ENGINE as the
+            tokens are resolved with it
+        check_retex(bool): True to also check the render engine textures are baked
+        manifest(bake_manifest.ManifestSettings or None): verify the render engine textures with their manifest
+        stat_service(StatService or None): constants.STAT_SERVICE if None
+        scene_path(str or None): only used in the report
+
+    Returns:
+        PreflightReport:
+    """
+    stat_service = stat_service or constants.STAT_SERVICE
+    start_time = time.time()
+    report = PreflightReport(render_engine.name, scene_path=scene_path)
+    try:
+        texture_nodes_dict = render_engine.get_re_texture_nodes()
+    except ValueError:
+        texture_nodes_dict = {}  # no textures in the scene
+    report.nodes_count = len(texture_nodes_dict)
+
+    directory_index = DirectoryIndex(stat_service, shared_index=constants.SHARED_INDEX)
+    files_nodes, report.missing_frames = resolve_texture_files(texture_nodes_dict, directory_index=directory_index,
+                                                               path_pattern=render_engine.PATH_PATTERN)
+    if constants.SHARED_INDEX:
+        constants.SHARED_INDEX.flush()
+    report.files_count = len(files_nodes)
+
+    retex_paths = {}  # {source path: render engine texture path}
+    if check_retex:
+        report.retex_checked = True
+        retex_paths = dict((file_path, constants.render_engine.common.get_retex_target_path(
+            file_path, render_engine=render_engine)) for file_path in files_nodes)
+
+    stats = stat_service.stat_many(list(files_nodes.keys()) + list(retex_paths.values()))
+
+    manifest_states = {}  # {source path: bool} render engine textures matching their manifest
+    if check_retex and manifest:
+        # checked again whatever the shared index says, the scene is about to be rendered
+        manifest_states = constants.render_engine.common.is_retex_baked_many(
+            [file_path for file_path, retex_path in retex_paths.items()
+             if stats.get(file_path) is not None and stats.get(retex_path) is not None],
+            render_engine, manifest=manifest, stat_service=stat_service, shared_index=constants.SHARED_INDEX,
+            refresh=True)
+
+    for file_path, node_names in files_nodes.items():
+        if stats.get(file_path) is None:
+            report.missing[file_path] = node_names
+            continue
+        if not check_retex:
+            continue
+        retex_path = retex_paths[file_path]
+        baked = stats.get(retex_path) is not None
+        if baked and manifest:
+            baked = manifest_states.get(file_path, False)
+        if not baked:
+            report.unbaked[file_path] = node_names
+
+    report.duration = time.time() - start_time
+    logger.info("[run_preflight] {} files checked in {:.2f}s".format(report.files_count, report.duration))
+    return report
+
+
+def main(argv=None):
+    """ Entry point of the headless pre-flight check, the scene is loaded if given.
+
+    Args:
+        argv(list of str or None): command line arguments, sys.argv[1:] if None
+
+    Returns:
+        int: PreflightStatus, error if the arguments are invalid or if the check raised
+    """
+    parser = argparse.ArgumentParser(description="Check the textures of a Katana scene before submission.")
+    parser.add_argument("scene", nargs="?", help="katana scene to load, the current scene if not given")
+    parser.add_argument("--engine", default=constants.RENDER_ENGINE.name,
+                        help="render engine to check (default: %(default)s)")
+    parser.add_argument("--no-retex", action="store_true", help="don't check the render engine textures")
+    parser.add_argument("--allow-unbaked", action="store_true", help="don't fail on the not baked textures")
+    parser.add_argument("--report", help="write the full report to this json file")
+    parser.add_argument("--max-lines", type=int, default=20, help="paths listed per category in the output")
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as excep:
+        # argparse exits with 2 on a bad argument, which would be read as PreflightStatus.unbaked
+        if excep.code:
+            return PreflightStatus.error
+        return PreflightStatus.ok  # --help
+
+    try:
+        return _run(args)
+    except Exception:
+        # not reported as missing textures, the farm submission must know the scene wasn't checked
+        logger.exception("[preflight] The pre-flight check failed")
+        return PreflightStatus.error
+
+
+def _run(args):
+    """
+    Args:
+        args(argparse.Namespace): see main()
+
+    Returns:
+        int: PreflightStatus
+    """
+    if args.engine not in constants.RENDER_ENGINES_AVAILABLE:
+        logger.error("[preflight] Render engine {} is not supported: {}".format(args.engine,
+                                                                            constants.RENDER_ENGINES_AVAILABLE))
+        return PreflightStatus.error
+    constants.RENDER_ENGINE = getattr(constants.render_engine, args.engine)
+
+    if args.scene:
+        from Katana import KatanaFile
+        if not os.path.exists(args.scene):
+            logger.error("[preflight] Scene {} doesn't exist".format(args.scene))
+            return PreflightStatus.error
+        KatanaFile.Load(args.scene)
+
+    report = run_preflight(constants.RENDER_ENGINE,
+                           check_retex=constants.ENABLE_RETEX and not args.no_retex,
+                           manifest=constants.BAKE_MANIFEST,
+                           scene_path=args.scene)
+    status = report.get_status(allow_unbaked=args.allow_unbaked)
+
+    sys.stdout.write(report.get_text(max_lines=args.max_lines) + "\n")
+    if args.report:
+        report_data = report.to_dict()
+        report_data["status"] = status
+        with open(args.report, "w") as report_file:
+            json.dump(report_data, report_file, indent=4)
+    return status
@@ -0,0 +1,304 @@
+"""
+In-memory store of the textures found in the scene.
+
+Each texture (root item or child) is a TextureRecord, a compact object with __slots__. The records are the single
+source of truth for the per-texture state: scans, filters and bakes iterate the records and never read the Qt items.
+The interface only keeps a reference to the QTreeWidgetItem displaying each record.
+
+Directories are interned: the thousands of UDIM tiles of a texture share the same directory string.
+The records can be grouped by directory with get_directory_groups() to display aggregated statistics.
+
+All python version
+All OS
+"""
+
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TextureRecord(object):
+    """
+    State of a texture path used in the scene.
+    A root record represent a path parameter of a node, its children the files resolved from its tokens/expression.
+    """
+    __slots__ = ("directory",  # interned directory of the file path
+                 "filename",
+                 "katana_node",
+                 "path_parameter",
+                 "render_engine",  # name of the render engine the node belongs to
+                 "parent",  # TextureRecord or None for a root record
+                 "children",  # list of TextureRecord
+                 "sequence_paths",  # list of str if the path is a frame sequence else None
+                 "missing_frames",  # list of int
+                 "path_missing",
+                 "is_expression",
+                 "locked",
+                 "enginetex_status",  # {render engine name: DataRole}
+                 "retex_counts",  # {render engine name: (baked files count, files count)}
+                 "texture_issues",  # list of str
+                 "duplicates",  # list of identical file paths
+                 "qitem")  # QTreeWidgetItem displaying the record, only used by the interface
+
+    def __init__(self, directory, filename, katana_node=None, path_parameter=None, render_engine=None, parent=None):
+        self.directory = directory
+        self.filename = filename
+        self.katana_node = katana_node
+        self.path_parameter = path_parameter
+        self.render_engine = render_engine
+        self.parent = parent
+        self.children = []
+        self.sequence_paths = None
+        self.missing_frames = []
+        self.path_missing = False
+        self.is_expression = False
+        self.locked = False
+        self.enginetex_status = {}
+        self.retex_counts = {}
+        self.texture_issues = []
+        self.duplicates = []
+        self.qitem = None
+
+    def __repr__(self):
+        return "TextureRecord({})".format(self.file_path)
+
+    @property
+    def file_path(self):
+        return os.path.join(self.directory, self.filename)
+
+    @property
+    def is_root(self):
+        return self.parent is None
+
+    @property
+    def root(self):
+        return self.parent or self
+
+    def get_file_paths(self):
+        """ Files represented by this record: the frames of a sequence, the files of its children or its own path.
+
+        Returns:
+            list of str:
+        """
+        if self.sequence_paths is not None:
+            return list(self.sequence_paths)
+        if self.children:
+            return [child.file_path for child in self.children]
+        return [self.file_path]
+
+    def get_leaves(self):
+        """
+        Returns:
+            list of TextureRecord: the children if any else the record itself
+        """
+        return self.children or [self]
+
+    def get_retex_role(self, render_engine_name, default=None):
+        """
+        Returns:
+            int: DataRole of the render engine texture status for the given render engine
+        """
+        return self.enginetex_status.get(render_engine_name, default)
+
+    def get_retex_counts(self, render_engine_name):
+        """
+        Returns:
+            tuple: (baked files count, files count) for the given render engine, (0, 0) if not checked yet
+        """
+        return self.retex_counts.get(render_engine_name, (0, 0))
+
+    def set_retex_counts(self, retex_counts):
+        """
+        Args:
+            retex_counts(dict): {render engine name: (baked files count, files count)}
+
+        Returns:
+            bool: True if the counts changed
+        """
+        if retex_counts == self.retex_counts:
+            return False
+        self.retex_counts = retex_counts
+        return True
+
+    def get_children_retex_counts(self):
+        """ Sum the render engine texture counts of the children, without checking any file.
+
+        Returns:
+            dict: {render engine name: (baked files count, files count)}
+        """
+        retex_counts = {}
+        for child in self.children:
+            for re_name, (baked_count, total_count) in child.retex_counts.items():
+                summed = retex_counts.get(re_name, (0, 0))
+                retex_counts[re_name] = (summed[0] + baked_count, summed[1] + total_count)
+        return retex_counts
+
+
+class TextureStore(object):
+    """
+    All the TextureRecord of the scene.
+    """
+
+    def __init__(self):
+        self.roots = []
+        self._directories = {}  # {directory: directory} used to intern them
+        self._by_path = {}  # {file path: list of TextureRecord}
+
+    def __len__(self):
+        return sum(1 + len(root.children) for root in self.roots)
+
+    def __iter__(self):
+        """ Iterate all the records, each root followed by its children
+        """
+        for root in self.roots:
+            yield root
+            for child in root.children:
+                yield child
+
+    def clear(self):
+        self.roots = []
+        self._directories = {}
+        self._by_path = {}
+
+    def _intern_directory(self, directory):
+        return self._directories.setdefault(directory, directory)
+
+    def add(self, file_path, katana_node=None, path_parameter=None, render_engine=None, parent=None):
+        """ Create a record and add it to the store.
+
+        Args:
+            file_path(str): normalized file path
+            katana_node(NodegraphAPI.Node or None):
+            path_parameter(NodegraphAPI.Parameter or None):
+            render_engine(str or None): render engine name
+            parent(TextureRecord or None): None to create a root record
+
+        Returns:
+            TextureRecord:
+        """
+        directory, filename = os.path.split(file_path)
+        record = TextureRecord(self._intern_directory(directory), filename,
+                               katana_node=katana_node,
+                               path_parameter=path_parameter,
+                               render_engine=render_engine,
+                               parent=parent)
+        if parent is None:
+            self.roots.append(record)
+        else:
+            parent.children.append(record)
+        self._by_path.setdefault(record.file_path, []).append(record)
+        return record
+
+    def remove(self, root_record):
+        """ Remove a root record and its children from the store.
+        """
+        self.roots.remove(root_record)
+        for record in [root_record] + root_record.children:
+            records = self._by_path.get(record.file_path, [])
+            if record in records:
+                records.remove(record)
+
+    def get_records(self, file_path):
+        """
+        Returns:
+            list of TextureRecord: records whose path is the given one
+        """
+        return list(self._by_path.get(file_path, []))
+
+    def get_file_leaves(self):
+        """
+        Returns:
+            dict: {file path: list of TextureRecord} records without children representing each file, the frames
+                of the sequences included
+        """
+        file_leaves = {}
+        for record in self.get_leaves():
+            for file_path in record.get_file_paths():
+                file_leaves.setdefault(file_path, []).append(record)
+        return file_leaves
+
+    def get_leaves(self):
+        """
+        Returns:
+            list of TextureRecord: records without children (roots without children and all the children)
+        """
+        leaves = []
+        for root in self.roots:
+            leaves += root.get_leaves()
+        return leaves
+
+    def get_roots(self, render_engine=None):
+        """
+        Args:
+            render_engine(str or None): only return the roots of this render engine
+
+        Returns:
+            list of TextureRecord:
+        """
+        if render_engine is None:
+            return list(self.roots)
+        return [root for root in self.roots if root.render_engine == render_engine]
+
+
+class DirectoryGroup(object):
+    """
+    Records without children sharing the same directory, with their aggregated statistics.
+    """
+    __slots__ = ("directory",
+                 "records",  # list of TextureRecord without children
+                 "file_paths",  # list of str, files of the records
+                 "missing_count",  # number of missing files, the missing frames of the sequences included
+                 "baked_count",  # number of files whose render engine texture is baked
+                 "size")  # bytes of the existing files, None if not computed
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.records = []
+        self.file_paths = []
+        self.missing_count = 0
+        self.baked_count = 0
+        self.size = None
+
+    def __repr__(self):
+        return "DirectoryGroup({}, {} files)".format(self.directory, self.file_count)
+
+    @property
+    def file_count(self):
+        return len(self.file_paths)
+
+    @property
+    def bake_ratio(self):
+        """
+        Returns:
+            float: 0-1 part of the files of the group baked
+        """
+        return float(self.baked_count) / self.file_count if self.file_count else 0.0
+
+
+def get_directory_groups(roots, render_engine_name):
+    """ Group the files of the given root records by directory.
+
+    Args:
+        roots(list of TextureRecord):
+        render_engine_name(str): render engine whose baked files are counted
+
+    Returns:
+        list of DirectoryGroup: sorted by directory
+    """
+    groups = {}  # {directory: DirectoryGroup}
+    for root in roots:
+        for record in root.get_leaves():
+            group = groups.get(record.directory)
+            if group is None:
+                group = groups[record.directory] = DirectoryGroup(record.directory)
+            group.records.append(record)
+            group.file_paths += record.get_file_paths()
+            if record.sequence_paths is not None:
+                # the sequence path itself is missing when the sequence has no frame at all
+                group.missing_count += len(record.missing_frames) or int(record.path_missing)
+            elif record.path_missing:
+                group.missing_count += 1
+            group.baked_count += record.get_retex_counts(render_engine_name)[0]
+    return [groups[directory] for directory in sorted(groups)]
@@ -11,14 +11,16 @@ import os
 import glob
 import logging
 
-from Katana import NodegraphAPI
+from . import common
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 name = "Arnold"
 re_tex_ext = ".tx"
-support_re_baking = False  # set to true to allow to bake the render engine texture
+support_re_baking = True  # set to true to allow to bake the render engine texture
+# type of the Katana shading nodes created for this render engine
+katana_node_type = "ArnoldShadingNode"
 
 """ 
 Could be also called token, they are used in file path to load multiple files in one path
@@ -37,38 +39,82 @@ PATH_PATTERN = {
 # For arnold more detail about token here: https://docs.arnoldrenderer.com/display/A5AFMUG/Tokens
 
 
+# Options used to build the maketx command, a preset is applied over the default one, see common.get_bake_options()
+#   - tile_size: tile width and height in pixels (--tile)
+#   - mip_filter: filter used to compute the mip levels (--filter), ex: box, lanczos3, blackman-harris
+#   - threads: threads used by one maketx process (--threads), 0 to use all the cores
+#   - oiio: write an OpenImageIO optimized texture (--oiio)
+#   - extra_args: arguments added as is to the command
+BAKE_PRESETS = {
+    "default": {"tile_size": 64,
+                "mip_filter": "lanczos3",
+                "threads": 0,
+                "oiio": True,
+                "extra_args": []},
+    "fast": {"mip_filter": "box"},
+    "farm": {"threads": 1},
+}
+
+
 def _find_retexture_processor():
     """ Return the path to the render engine texture processor tool
 
     Returns:
-        str: path to the maketx.exe
+        str or None: path to the maketx executable
     """
-    local_path = r"C:\Program Files\Autodesk\Arnold\maya*\bin\maketx.exe"
-    possible_maketx_path = glob.glob(local_path)
-    if possible_maketx_path:
-        return possible_maketx_path[-1]
-
-    else:
-        if support_re_baking:
-            raise RuntimeError("The renderengine texture processor cannot be found for {}".format(name))
-        else:
-            logger.info("The renderengine texture processor cannot be found for {} but re baking is disabled".format(
-                name
-            ))
+    candidate_paths = [r"C:\Program Files\Autodesk\Arnold\maya*\bin\maketx.exe",
+                       "$KTOA_ROOT/bin/maketx",
+                       "/opt/solidangle/arnold*/bin/maketx",
+                       "/usr/autodesk/arnold/maya*/bin/maketx",
+                       "/Applications/Autodesk/Arnold/mtoa/maya*/bin/maketx"]
+    return common.find_texture_processor("maketx", candidate_paths)
 
 
 re_textool = _find_retexture_processor()
+if not re_textool:
+    logger.info("The renderengine texture processor cannot be found for {}, re baking is disabled".format(name))
+    support_re_baking = False
 
 
-def bake_retex(file_path):
+def get_retex_output_path(file_path):
+    """
+    Returns:
+        str: path of the .tx written when baking the given file
+    """
+    return os.path.splitext(file_path)[0] + re_tex_ext
+
+
+def build_bake_command(file_path, options):
+    """
+    Args:
+        file_path(str): file path to bake
+        options(dict): see BAKE_PRESETS
+
+    Returns:
+        list of str: maketx argument list
+    """
+    command = [re_textool, file_path, "-o", get_retex_output_path(file_path)]
+    if options.get("oiio"):
+        command.append("--oiio")
+    if options.get("tile_size"):
+        command += ["--tile", str(options["tile_size"]), str(options["tile_size"])]
+    if options.get("mip_filter"):
+        command += ["--filter", options["mip_filter"]]
+    if options.get("threads") is not None:
+        command += ["--threads", str(options["threads"])]
+    command += list(options.get("extra_args") or [])
+    return command
+
+
+def bake_retex(file_path, options=None):
     """ Bake the render engine texture of the given file_path
 
     Args:
         file_path(str):  file path to bake
+        options(dict or None): see BAKE_PRESETS, None to use the default preset
 
     Returns:
-        bool:
-            render engine texture path if success else False if error
+        common.BakeResult: status, output path, exit code and output of the processor
     Raises:
         ValueError: if file_path arg is not a string
 
@@ -76,44 +122,35 @@ def bake_retex(file_path):
     if not isinstance(file_path, basestring):  # TODO python2 specific
         raise ValueError("filepath submitted is not a string but {}: {}".format(type(file_path), file_path))
 
-    # TODO not supported yet
-    return
+    command = build_bake_command(file_path, options=options or BAKE_PRESETS["default"])
+    return common.run_texture_processor(command, file_path, output_path=get_retex_output_path(file_path))
+
+
+def get_texture_from_node(ktnnode):
+    """ Return the texture file path used by the given node if it's a texture/file node.
+    The path value and its expression flag are read in the same pass.
+
+    Args:
+        ktnnode(NodegraphAPI.Node): a node of type katana_node_type
+
+    Returns:
+        list or None: [file_path value, file_path_parameter, is_expression] or None if the node doesn't use a texture
+    """
+    node_type_value = common.get_node_type(ktnnode)
+    if node_type_value == "image":
+        return common.read_texture_parameter(ktnnode, 'parameters.filename')
+    return None
 
 
 def get_re_texture_nodes():
     """ Get all Render Engine Katana Texture/File nodes
 
     Returns:
-        dict: Dictionnary of {KatanaNode:[file_path value, file_path_parameter]}
+        dict: Dictionnary of {KatanaNode: [file_path value, file_path_parameter, is_expression]}
     Raises:
         ValueError
     """
-    retex_node_dict = {}
-
-    all_node_list = NodegraphAPI.GetAllNodesByType('ArnoldShadingNode', includeDeleted=False, sortByName=True)
-    for ktnnode in all_node_list:
-        # check if you can get the type of the node
-        try:
-            node_type_value = ktnnode.getParameter("nodeType").getValue(0)
-        except:
-            continue
-
-        if node_type_value == "image":
-            # try to get the file_path in the TextureSampler
-            ts_path_param = ktnnode.getParameter('parameters.filename')
-            try:
-                file_path = str(ts_path_param.getValue(0))
-            except Exception as excp:
-                logger.warning("Cannot get the filepath for node {}: {}".format(ktnnode, excp))
-                continue  # skip to the next item
-
-            if file_path:
-                retex_node_dict[ktnnode] = [os.path.normpath(file_path), ts_path_param]
-
-    if retex_node_dict:
-        return retex_node_dict
-    else:
-        raise ValueError("No textures find in scene")
+    return common.get_texture_nodes(katana_node_type, get_texture_from_node, render_engine_name=name)
 
 
 def return_retex_from_path(file_path):
@@ -10,9 +10,8 @@ Katana script, tested on 3.6v4
 
 import logging
 import os
-import subprocess
 
-from Katana import NodegraphAPI
+from . import common
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -20,6 +19,8 @@ logger.setLevel(logging.INFO)
 name = "Redshift"
 re_tex_ext = ".rstexbin"
 support_re_baking = True
+# type of the Katana shading nodes created for this render engine
+katana_node_type = "RedshiftShadingNode"
 
 
 """ 
@@ -33,40 +34,65 @@ PATH_PATTERN = {
 }
 
 
+# Options used to build the bake command, a preset is applied over the default one, see common.get_bake_options()
+#   - gamma: "linear" (-l), "srgb" (-s) or None to let the processor decide
+#   - extra_args: arguments added as is to the command
+# redshiftTextureProcessor doesn't expose tile size, mip filter or thread count options.
+BAKE_PRESETS = {
+    "default": {"gamma": "linear",
+                "extra_args": []},
+    "srgb": {"gamma": "srgb"},
+}
+
+
 def _find_retexture_processor():
     """ Redshift specific
 
     Returns:
-        str: path to the redshiftTextureProcessor.exe
+        str or None: path to the redshiftTextureProcessor executable
     """
-    local_path = "C:\\Redshift\\bin\\redshiftTextureProcessor.exe"
-    if os.path.exists(local_path):
-        return local_path
+    candidate_paths = ["C:\\Redshift\\bin\\redshiftTextureProcessor.exe",
+                       "C:\\ProgramData\\Redshift\\bin\\redshiftTextureProcessor.exe",
+                       "$REDSHIFT_COREDATAPATH/bin/redshiftTextureProcessor",
+                       "/usr/redshift/bin/redshiftTextureProcessor",
+                       "/Applications/redshift/bin/redshiftTextureProcessor"]
+    return common.find_texture_processor("redshiftTextureProcessor", candidate_paths)
 
-    local_path02 = "C:\\ProgramData\\Redshift\\bin\\redshiftTextureProcessor.exe"
-    if os.path.exists(local_path02):
-        return local_path02
 
-    if support_re_baking:
-        raise RuntimeError("The renderengine texture processor cannot be found for {}".format(name))
-    else:
-        logger.info("The renderengine texture processor cannot be found for {} but re baking is disabled".format(
-            name
-        ))
+re_textool = _find_retexture_processor()
+if not re_textool:
+    logger.info("The renderengine texture processor cannot be found for {}, re baking is disabled".format(name))
+    support_re_baking = False
 
 
-re_textool = _find_retexture_processor()
+def build_bake_command(file_path, options):
+    """ The processor write the rstexbin next to the source texture.
+
+    Args:
+        file_path(str): file path to bake
+        options(dict): see BAKE_PRESETS
+
+    Returns:
+        list of str: command argument list
+    """
+    command = [re_textool, file_path]
+    if options.get("gamma") == "linear":
+        command.append("-l")
+    elif options.get("gamma") == "srgb":
+        command.append("-s")
+    command += list(options.get("extra_args") or [])
+    return command
 
 
-def bake_retex(file_path):
+def bake_retex(file_path, options=None):
     """ Bake the render engine texture of the given file_path
 
     Args:
         file_path(str):  file path to bake
+        options(dict or None): see BAKE_PRESETS, None to use the default preset
 
     Returns:
-        bool:
-            rstex_path if success else False if error
+        common.BakeResult: status, output path, exit code and output of the processor
     Raises:
         ValueError: if file_path arg is not a string
 
@@ -74,54 +100,35 @@ def bake_retex(file_path):
     if not isinstance(file_path, basestring):  # TODO python2 specific
         raise ValueError("filepath submitted is not a string but {}: {}".format(type(file_path), file_path))
 
-    command = "{} {} -l ".format(re_textool, file_path)
-    result = subprocess.check_output(command)
-    logger.debug("rstexprocessor result: {}".format(result))
+    command = build_bake_command(file_path, options=options or BAKE_PRESETS["default"])
+    return common.run_texture_processor(command, file_path, output_path=return_retex_from_path(file_path))
 
-    # check success of baking
-    source_path, filename = os.path.split(file_path)
-    basename, extension = os.path.splitext(filename)
-    rstex_path = os.path.join(source_path, "{}.rstexbin".format(basename))
-    if not os.path.exists(rstex_path):
-        return False
 
-    return rstex_path
+def get_texture_from_node(ktnnode):
+    """ Return the texture file path used by the given node if it's a Redshift texture node.
+    The path value and its expression flag are read in the same pass.
+
+    Args:
+        ktnnode(NodegraphAPI.Node): a node of type katana_node_type
+
+    Returns:
+        list or None: [file_path value, file_path_parameter, is_expression] or None if the node doesn't use a texture
+    """
+    node_type_value = common.get_node_type(ktnnode)
+    if node_type_value == "TextureSampler":
+        return common.read_texture_parameter(ktnnode, 'parameters.tex0.value')
+    return None
 
 
 def get_re_texture_nodes():
     """ Get all Redshift TextureSampler Nodes
 
     Returns:
-        dict: Dictionnary of KatanaNode:[file_path value, file_path_parameter]
-
+        dict: Dictionnary of KatanaNode: [file_path value, file_path_parameter, is_expression]
+    Raises:
+        ValueError
     """
-
-    texture_sampler_dict = {}  # init the dict
-
-    all_node_list = NodegraphAPI.GetAllNodesByType('RedshiftShadingNode', includeDeleted=False, sortByName=True)
-    for ktnnode in all_node_list:
-        # check if you can get the type of the node
-        try:
-            node_type_value = ktnnode.getParameter("nodeType").getValue(0)
-        except:
-            continue
-
-        if node_type_value == "TextureSampler":
-            # try to get the file_path in the TextureSampler
-            ts_path_param = ktnnode.getParameter('parameters.tex0.value')
-            try:
-                file_path = str(ts_path_param.getValue(0))
-            except Exception as excp:
-                logger.warning("Cannot get the filepath for node {}: {}".format(ktnnode, excp))
-                continue  # skip to the next item
-
-            if file_path:
-                texture_sampler_dict[ktnnode] = [os.path.normpath(file_path), ts_path_param]
-
-    if texture_sampler_dict:
-        return texture_sampler_dict
-    else:
-        raise ValueError("No textures find in scene")
+    return common.get_texture_nodes(katana_node_type, get_texture_from_node, render_engine_name=name)
 
 
 def return_retex_from_path(file_path):
@@ -12,7 +12,7 @@ Katana script, tested on 3.6v4
 import os
 import logging
 
-from Katana import NodegraphAPI
+from . import common
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -20,6 +20,8 @@ logger.setLevel(logging.INFO)
 name = "name of this file (the render engine name)"
 re_tex_ext = ".render engine texture extension"
 support_re_baking = False  # set to true to allow to bake the render engine texture
+# type of the Katana shading nodes created for this render engine
+katana_node_type = "________TO CHANGE______"
 
 """ 
 Could be also called token, they are used in file path to load multiple files in one path
@@ -33,37 +35,54 @@ PATH_PATTERN = {
     }
 
 
+# Options used to build the bake command, a preset is applied over the default one, see common.get_bake_options()
+# TODO change depending of the options supported by the TextureProcessor tool, a "default" preset is required
+BAKE_PRESETS = {
+    "default": {"extra_args": []},
+}
+
+
 def _find_retexture_processor():
     """ Return the path to the render engine texture processor tool
 
     Returns:
-        str: path to the TextureProcessor.exe tool
+        str or None: path to the TextureProcessor tool
     """
-    local_path = "___TO_REPLACE___"
-    if os.path.exists(local_path):
-        return local_path
-    else:
-        if support_re_baking:
-            raise RuntimeError("The renderengine texture processor cannot be found for {}".format(name))
-        else:
-            logger.info("The renderengine texture processor cannot be found for {} but re baking is disabled".format(
-                name
-            ))
+    # paths can contain environment variables and glob wildcards, the PATH is searched last
+    candidate_paths = ["___TO_REPLACE___"]
+    return common.find_texture_processor("___TO_REPLACE___", candidate_paths)
 
 
 re_textool = _find_retexture_processor()
+if not re_textool:
+    logger.info("The renderengine texture processor cannot be found for {}, re baking is disabled".format(name))
+    support_re_baking = False
+
+
+# TODO see Arnold.py for an example.
+def build_bake_command(file_path, options):
+    """
+    Args:
+        file_path(str): file path to bake
+        options(dict): see BAKE_PRESETS
+
+    Returns:
+        list of str: TextureProcessor argument list, never interpreted by a shell
+    """
+    command = [re_textool, file_path]
+    command += list(options.get("extra_args") or [])
+    return command
 
 
-# TODO see Redshift.py for an example.
-def bake_retex(file_path):
+def bake_retex(file_path, options=None):
     """ Bake the render engine texture of the given file_path using the TextureProcessor tool of the render engine
 
     Args:
         file_path(str):  file path to bake
+        options(dict or None): see BAKE_PRESETS, None to use the default preset
 
     Returns:
-        bool:
-            render engine texture path if success else False if error
+        common.BakeResult: status, output path, exit code and output of the processor
     Raises:
         ValueError: if file_path arg is not a string
 
@@ -71,43 +90,36 @@ def bake_retex(file_path):
     if not isinstance(file_path, basestring):  # TODO python2 specific
         raise ValueError("filepath submitted is not a string but {}: {}".format(type(file_path), file_path))
 
-    return
+    command = build_bake_command(file_path, options=options or BAKE_PRESETS["default"])
+    output_path = os.path.splitext(file_path)[0] + re_tex_ext
+    return common.run_texture_processor(command, file_path, output_path=output_path)
+
+
+def get_texture_from_node(ktnnode):
+    """ Return the texture file path used by the given node if it's a texture/file node.
+    The path value and its expression flag are read in the same pass.
+
+    Args:
+        ktnnode(NodegraphAPI.Node): a node of type katana_node_type
+
+    Returns:
+        list or None: [file_path value, file_path_parameter, is_expression] or None if the node doesn't use a texture
+    """
+    node_type_value = common.get_node_type(ktnnode)
+    if node_type_value == "________TO CHANGE______":
+        return common.read_texture_parameter(ktnnode, '________TO CHANGE______')
+    return None
 
 
 def get_re_texture_nodes():
     """ Get all Render Engine Katana Texture/File nodes
 
     Returns:
-        dict: Dictionnary of {KatanaNode:[file_path value, file_path_parameter]}
+        dict: Dictionnary of {KatanaNode: [file_path value, file_path_parameter, is_expression]}
     Raises:
         ValueError
     """
-    retex_node_dict = {}
-
-    all_node_list = NodegraphAPI.GetAllNodesByType('________TO CHANGE______', includeDeleted=False, sortByName=True)
-    for ktnnode in all_node_list:
-        # check if you can get the type of the node
-        try:
-            node_type_value = ktnnode.getParameter("nodeType").getValue(0)
-        except:
-            continue
-
-        if node_type_value == "________TO CHANGE______":
-            # try to get the file_path in the TextureSampler
-            ts_path_param = ktnnode.getParameter('________TO CHANGE______')
-            try:
-                file_path = str(ts_path_param.getValue(0))
-            except Exception as excp:
-                logger.warning("Cannot get the filepath for node {}: {}".format(ktnnode, excp))
-                continue  # skip to the next item
-
-            if file_path:
-                retex_node_dict[ktnnode] = [os.path.normpath(file_path), ts_path_param]
-
-    if retex_node_dict:
-        return retex_node_dict
-    else:
-        raise ValueError("No textures find in scene")
+    return common.get_texture_nodes(katana_node_type, get_texture_from_node, render_engine_name=name)
 
 
 def return_retex_from_path(file_path):
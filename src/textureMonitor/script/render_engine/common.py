@@ -10,59 +10,997 @@ Katana script:
 """
 
 import os
+import glob
+import time
+import errno
+import shutil
+import logging
+import tempfile
+import threading
+import subprocess
 
+try:
+    from shutil import which as _which
+except ImportError:  # python 2
+    from distutils.spawn import find_executable as _which
+
+from Katana import NodegraphAPI
 from PyQt5 import QtCore
 
+from .. import hashing
+from .. import image_header
+from .. import bake_manifest
+from .. import bake_journal
+from .. import bake_budget
+from .. import bake_stats
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TextureIssue:
+    """
+    Issues that can be found on a texture header and that make the render engine texture cache struggle.
+    """
+    untiled = "untiled"
+    unmipped = "unmipped"
+    oversized_tile = "oversized tile"
+    corrupted = "corrupted header"
+
+
+def get_node_type(ktnnode):
+    """
+    Args:
+        ktnnode(NodegraphAPI.Node):
+
+    Returns:
+        str or None: value of the nodeType parameter of a shading node, None if the node doesn't have one or if it
+            can't be read
+    """
+    node_type_param = ktnnode.getParameter("nodeType")
+    if node_type_param is None:
+        return None
+    try:
+        return node_type_param.getValue(0)
+    except Exception as excep:
+        logger.debug("[get_node_type] Can't read the nodeType of {}: {}".format(ktnnode.getName(), excep))
+        return None
+
+
+def read_texture_parameter(ktnnode, parameter_path):
+    """ Read in one pass the file path value and the expression flag of the texture parameter of a node, so the
+    parameter doesn't have to be queried again later.
+
+    Args:
+        ktnnode(NodegraphAPI.Node):
+        parameter_path(str): path of the file path parameter on the node, ex: "parameters.filename"
+
+    Returns:
+        list or None: [file_path value, file_path_parameter, is_expression] or None if the node doesn't have a path
+    """
+    ts_path_param = ktnnode.getParameter(parameter_path)
+    if ts_path_param is None:
+        return None
+    try:
+        file_path = str(ts_path_param.getValue(0))
+    except Exception as excp:
+        logger.warning("Cannot get the filepath for node {}: {}".format(ktnnode, excp))
+        return None
+
+    if not file_path:
+        return None
+    return [os.path.normpath(file_path), ts_path_param, bool(ts_path_param.isExpression())]
+
+
+def get_texture_nodes(katana_node_type, get_texture_from_node, render_engine_name=""):
+    """ Get the texture nodes of a render engine with a single traversal of its shading nodes.
+
+    Args:
+        katana_node_type(str): type of the Katana shading nodes of the render engine
+        get_texture_from_node(function): get_texture_from_node() of the render engine
+        render_engine_name(str): only used in the logs
+
+    Returns:
+        dict: {KatanaNode: [file_path value, file_path_parameter, is_expression]}
+    Raises:
+        ValueError: if no texture found
+    """
+    start_time = time.time()
+    texture_nodes = {}
+    all_node_list = NodegraphAPI.GetAllNodesByType(katana_node_type, includeDeleted=False, sortByName=True)
+    for ktnnode in all_node_list:
+        texture_data = get_texture_from_node(ktnnode)
+        if texture_data:
+            texture_nodes[ktnnode] = texture_data
+
+    logger.info("[get_texture_nodes] {}: {} textures found in {} nodes in {:.3f}s".format(
+        render_engine_name, len(texture_nodes), len(all_node_list), time.time() - start_time))
+    if not texture_nodes:
+        raise ValueError("No textures find in scene")
+    return texture_nodes
+
+
+def get_texture_nodes_by_engine(render_engines):
+    """ Get the texture nodes of all the given render engines with a single traversal of the node graph.
+    Each node is dispatched to the render engines using its node type.
+
+    Args:
+        render_engines(list of module): modules Representing a RenderEngine
+
+    Returns:
+        dict: {render engine name: {KatanaNode: [file_path value, file_path_parameter, is_expression]}}
+    Raises:
+        ValueError: if no texture found for any render engine
+    """
+    start_time = time.time()
+    engines_by_node_type = {}
+    for render_engine in render_engines:
+        engines_by_node_type.setdefault(render_engine.katana_node_type, []).append(render_engine)
 
-def is_retex_baked(file_path, render_engine):
+    nodes_by_engine = dict((render_engine.name, {}) for render_engine in render_engines)
+    all_node_list = NodegraphAPI.GetAllNodes(includeDeleted=False)
+    for ktnnode in all_node_list:
+        node_engines = engines_by_node_type.get(ktnnode.getType())
+        if not node_engines:
+            continue
+        for render_engine in node_engines:
+            texture_data = render_engine.get_texture_from_node(ktnnode)
+            if texture_data:
+                nodes_by_engine[render_engine.name][ktnnode] = texture_data
+                break  # a node can only be used by one render engine
+
+    logger.info("[get_texture_nodes_by_engine] {} textures found in {} nodes in {:.3f}s".format(
+        sum(len(texture_nodes) for texture_nodes in nodes_by_engine.values()), len(all_node_list),
+        time.time() - start_time))
+    if not any(nodes_by_engine.values()):
+        raise ValueError("No textures find in scene")
+    return nodes_by_engine
+
+
+def is_retex_baked(file_path, render_engine, manifest=None, stat_service=None):
     """ Return true if the render engine texture corresponding to the given file exists
     Render engine agnostic
 
     Args:
         render_engine (module):module Representing a RenderEngine
         file_path(str):
+        manifest(bake_manifest.ManifestSettings or None): if specified the retex must also match its bake manifest
+        stat_service(stat_service.StatService or None): if specified the existence checks use it (and its negative
+            cache)
 
     Returns:
         bool: True if the rstex corresponding to the given file exists
 
     """
-    if not os.path.exists(file_path):
+    path_exists = stat_service.exists if stat_service else os.path.exists
+    if not path_exists(file_path):
         return False  # TODO see to raise error
 
     retex_path = render_engine.return_retex_from_path(file_path=file_path)
-    return os.path.exists(retex_path)
+    if not retex_path or not path_exists(retex_path):
+        return False
+    if not manifest:
+        return True
+
+    status = bake_manifest.verify_manifest(file_path, retex_path, settings=manifest)
+    if status == bake_manifest.ManifestStatus.missing:
+        return not manifest.strict
+    if status != bake_manifest.ManifestStatus.valid:
+        logger.info("[is_retex_baked] {} is {}, it needs to be baked again".format(retex_path, status))
+    return status == bake_manifest.ManifestStatus.valid
+
+
+def is_retex_baked_many(file_paths, render_engine, manifest=None, stat_service=None, shared_index=None,
+                        refresh=False):
+    """ is_retex_baked() for several files, checked in parallel batches by the stat service.
+
+    Args:
+        file_paths(list of str):
+        render_engine (module):module Representing a RenderEngine
+        manifest(bake_manifest.ManifestSettings or None):
+        stat_service(stat_service.StatService or None): None to check the files one after the other
+        shared_index(shared_index.SharedIndex or None): states read first from it, the files checked are written
+            to it
+        refresh(bool): True to check all the files even if their state is in the shared index
+
+    Returns:
+        dict: {file path: bool}
+    """
+    def _is_baked(file_path):
+        return is_retex_baked(file_path, render_engine=render_engine, manifest=manifest, stat_service=stat_service)
+
+    # the state depends on the manifest verification, each mode has its own entries in the shared index
+    index_key = render_engine.name
+    if manifest:
+        index_key += ":manifest-strict" if manifest.strict else ":manifest"
+    results = {}
+    if shared_index is not None and not refresh:
+        results = shared_index.get_retex_states(file_paths, index_key)
+    file_paths = [file_path for file_path in file_paths if file_path not in results]
+
+    if stat_service is None:
+        checked = dict((file_path, _is_baked(file_path)) for file_path in file_paths)
+    else:
+        checked = stat_service.map(_is_baked, file_paths)
+
+    if shared_index is not None and checked:
+        shared_index.set_retex_states(checked, index_key)
+        shared_index.flush()
+    results.update(checked)
+    return results
+
+
+def get_texture_issues(file_path, max_tile_size, shared_index=None):
+    """ Inspect the header of the given file and return the issues that would make the render engine texture cache
+    thrash when this file is used for rendering.
+
+    Args:
+        file_path(str):
+        max_tile_size(int): tiles with a width or height above this value are considered oversized
+        shared_index(shared_index.SharedIndex or None): header read from it if the file didn't change
+
+    Returns:
+        list of str: list of TextureIssue values, empty if no issue or if the header can't be read
+    """
+    if shared_index is not None:
+        header = shared_index.read_image_header(file_path)
+    else:
+        header = image_header.read_image_header(file_path)
+    if header is None:
+        return []
+    if header.error:
+        return [TextureIssue.corrupted]
+
+    issues = []
+    if not header.tiled:
+        issues.append(TextureIssue.untiled)
+    elif max(header.tile_width or 0, header.tile_height or 0) > max_tile_size:
+        issues.append(TextureIssue.oversized_tile)
+    if not header.mipmapped:
+        issues.append(TextureIssue.unmipped)
+    return issues
+
+
+def get_retex_issues(file_path, render_engine, max_tile_size, shared_index=None):
+    """ Return the issues of the file that is going to be read at render time:
+    the render engine texture if it exists else the source texture.
+    Render engine agnostic
+
+    Args:
+        file_path(str): source texture path
+        render_engine (module):module Representing a RenderEngine
+        max_tile_size(int):
+        shared_index(shared_index.SharedIndex or None): headers read from it if the files didn't change
+
+    Returns:
+        dict: {"source": list of TextureIssue, "retex": list of TextureIssue or None if the retex doesn't exist}
+    """
+    result = {"source": get_texture_issues(file_path, max_tile_size=max_tile_size, shared_index=shared_index),
+              "retex": None}
+
+    retex_path = render_engine.return_retex_from_path(file_path=file_path)
+    if retex_path and os.path.exists(retex_path):
+        result["retex"] = get_texture_issues(retex_path, max_tile_size=max_tile_size, shared_index=shared_index)
+
+    return result
+
+
+def get_bake_priority(file_path, render_engine, max_tile_size):
+    """ Return a score used to sort the bake queue, the higher the sooner the file should be baked.
+
+    Args:
+        file_path(str): source texture path
+        render_engine (module):module Representing a RenderEngine
+        max_tile_size(int):
+
+    Returns:
+        int:
+    """
+    issues = get_retex_issues(file_path, render_engine=render_engine, max_tile_size=max_tile_size)
+    if issues["retex"] is None:
+        # no retex: the renderer is going to read the source directly
+        return len(issues["source"])
+    return len(issues["retex"])
+
+
+def sort_bake_queue(file_paths, render_engine, max_tile_size):
+    """ Sort the given file paths so the ones costing the most at render time are baked first.
+    The sort is stable so files with the same priority keep their order.
+
+    Args:
+        file_paths(list of str):
+        render_engine (module):module Representing a RenderEngine
+        max_tile_size(int):
+
+    Returns:
+        list of str: new sorted list
+    """
+    priorities = {}
+    for file_path in file_paths:
+        priorities[file_path] = get_bake_priority(file_path, render_engine=render_engine,
+                                                  max_tile_size=max_tile_size)
+    logger.debug("[sort_bake_queue] priorities: {}".format(priorities))
+    return sorted(file_paths, key=lambda path: priorities[path], reverse=True)
+
+
+def get_retex_target_path(file_path, render_engine):
+    """ Return the path where the render engine texture of the given file is written when baked.
+    Unlike render_engine.return_retex_from_path() the returned path doesn't need to exist.
+
+    Args:
+        file_path(str): source texture path
+        render_engine (module):module Representing a RenderEngine
+
+    Returns:
+        str:
+    """
+    source_path, filename = os.path.split(file_path)
+    basename, _extension = os.path.splitext(filename)
+    return os.path.join(source_path, "{}{}".format(basename, render_engine.re_tex_ext))
+
+
+def find_texture_processor(executable, candidate_paths=None):
+    """ Find the render engine texture processor: the candidate paths are checked in order then the PATH.
+
+    Args:
+        executable(str): name of the processor executable without extension, ex: maketx
+        candidate_paths(list of str or None): paths that can contain environment variables and glob wildcards,
+            if a candidate match several paths the last one in alphabetical order (usually the newest version) is used
+
+    Returns:
+        str or None: None if the processor cannot be found
+    """
+    for candidate_path in candidate_paths or []:
+        matches = sorted(glob.glob(os.path.expandvars(candidate_path)))
+        matches = [match for match in matches if os.path.isfile(match)]
+        if matches:
+            return matches[-1]
+    return _which(executable)
+
+
+def get_bake_options(render_engine, preset=None, overrides=None):
+    """ Return the options used to build the bake command of the given render engine.
+
+    Args:
+        render_engine (module):module Representing a RenderEngine
+        preset(str or None): key of render_engine.BAKE_PRESETS applied over the default preset
+        overrides(dict or None): options applied over the preset
+
+    Returns:
+        dict:
+    """
+    options = dict(render_engine.BAKE_PRESETS["default"])
+    if preset and preset != "default":
+        if preset in render_engine.BAKE_PRESETS:
+            options.update(render_engine.BAKE_PRESETS[preset])
+        else:
+            logger.warning("[get_bake_options] No bake preset {} for {}, default used".format(preset,
+                                                                                              render_engine.name))
+    options.update(overrides or {})
+    return options
+
+
+def supports_thread_count(render_engine):
+    """
+    Returns:
+        bool: True if the thread count of the render engine texture processor can be specified in the bake options
+    """
+    return "threads" in render_engine.BAKE_PRESETS["default"]
+
+
+def get_thread_policy(render_engine, cores=0, calibration_path=None, small_file_size=None, large_file_size=None):
+    """ Build the thread policy used to bake in parallel with the given render engine.
+
+    Args:
+        render_engine (module):module Representing a RenderEngine
+        cores(int): cores used by the bake, 0 for all the cores of the host
+        calibration_path(str or None): json file storing the calibrations, see bake_budget.calibrate()
+        small_file_size(int or None): see bake_budget.ThreadPolicy
+        large_file_size(int or None): see bake_budget.ThreadPolicy
+
+    Returns:
+        bake_budget.ThreadPolicy:
+    """
+    kwargs = {}
+    if small_file_size:
+        kwargs["small_file_size"] = small_file_size
+    if large_file_size:
+        kwargs["large_file_size"] = large_file_size
+    return bake_budget.ThreadPolicy(bake_budget.get_core_count(cores),
+                                    supports_thread_count=supports_thread_count(render_engine),
+                                    calibration=bake_budget.load_calibration(calibration_path, render_engine.name),
+                                    **kwargs)
+
+
+def calibrate_bake(render_engine, sample_paths, calibration_path, cores=0, bake_options=None):
+    """ Measure the bake throughput of the given render engine for several concurrency levels on the current host
+    and store the optimum. The sample files are baked once per concurrency level.
+    The samples are linked (copied if links are not supported) in a temporary directory so the bakes don't replace
+    the render engine textures in production, which would then have no manifest nor journal entry.
+
+    Args:
+        render_engine (module):module Representing a RenderEngine
+        sample_paths(list of str): source textures of representative sizes
+        calibration_path(str): json file storing the calibrations
+        cores(int): cores used by the bake, 0 for all the cores of the host
+        bake_options(dict or None): see get_bake_options()
+
+    Returns:
+        dict: see bake_budget.calibrate()
+    """
+    def bake_function(file_path, threads):
+        options = dict(bake_options or get_bake_options(render_engine))
+        if supports_thread_count(render_engine):
+            options["threads"] = threads
+        render_engine.bake_retex(file_path, options=options)
+
+    temp_dir = tempfile.mkdtemp(prefix="textureMonitor_calibration_")
+    try:
+        temp_paths = []
+        for index, sample_path in enumerate(sample_paths):
+            temp_path = os.path.join(temp_dir, "{}_{}".format(index, os.path.basename(sample_path)))
+            if hasattr(os, "symlink"):
+                os.symlink(os.path.abspath(sample_path), temp_path)
+            else:
+                shutil.copy2(sample_path, temp_path)
+            temp_paths.append(temp_path)
+        calibration = bake_budget.calibrate(temp_paths, bake_function, cores=bake_budget.get_core_count(cores))
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    bake_budget.save_calibration(calibration_path, render_engine.name, calibration)
+    logger.info("[calibrate_bake] {} on this host: {} jobs of {} threads, {:.1f} MB/s".format(
+        render_engine.name, calibration["concurrency"], calibration["job_threads"], calibration["throughput"]))
+    return calibration
+
+
+class BakeStatus:
+    """
+    Outcome of the bake of one file
+    """
+    success = "success"
+    failed = "failed"  # the processor exited with an error code
+    no_output = "no output"  # the processor exited without error but the output is missing or empty
+    exception = "exception"  # the processor couldn't be run or bake_retex raised
+
+
+class BakeResult(object):
+    """
+    Result of the bake of one file, returned by render_engine.bake_retex()
+    """
+
+    # the files are often on NFS/SMB shares, these errors usually disappear when trying again
+    transient_errnos = set(code for code in [getattr(errno, name, None) for name in
+                                             ("ESTALE", "EIO", "EAGAIN", "EBUSY", "ETIMEDOUT", "EINTR")] if code)
+    transient_messages = ("stale file handle", "input/output error", "resource temporarily unavailable",
+                          "device or resource busy", "timed out")
+    tail_lines = 10  # lines of the processor output kept
+
+    def __init__(self, file_path, status, output_path=None, exit_code=None, output="", duration=0.0, error=None,
+                 error_code=None):
+        """
+        Args:
+            file_path(str): source texture path
+            status(str): BakeStatus value
+            output_path(str or None): render engine texture baked
+            exit_code(int or None): processor exit code, None if it didn't run
+            output(str): processor stderr (or stdout if nothing on stderr), only the last lines are kept
+            duration(float): seconds
+            error(str or None): exception message
+            error_code(int or None): errno of the exception if any
+        """
+        self.file_path = file_path
+        self.status = status
+        self.output_path = output_path
+        self.exit_code = exit_code
+        self.output_tail = "\n".join((output or "").strip().splitlines()[-self.tail_lines:])
+        self.duration = duration
+        self.error = error
+        self.error_code = error_code
+        self.attempts = 1
+
+    def __repr__(self):
+        return "BakeResult({}, {}, exit code {})".format(self.file_path, self.status, self.exit_code)
+
+    @property
+    def succeeded(self):
+        return self.status == BakeStatus.success
+
+    @property
+    def transient(self):
+        """
+        Returns:
+            bool: True if the failure looks due to the filesystem and might not happen again
+        """
+        if self.succeeded:
+            return False
+        if self.error_code in self.transient_errnos:
+            return True
+        if self.status == BakeStatus.no_output:
+            return True  # the output might not be visible yet on a network share
+        message = "{} {}".format(self.output_tail, self.error or "").lower()
+        return any(transient_message in message for transient_message in self.transient_messages)
+
+    def get_description(self):
+        """
+        Returns:
+            str: human readable description of the failure
+        """
+        if self.succeeded:
+            return "baked in {:.1f}s".format(self.duration)
+        description = self.status
+        if self.exit_code is not None:
+            description += ", exit code {}".format(self.exit_code)
+        if self.error:
+            description += ": {}".format(self.error)
+        if self.attempts > 1:
+            description += " ({} attempts)".format(self.attempts)
+        if self.output_tail:
+            description += "\n    " + self.output_tail.replace("\n", "\n    ")
+        return description
+
+    def to_dict(self):
+        return {"file_path": self.file_path,
+                "status": self.status,
+                "output_path": self.output_path,
+                "exit_code": self.exit_code,
+                "output_tail": self.output_tail,
+                "duration": self.duration,
+                "error": self.error,
+                "attempts": self.attempts}
+
+
+class RetryPolicy(object):
+    """
+    How many times and how long to wait before baking again a file which failed with a transient error.
+    """
+
+    def __init__(self, max_attempts=3, delay=2.0, backoff=2.0):
+        """
+        Args:
+            max_attempts(int): total number of attempts including the first one
+            delay(float): seconds to wait before the first retry
+            backoff(float): the delay is multiplied by this factor after each retry
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.delay = delay
+        self.backoff = backoff
+
+    def get_delay(self, attempt):
+        """
+        Args:
+            attempt(int): number of the attempt that just failed, starting at 1
+
+        Returns:
+            float: seconds to wait before the next attempt
+        """
+        return self.delay * (self.backoff ** (attempt - 1))
+
+
+def run_texture_processor(command, file_path, output_path):
+    """ Run the given texture processor command and check the output has been written.
+    The command is an argument list, it's never interpreted by a shell so paths can contain spaces.
+
+    Args:
+        command(list of str): processor path followed by its arguments
+        file_path(str): source texture path
+        output_path(str): render engine texture path written by the command
+
+    Returns:
+        BakeResult:
+    """
+    logger.debug("[run_texture_processor] {}".format(subprocess.list2cmdline(command)))
+    start_time = time.time()
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate()
+    except OSError as excp:
+        logger.error("[run_texture_processor] Cannot run {}: {}".format(command[0], excp))
+        return BakeResult(file_path, BakeStatus.exception, error=str(excp), error_code=excp.errno,
+                          duration=time.time() - start_time)
+
+    duration = time.time() - start_time
+    output = (stderr or stdout or b"").decode("utf-8", "replace")
+    logger.debug("[run_texture_processor] result: {}".format(output))
+    if process.returncode != 0:
+        logger.error("[run_texture_processor] {} exited with code {}: {}".format(command[0], process.returncode,
+                                                                               output))
+        return BakeResult(file_path, BakeStatus.failed, exit_code=process.returncode, output=output,
+                          duration=duration)
+
+    if not os.path.exists(output_path) or not os.path.getsize(output_path):
+        return BakeResult(file_path, BakeStatus.no_output, exit_code=process.returncode, output=output,
+                          duration=duration)
+    return BakeResult(file_path, BakeStatus.success, output_path=output_path, exit_code=process.returncode,
+                      output=output, duration=duration)
+
+
+def collapse_duplicates(file_paths, duplicate_groups):
+    """ Keep only one file per group of identical files so each content is baked once.
+
+    Args:
+        file_paths(list of str): files to bake
+        duplicate_groups(dict): {file_path: list of file paths with the same content (including itself)}
+
+    Returns:
+        tuple: (list of file paths to bake, {baked file path: list of duplicates file paths to propagate to})
+    """
+    files2bake = []
+    duplicates = {}
+    representatives = {}  # {group as tuple: file path baked for this group}
+    for file_path in file_paths:
+        group = duplicate_groups.get(file_path)
+        if not group:
+            files2bake.append(file_path)
+            continue
+        group = tuple(group)
+        if group in representatives:
+            duplicates[representatives[group]].append(file_path)
+        else:
+            representatives[group] = file_path
+            duplicates[file_path] = []
+            files2bake.append(file_path)
+
+    return files2bake, dict((path, dups) for path, dups in duplicates.items() if dups)
+
+
+def propagate_retex(retex_path, duplicate_paths, render_engine):
+    """ Make the render engine texture baked for a file available for its identical duplicates.
+    A hardlink is created when possible else the retex file is copied.
+
+    Args:
+        retex_path(str): baked render engine texture path
+        duplicate_paths(list of str): source texture paths with the same content as the baked source
+        render_engine (module):module Representing a RenderEngine
+
+    Returns:
+        list of str: duplicates file paths for which the propagation failed
+    """
+    errors = []
+    for duplicate_path in duplicate_paths:
+        target_path = get_retex_target_path(duplicate_path, render_engine=render_engine)
+        try:
+            if os.path.exists(target_path):
+                os.remove(target_path)
+            try:
+                os.link(retex_path, target_path)
+            except (AttributeError, OSError):  # not supported by the OS/filesystem or cross-device
+                shutil.copy2(retex_path, target_path)
+        except (IOError, OSError) as excp:
+            logger.error("[propagate_retex] Cannot propagate {} to {}: {}".format(retex_path, target_path, excp))
+            errors.append(duplicate_path)
+
+    return errors
+
+
+# To use in a QThread
+class BakeCalibration(QtCore.QObject):
+    finished = QtCore.pyqtSignal(dict)
+
+    def __init__(self, sample_paths, render_engine, calibration_path, cores=0, bake_options=None):
+        """ See calibrate_bake()
+        """
+        super(BakeCalibration, self).__init__()
+        self.sample_paths = sample_paths
+        self.render_engine = render_engine
+        self.calibration_path = calibration_path
+        self.cores = cores
+        self.bake_options = bake_options
+
+    def calibrate(self):
+        """
+        Emit:
+        finished(dict): the calibration stored, empty if it failed
+        """
+        try:
+            calibration = calibrate_bake(self.render_engine, self.sample_paths, self.calibration_path,
+                                         cores=self.cores, bake_options=self.bake_options)
+        except (IOError, OSError) as excp:
+            logger.error("[BakeCalibration] Calibration failed: {}".format(excp))
+            calibration = {}
+        self.finished.emit(calibration)
+
+
+class FindDuplicates(QtCore.QObject):
+    finished = QtCore.pyqtSignal(list)
+
+    def __init__(self, file_paths, workers=4, cache_path=None):
+        """ See hashing.find_duplicates()
+
+        Args:
+            file_paths(list of str):
+            workers(int): number of threads used for hashing
+            cache_path(str or None): json file of the hash cache
+        """
+        super(FindDuplicates, self).__init__()
+        self.file_paths = file_paths
+        self.workers = workers
+        self.cache_path = cache_path
+
+    def find(self):
+        """
+        Emit:
+        finished(list): groups of file paths with identical content
+        """
+        groups = hashing.find_duplicates(self.file_paths, workers=self.workers,
+                                         cache=hashing.HashCache(self.cache_path))
+        self.finished.emit(groups)
 
 
 # To use in a QThread
 class ReTexBake(QtCore.QObject):
     file_processed = QtCore.pyqtSignal(str)
+    job_finished = QtCore.pyqtSignal(dict)  # bake_stats.JobTiming.to_dict() of each file baked
     finished = QtCore.pyqtSignal(list, bool)
 
-    def __init__(self, file_paths, render_engine):
+    def __init__(self, file_paths, render_engine, max_tile_size=None, duplicates=None, manifest=None, journal=None,
+                 bake_options=None, thread_policy=None, retry_policy=None, stat_service=None):
         """ RenderEngine agnostic
 
         Args:
             render_engine (class): class item Representing a RenderEngine
             file_paths(list or tuple):  iterable of file path to bake to an rstex
+            max_tile_size(int or None): if specified the file paths are sorted by bake priority before baking
+            duplicates(dict or None): {file_path: list of identical file paths}, the retex baked for file_path is
+                linked/copied to its duplicates instead of baking them. See collapse_duplicates()
+            manifest(bake_manifest.ManifestSettings or None): if specified a bake manifest is written for each
+                render engine texture baked
+            journal(bake_journal.BakeJournal or None): if specified the session is journaled so it can be resumed
+                if interrupted
+            bake_options(dict or None): options used to build the bake command, see get_bake_options().
+                None to use the render engine default preset.
+            thread_policy(bake_budget.ThreadPolicy or None): if specified the files are baked in parallel sharing
+                the cores of the policy, else they are baked one after the other with the bake options threads.
+            retry_policy(RetryPolicy or None): if specified the files failing with a transient error are baked again
+            stat_service(stat_service.StatService or None): if specified the render engine textures written are
+                invalidated in its negative cache
         """
         super(ReTexBake, self).__init__()
         self.file_paths = file_paths
-        self.error_list = []
+        self.error_list = []  # file paths that failed to bake or to be propagated
+        self.results = {}  # {file path: BakeResult} of the files baked
+        self._results_lock = threading.Lock()  # error_list and results are filled by several threads
         self.abort = False
         self.render_engine = render_engine
+        self.max_tile_size = max_tile_size
+        self.duplicates = duplicates or {}
+        self.manifest = manifest
+        self.journal = journal
+        self.bake_options = bake_options
+        self.thread_policy = thread_policy
+        self.retry_policy = retry_policy
+        self.stat_service = stat_service
 
     def bake(self):
         """
 
         Emit:
-        finished(list): list of file path that didn't get converted if any
+        finished(list, bool): list of file path that didn't get converted if any (details in self.results),
+            True if aborted
         """
-        for file2bake in self.file_paths:
-            if self.abort:
-                break  # stop the loop and emit finished
-            bake_result = self.render_engine.bake_retex(file2bake)  # bool
-            if not bake_result:
-                self.error_list.append(bake_result)
-            self.file_processed.emit(file2bake)
+        if self.max_tile_size:
+            self.file_paths = sort_bake_queue(self.file_paths, render_engine=self.render_engine,
+                                              max_tile_size=self.max_tile_size)
+        if self.journal:
+            self._open_journal()
+
+        if self.thread_policy:
+            bake_budget.run_jobs(self.file_paths, self._bake_file, policy=self.thread_policy,
+                                 abort_function=lambda: self.abort)
+        else:
+            for file2bake in self.file_paths:
+                if self.abort:
+                    break  # stop the loop and emit finished
+                self._bake_file(file2bake)
 
+        if self.journal:
+            self.journal.close(completed=not self.abort)
         self.finished.emit(self.error_list, self.abort)
+
+    def _bake_file(self, file2bake, threads=None):
+        """ Bake one file, propagate it to its duplicates and write its manifests and journal entries.
+        Can be called from several threads at the same time.
+
+        Args:
+            file2bake(str): source texture path
+            threads(int or None): thread count given to the processor, None to use the bake options one
+        """
+        options = self.bake_options
+        if threads is not None and supports_thread_count(self.render_engine):
+            options = dict(options or get_bake_options(self.render_engine))
+            options["threads"] = threads
+
+        if self.journal:
+            self._journal_start(file2bake)
+        start_time = time.time()
+        result = self._bake_with_retry(file2bake, options=options)
+        with self._results_lock:
+            self.results[file2bake] = result
+        if self.stat_service:
+            # even a failed bake can leave a partial output
+            self.stat_service.invalidate(result.output_path or get_retex_target_path(file2bake,
+                                                                                     render_engine=self.render_engine))
+        bake_result = result.output_path if result.succeeded else False
+        job = bake_stats.JobTiming(file2bake, size=bake_budget.get_file_size(file2bake),
+                                   duration=time.time() - start_time, threads=threads, success=result.succeeded)
+        if not bake_result:
+            with self._results_lock:
+                self.error_list.append(file2bake)
+        self.job_finished.emit(job.to_dict())
+        self.file_processed.emit(file2bake)
+
+        duplicate_paths = self.duplicates.get(file2bake, [])
+        if not bake_result and duplicate_paths:
+            # the duplicates share the failure of the file baked for them
+            with self._results_lock:
+                self.error_list += duplicate_paths
+                for duplicate_path in duplicate_paths:
+                    self.results[duplicate_path] = result
+        if bake_result and duplicate_paths:
+            dup_errors = propagate_retex(bake_result, duplicate_paths, render_engine=self.render_engine)
+            with self._results_lock:
+                self.error_list += dup_errors
+            duplicate_paths = [dup_path for dup_path in duplicate_paths if dup_path not in dup_errors]
+            if self.stat_service:
+                for duplicate_path in duplicate_paths:
+                    self.stat_service.invalidate(get_retex_target_path(duplicate_path,
+                                                                       render_engine=self.render_engine))
+        if bake_result and self.manifest:
+            self._write_manifests(file2bake, bake_result, duplicate_paths)
+        for duplicate_path in duplicate_paths:
+            self.file_processed.emit(duplicate_path)
+        if self.journal:
+            self._journal_result(file2bake, bake_result, duplicate_paths)
+
+    def _bake_with_retry(self, file2bake, options):
+        """ Bake the file, again if it failed with a transient error and the retry policy allows it.
+        Exceptions raised by the render engine are returned as a failed result so the other files are still baked.
+
+        Returns:
+            BakeResult:
+        """
+        attempt = 1
+        while True:
+            try:
+                result = self.render_engine.bake_retex(file2bake, options=options)
+            except Exception as excp:
+                logger.exception("[ReTexBake] Unexpected error while baking {}".format(file2bake))
+                result = BakeResult(file2bake, BakeStatus.exception, error="{}: {}".format(type(excp).__name__, excp),
+                                    error_code=getattr(excp, "errno", None))
+            result.attempts = attempt
+
+            if (result.succeeded or not result.transient or not self.retry_policy or self.abort or
+                    attempt >= self.retry_policy.max_attempts):
+                if not result.succeeded:
+                    logger.error("[ReTexBake] {}: {}".format(file2bake, result.get_description()))
+                return result
+
+            delay = self.retry_policy.get_delay(attempt)
+            logger.warning("[ReTexBake] {} failed ({}), trying again in {:.1f}s".format(file2bake, result.status,
+                                                                                        delay))
+            time.sleep(delay)
+            attempt += 1
+
+    def _open_journal(self):
+        """ The plan include the duplicates so they are still processed if the session is resumed.
+        A session that can't be journaled is still baked.
+        """
+        plan = list(self.file_paths)
+        for file_path in self.file_paths:
+            plan += self.duplicates.get(file_path, [])
+        try:
+            self.journal.open(plan, render_engine_name=self.render_engine.name)
+        except (IOError, OSError) as excp:
+            logger.error("[ReTexBake] Cannot write the bake journal, the session won't be resumable: {}".format(excp))
+            self.journal = None
+
+    def _journal_start(self, file_path):
+        try:
+            self.journal.start(file_path, get_retex_target_path(file_path, render_engine=self.render_engine))
+        except (IOError, OSError) as excp:
+            logger.error("[ReTexBake] Cannot write the bake journal: {}".format(excp))
+
+    def _journal_result(self, file_path, retex_path, duplicate_paths):
+        """ Record the file as done once its retex, the propagation to its duplicates and the manifests are written.
+
+        Args:
+            file_path(str): source texture baked
+            retex_path(str or bool): render engine texture baked, False if the bake failed
+            duplicate_paths(list of str): identical source textures the retex has been propagated to, or that failed
+                with the file if the bake failed
+        """
+        try:
+            if not retex_path:
+                for failed_path in [file_path] + duplicate_paths:
+                    self.journal.failed(failed_path)
+                return
+            self.journal.done(file_path, retex_path)
+            for duplicate_path in duplicate_paths:
+                self.journal.done(duplicate_path,
+                                  get_retex_target_path(duplicate_path, render_engine=self.render_engine))
+        except (IOError, OSError) as excp:
+            logger.error("[ReTexBake] Cannot write the bake journal: {}".format(excp))
+
+    def _write_manifests(self, file_path, retex_path, duplicate_paths):
+        """ Write the bake manifest of a baked file and of its duplicates which share the same hashes.
+
+        Args:
+            file_path(str): source texture baked
+            retex_path(str): render engine texture baked
+            duplicate_paths(list of str): identical source textures the retex has been propagated to
+        """
+        try:
+            baked = bake_manifest.write_manifest(file_path, retex_path, render_engine=self.render_engine,
+                                                 settings=self.manifest)
+            for duplicate_path in duplicate_paths:
+                bake_manifest.write_manifest(duplicate_path,
+                                             get_retex_target_path(duplicate_path, render_engine=self.render_engine),
+                                             render_engine=self.render_engine,
+                                             settings=self.manifest,
+                                             source_hash=baked["source"]["hash"],
+                                             output_hash=baked["output"]["hash"])
+        except (IOError, OSError) as excp:
+            logger.error("[ReTexBake] Cannot write the bake manifest for {}: {}".format(retex_path, excp))
+
+
+def get_resumable_bake_session(journal_dir, render_engine, manifest=None):
+    """ Return the interrupted bake session of the given render engine if any, a session still running in an other
+    Katana is ignored. Nothing is deleted: the partial outputs and, if the manifests are enabled, the outputs of the
+    completed files which don't match their manifest are listed in session.discarded, to be deleted with
+    bake_journal.discard_outputs() if the session is resumed.
+
+    Args:
+        journal_dir(str): directory where the journals are written
+        render_engine (module):module Representing a RenderEngine
+        manifest(bake_manifest.ManifestSettings or None):
+
+    Returns:
+        bake_journal.BakeSession or None:
+    """
+    verify_output = None
+    if manifest:
+        def verify_output(source_path, output_path):
+            status = bake_manifest.verify_manifest(source_path, output_path, settings=manifest)
+            if status == bake_manifest.ManifestStatus.missing:
+                return not manifest.strict
+            return status == bake_manifest.ManifestStatus.valid
+
+    journal_path = bake_journal.get_journal_path(journal_dir, render_engine.name)
+    return bake_journal.get_resumable_session(journal_path, verify_output=verify_output)
+
+
+def resume_bake_session(journal_dir, render_engine, manifest=None, max_tile_size=None, bake_options=None,
+                        thread_policy=None, retry_policy=None):
+    """ Resume the interrupted bake session of the given render engine in the current thread.
+    To use from a Katana script without interface, ex: katana --script resume.py
+
+    Args:
+        journal_dir(str): directory where the journals are written
+        render_engine (module):module Representing a RenderEngine
+        manifest(bake_manifest.ManifestSettings or None):
+        max_tile_size(int or None): see ReTexBake
+        bake_options(dict or None): see ReTexBake
+        thread_policy(bake_budget.ThreadPolicy or None): see ReTexBake
+        retry_policy(RetryPolicy or None): see ReTexBake
+
+    Returns:
+        list or None: files that failed to bake, None if there was no session to resume
+    """
+    session = get_resumable_bake_session(journal_dir, render_engine=render_engine, manifest=manifest)
+    if session is None:
+        logger.info("[resume_bake_session] No bake session to resume for {}".format(render_engine.name))
+        return None
+
+    logger.info("[resume_bake_session] Resuming {}".format(session))
+    bake_journal.discard_outputs(session)
+    errors = []
+    worker = ReTexBake(file_paths=session.remaining,
+                       render_engine=render_engine,
+                       max_tile_size=max_tile_size,
+                       manifest=manifest,
+                       journal=bake_journal.BakeJournal(session.journal_path),
+                       bake_options=bake_options,
+                       thread_policy=thread_policy,
+                       retry_policy=retry_policy)
+    worker.finished.connect(lambda error_list, _aborted: errors.extend(error_list))
+    worker.bake()
+    return errors
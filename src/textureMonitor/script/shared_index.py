@@ -0,0 +1,308 @@
+"""
+Index shared by all the artists of a show, in a SQLite file on the shared filesystem.
+
+The scenes of a show use the same texture library: instead of each monitor listing the same directories, checking
+the same render engine textures and reading the same image headers, the results are written in the index and read
+back by the next scan, whoever did it.
+
+- directory listings are valid while the directory mtime is unchanged: a single stat instead of a listing. A listing
+  done less than LISTING_MIN_AGE seconds after the mtime is not trusted: with the 1s mtime granularity of some
+  network filesystems, a file created in the same second doesn't change the mtime.
+- image headers are valid while the file mtime and size are unchanged: a stat instead of opening the file.
+- render engine texture states are valid for retex_ttl seconds: the bakes done with the tool update them right away,
+  a texture deleted outside the tool is seen after the ttl.
+
+Writes are buffered and committed in one transaction by flush(). Any database error disables the index for the
+session: the monitor then works as without it.
+
+All python version
+All OS
+"""
+
+import os
+import sys
+import time
+import json
+import logging
+import sqlite3
+import threading
+
+from . import image_header
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+SCHEMA_VERSION = 1
+LISTING_MIN_AGE = 2.0  # seconds between the directory mtime and its listing for the listing to be trusted
+_QUERY_CHUNK = 500  # parameters per query, SQLite default limit is 999
+_FS_ENCODING = sys.getfilesystemencoding() or "utf-8"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (directory TEXT PRIMARY KEY, mtime REAL, filenames TEXT, updated REAL);
+CREATE TABLE IF NOT EXISTS retex (file_path TEXT, render_engine TEXT, baked INTEGER, updated REAL,
+                                  PRIMARY KEY (file_path, render_engine));
+CREATE TABLE IF NOT EXISTS headers (file_path TEXT PRIMARY KEY, mtime REAL, size INTEGER, header TEXT,
+                                    updated REAL);
+"""
+
+_HEADER_FIELDS = ["image_format", "width", "height", "tiled", "tile_width", "tile_height", "mip_levels", "error"]
+
+
+def _to_text(path):
+    """ sqlite3 of Python 2 refuses the byte strings that are not ASCII, the paths are bound as unicode.
+
+    Raises:
+        UnicodeDecodeError: if the path is not valid in the filesystem encoding
+    """
+    if isinstance(path, bytes):
+        return path.decode(_FS_ENCODING)
+    return path
+
+
+def _from_text(text, like):
+    """ Encode back a path read from the database if the caller use byte strings (Python 2 str).
+    """
+    if isinstance(like, bytes) and not isinstance(text, bytes):
+        return text.encode(_FS_ENCODING)
+    return text
+
+
+class SharedIndex(object):
+    """
+    Directory listings, render engine texture states and image headers shared between the monitors.
+    """
+
+    def __init__(self, db_path, retex_ttl=3600.0, timeout=10.0):
+        """
+        Args:
+            db_path(str): SQLite file, created if it doesn't exist
+            retex_ttl(float): seconds a render engine texture state is used without being checked again
+            timeout(float): seconds to wait for a monitor writing in the index
+        """
+        self.db_path = db_path
+        self.retex_ttl = retex_ttl
+        self.timeout = timeout
+        self._connection = None
+        self._disabled = False
+        self._pending = {"listings": {}, "retex": {}, "headers": {}}  # {table: {primary key: row}}
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        return "SharedIndex({})".format(self.db_path)
+
+    @property
+    def enabled(self):
+        return not self._disabled
+
+    def _get_connection(self):
+        """
+        Returns:
+            sqlite3.Connection or None: None if the index is disabled
+        """
+        if self._disabled:
+            return None
+        if self._connection is None:
+            try:
+                db_dir = os.path.dirname(self.db_path)
+                if db_dir and not os.path.exists(db_dir):
+                    os.makedirs(db_dir)
+                self._connection = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+                version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+                if version not in (0, SCHEMA_VERSION):
+                    raise sqlite3.DatabaseError("schema version {} is not supported".format(version))
+                self._connection.executescript(_SCHEMA)
+                self._connection.execute("PRAGMA user_version = {}".format(SCHEMA_VERSION))
+                self._connection.commit()
+            except (sqlite3.Error, IOError, OSError) as excp:
+                self._disable(excp)
+        return self._connection
+
+    def _disable(self, excp):
+        logger.warning("[SharedIndex] {} disabled for this session: {}".format(self.db_path, excp))
+        self._disabled = True
+        self._pending = {"listings": {}, "retex": {}, "headers": {}}
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except sqlite3.Error:
+                pass
+            self._connection = None
+
+    def _select(self, query, parameters=()):
+        """
+        Returns:
+            list of tuple: rows found, empty if the index is disabled
+        """
+        with self._lock:
+            connection = self._get_connection()
+            if connection is None:
+                return []
+            try:
+                return connection.execute(query, parameters).fetchall()
+            except sqlite3.Error as excp:
+                self._disable(excp)
+                return []
+
+    def flush(self):
+        """ Write the pending entries in the database, in a single transaction.
+        """
+        with self._lock:
+            pending = self._pending
+            if not any(pending.values()):
+                return
+            self._pending = {"listings": {}, "retex": {}, "headers": {}}
+            connection = self._get_connection()
+            if connection is None:
+                return
+            try:
+                with connection:
+                    connection.executemany("INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?)",
+                                           pending["listings"].values())
+                    connection.executemany("INSERT OR REPLACE INTO retex VALUES (?, ?, ?, ?)",
+                                           pending["retex"].values())
+                    connection.executemany("INSERT OR REPLACE INTO headers VALUES (?, ?, ?, ?, ?)",
+                                           pending["headers"].values())
+            except sqlite3.Error as excp:
+                self._disable(excp)
+                return
+        logger.debug("[SharedIndex] {} entries written".format(sum(len(rows) for rows in pending.values())))
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    # directory listings
+
+    def get_listing(self, directory, mtime):
+        """
+        Args:
+            directory(str):
+            mtime(float): current modification time of the directory
+
+        Returns:
+            frozenset or None: names of the directory content, None if not indexed, outdated or listed too close to
+                the mtime
+        """
+        try:
+            directory_text = _to_text(directory)
+        except UnicodeDecodeError:
+            return None
+        with self._lock:
+            row = self._pending["listings"].get(directory_text)
+        if row is None:
+            rows = self._select("SELECT directory, mtime, filenames, updated FROM listings WHERE directory = ?",
+                                (directory_text,))
+            row = rows[0] if rows else None
+        if row is None or row[1] != mtime or row[3] - row[1] < LISTING_MIN_AGE:
+            return None
+        return frozenset(_from_text(name, directory) for name in row[2].split("\n") if name)
+
+    def set_listing(self, directory, mtime, filenames):
+        """
+        Args:
+            directory(str):
+            mtime(float): modification time of the directory before it was listed
+            filenames(iterable of str):
+        """
+        now = time.time()
+        if self._disabled or now - mtime < LISTING_MIN_AGE:
+            return  # the directory may still change without its mtime changing
+        try:
+            row = (_to_text(directory), mtime, u"\n".join(sorted(_to_text(name) for name in filenames)), now)
+        except UnicodeDecodeError:
+            return
+        with self._lock:
+            self._pending["listings"][row[0]] = row
+
+    # render engine textures
+
+    def get_retex_states(self, file_paths, render_engine_name):
+        """
+        Args:
+            file_paths(iterable of str): source texture paths
+            render_engine_name(str):
+
+        Returns:
+            dict: {file path: bool baked} for the files whose state is indexed and not expired
+        """
+        paths = {}  # {path bound to the database: path of the caller}
+        for file_path in file_paths:
+            try:
+                paths[_to_text(file_path)] = file_path
+            except UnicodeDecodeError:
+                continue
+        texts = list(paths)
+        min_updated = time.time() - self.retex_ttl
+        states = {}
+        for index in range(0, len(texts), _QUERY_CHUNK):
+            chunk = texts[index:index + _QUERY_CHUNK]
+            query = ("SELECT file_path, baked, updated FROM retex WHERE render_engine = ? AND file_path IN ({})"
+                     .format(", ".join("?" * len(chunk))))
+            for file_path, baked, updated in self._select(query, [render_engine_name] + chunk):
+                if updated >= min_updated and file_path in paths:
+                    states[paths[file_path]] = bool(baked)
+        with self._lock:
+            for text, file_path in paths.items():
+                row = self._pending["retex"].get((text, render_engine_name))
+                if row is not None:
+                    states[file_path] = bool(row[2])
+        return states
+
+    def set_retex_states(self, states, render_engine_name):
+        """
+        Args:
+            states(dict): {source texture path: bool baked}
+            render_engine_name(str):
+        """
+        if self._disabled:
+            return
+        now = time.time()
+        with self._lock:
+            for file_path, baked in states.items():
+                try:
+                    text = _to_text(file_path)
+                except UnicodeDecodeError:
+                    continue
+                self._pending["retex"][(text, render_engine_name)] = (text, render_engine_name, int(baked), now)
+
+    # image headers
+
+    def read_image_header(self, file_path):
+        """ image_header.read_image_header() using the index when the file didn't change.
+
+        Args:
+            file_path(str):
+
+        Returns:
+            image_header.ImageHeader or None: None if the header can't be read
+        """
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+        try:
+            text = _to_text(file_path)
+        except UnicodeDecodeError:
+            return image_header.read_image_header(file_path)
+
+        with self._lock:
+            row = self._pending["headers"].get(text)
+        if row is None:
+            rows = self._select("SELECT file_path, mtime, size, header FROM headers WHERE file_path = ?",
+                                (text,))
+            row = rows[0] if rows else None
+        if row is not None and row[1] == file_stat.st_mtime and row[2] == file_stat.st_size:
+            if not row[3]:
+                return None  # already known unreadable
+            return image_header.ImageHeader(file_path, **json.loads(row[3]))
+
+        header = image_header.read_image_header(file_path)
+        header_data = json.dumps(dict((field, getattr(header, field)) for field in _HEADER_FIELDS)) if header else ""
+        if not self._disabled:
+            with self._lock:
+                self._pending["headers"][text] = (text, file_stat.st_mtime, file_stat.st_size, header_data,
+                                                  time.time())
+        return header
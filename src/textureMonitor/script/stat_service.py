@@ -0,0 +1,230 @@
+"""
+Shared service for the filesystem checks (existence, stat) of the textures.
+
+On network filesystems (NFS/SMB) each check pays the full server latency, doing them one after the other make a scan
+of thousands of textures take minutes. The service receives the paths in bulk, split them in batches and check the
+batches in parallel threads so the latencies overlap. The number of batches checked at the same time is bounded for
+the whole process, whatever the number of callers, so the file server is not overloaded.
+
+Missing files are the most expensive to check (the server attribute cache doesn't help), the service can remember
+them for a few seconds in a negative cache: a missing file or directory is not checked again until its entry expires
+or is invalidated, ex: when the tool bakes a render engine texture. Files inside a missing directory are known
+missing without being checked.
+
+All python version
+All OS
+"""
+
+import os
+import time
+import errno
+import logging
+import threading
+
+try:
+    import queue
+except ImportError:  # python 2
+    import Queue as queue
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class NegativeCache(object):
+    """
+    Paths known to not exist, each entry expire after the ttl.
+    """
+
+    def __init__(self, ttl=30.0):
+        """
+        Args:
+            ttl(float): seconds a path is considered missing without being checked again
+        """
+        self.ttl = ttl
+        self._missing = {}  # {path: expiry time}
+        self._existing_dirs = {}  # {directory: expiry time} directories of missing files found existing
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._missing)
+
+    @staticmethod
+    def _is_valid(entries, path, now):
+        expiry = entries.get(path)
+        if expiry is None:
+            return False
+        if expiry < now:
+            del entries[path]
+            return False
+        return True
+
+    def is_missing(self, path):
+        """
+        Returns:
+            bool: True if the path or one of its parent directories is known missing
+        """
+        now = time.time()
+        with self._lock:
+            while True:
+                if self._is_valid(self._missing, path, now):
+                    return True
+                parent = os.path.dirname(path)
+                if parent == path:
+                    return False
+                path = parent
+
+    def is_existing_dir(self, directory):
+        with self._lock:
+            return self._is_valid(self._existing_dirs, directory, time.time())
+
+    def add(self, path):
+        with self._lock:
+            self._missing[path] = time.time() + self.ttl
+
+    def add_existing_dir(self, directory):
+        with self._lock:
+            self._existing_dirs[directory] = time.time() + self.ttl
+
+    def invalidate(self, path):
+        """ The path has been created: forget it and its parent directories.
+        """
+        with self._lock:
+            while True:
+                self._missing.pop(path, None)
+                parent = os.path.dirname(path)
+                if parent == path:
+                    return
+                path = parent
+
+    def clear(self):
+        with self._lock:
+            self._missing = {}
+            self._existing_dirs = {}
+
+
+class StatService(object):
+    """
+    Fan out filesystem checks over a bounded number of threads and return their results in bulk.
+    """
+
+    def __init__(self, workers=16, batch_size=64, negative_ttl=0):
+        """
+        Args:
+            workers(int): maximum number of batches checked at the same time by all the callers, 1 to check serially
+            batch_size(int): number of paths checked by a thread at once
+            negative_ttl(float): seconds the missing paths are cached, 0 to disable the negative cache
+        """
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self.negative_cache = NegativeCache(ttl=negative_ttl) if negative_ttl > 0 else None
+
+    def map(self, function, items):
+        """ Call the function on each item, in parallel batches.
+
+        Args:
+            function(function): take an item, must be thread safe and not use the service. ex: os.path.exists
+            items(iterable): hashable items, duplicates are only processed once
+
+        Returns:
+            dict: {item: function result}
+
+        Raises:
+            Exception: the first exception raised by the function
+        """
+        items = list(set(items))
+        results = {}
+        if not items:
+            return results
+
+        batch_queue = queue.Queue()
+        for index in range(0, len(items), self.batch_size):
+            batch_queue.put(items[index:index + self.batch_size])
+        errors = []
+
+        def _worker():
+            while not errors:
+                try:
+                    batch = batch_queue.get_nowait()
+                except queue.Empty:
+                    return
+                with self._slots:
+                    try:
+                        batch_results = dict((item, function(item)) for item in batch)
+                    except Exception as excp:
+                        errors.append(excp)
+                        return
+                results.update(batch_results)
+
+        thread_count = min(self.workers, batch_queue.qsize())
+        if thread_count == 1:
+            _worker()  # a single batch is not worth a thread
+        else:
+            threads = [threading.Thread(target=_worker) for _ in range(thread_count)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+        return results
+
+    def stat(self, file_path):
+        """
+        Returns:
+            os.stat_result or None: None if the file doesn't exist or is not accessible
+        """
+        cache = self.negative_cache
+        if cache is not None and cache.is_missing(file_path):
+            return None
+        try:
+            return os.stat(file_path)
+        except OSError as excp:
+            if cache is not None and excp.errno in (errno.ENOENT, errno.ENOTDIR):
+                cache.add(file_path)
+                self._cache_missing_directory(os.path.dirname(file_path))
+            return None
+
+    def _cache_missing_directory(self, directory):
+        """ Check once per ttl the directory of a missing file, so the other files of a missing directory are known
+        missing without being checked.
+        """
+        if not directory or self.negative_cache.is_existing_dir(directory):
+            return
+        if os.path.isdir(directory):
+            self.negative_cache.add_existing_dir(directory)
+        else:
+            self.negative_cache.add(directory)
+
+    def invalidate(self, path):
+        """ To call when the tool creates a file (bake, copy, ...) so it is not considered missing anymore.
+
+        Args:
+            path(str):
+        """
+        if self.negative_cache is not None:
+            self.negative_cache.invalidate(path)
+
+    def exists(self, file_path):
+        return self.stat(file_path) is not None
+
+    def stat_many(self, file_paths):
+        """
+        Args:
+            file_paths(iterable of str):
+
+        Returns:
+            dict: {file path: os.stat_result or None if the file doesn't exist}
+        """
+        return self.map(self.stat, file_paths)
+
+    def exists_many(self, file_paths):
+        """
+        Args:
+            file_paths(iterable of str):
+
+        Returns:
+            dict: {file path: bool}
+        """
+        return dict((file_path, file_stat is not None) for file_path, file_stat in self.stat_many(file_paths).items())
@@ -0,0 +1,334 @@
+"""
+Texture manifest: the resolved texture set of a scan saved to a file, so pipeline tools and farm pre-flight checks
+can audit it without reopening the scene and scanning it again.
+
+One entry per resolved file (each tile of an udim, each frame of a sequence):
+    {"node": "Image1", "parameter": "Image1.parameters.filename", "render_engine": "Arnold",
+     "root_path": "/tex/wood.<UDIM>.tif", "file_path": "/tex/wood.1001.tif", "exists": true, "size": 1024,
+     "mtime": 1600000000.0, "retex": "baked", "expression": false, "locked": false}
+
+The manifest is written and read as a stream, as json-lines (.jsonl) or csv (.csv) depending on its extension.
+
+Can be used from a shell:
+    texture_manifest.py diff <old manifest> <new manifest>
+    texture_manifest.py convert <manifest> <output manifest>
+    texture_manifest.py summary <manifest>
+
+All python version
+All OS
+"""
+
+import os
+import sys
+import csv
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+FIELDS = ("node",
+          "parameter",  # full name of the path parameter
+          "render_engine",
+          "root_path",  # path as written on the parameter (can contain tokens)
+          "file_path",  # resolved file
+          "exists",
+          "size",  # bytes, None if the file doesn't exist
+          "mtime",
+          "retex",  # RetexState of the render engine texture
+          "expression",  # True if the parameter is computed from an expression
+          "locked")
+
+# type of the fields read from a csv, the other fields are str
+FIELD_TYPES = {"exists": bool,
+               "size": int,
+               "mtime": float,
+               "expression": bool,
+               "locked": bool}
+
+# identify an entry between two manifests
+KEY_FIELDS = ("node", "parameter", "file_path")
+
+
+class ManifestFormat:
+    jsonl = "jsonl"
+    csv = "csv"
+
+    all = [jsonl, csv]
+
+
+class RetexState:
+    """
+    Render engine texture status of the file(s) of an entry
+    """
+    baked = "baked"
+    partial = "partial"  # only some of the files of the entry texture are baked
+    missing = "missing"
+    unknown = ""  # the render engine textures were not checked
+
+
+def get_format(manifest_path):
+    """
+    Args:
+        manifest_path(str):
+
+    Returns:
+        str: ManifestFormat deduced from the extension, jsonl by default
+    """
+    extension = os.path.splitext(manifest_path)[1].lower().lstrip(".")
+    if extension in ManifestFormat.all:
+        return extension
+    return ManifestFormat.jsonl
+
+
+def get_file_entry(file_path, **fields):
+    """ Build the entry of a resolved file, stat it for its existence, size and modification time.
+
+    Args:
+        file_path(str):
+        **fields: value of the other FIELDS
+
+    Returns:
+        dict: one value for each field of FIELDS
+    """
+    entry = dict.fromkeys(FIELDS)
+    entry.update(fields)
+    entry["file_path"] = file_path
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        entry["exists"] = False
+    else:
+        entry["exists"] = True
+        entry["size"] = stat.st_size
+        entry["mtime"] = stat.st_mtime
+    return entry
+
+
+def _open_csv(manifest_path, mode):
+    if sys.version_info[0] < 3:
+        return open(manifest_path, mode + "b")
+    return open(manifest_path, mode, newline="")
+
+
+class ManifestWriter(object):
+    """
+    Write the entries one by one, the whole texture set is never kept in memory.
+    """
+
+    def __init__(self, manifest_path, manifest_format=None):
+        """
+        Args:
+            manifest_path(str):
+            manifest_format(str or None): ManifestFormat, None to deduce it from the extension
+        """
+        self.manifest_path = manifest_path
+        self.manifest_format = manifest_format or get_format(manifest_path)
+        self.count = 0
+        self._file = None
+        self._csv_writer = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        manifest_dir = os.path.dirname(self.manifest_path)
+        if manifest_dir and not os.path.exists(manifest_dir):
+            os.makedirs(manifest_dir)
+        if self.manifest_format == ManifestFormat.csv:
+            self._file = _open_csv(self.manifest_path, "w")
+            self._csv_writer = csv.DictWriter(self._file, fieldnames=FIELDS, extrasaction="ignore")
+            self._csv_writer.writeheader()
+        else:
+            self._file = open(self.manifest_path, "w")
+
+    def write(self, entry):
+        """
+        Args:
+            entry(dict): see get_file_entry()
+        """
+        if self._csv_writer:
+            self._csv_writer.writerow(dict((field, "" if entry.get(field) is None else entry[field])
+                                           for field in FIELDS))
+        else:
+            self._file.write(json.dumps(dict((field, entry.get(field)) for field in FIELDS)) + "\n")
+        self.count += 1
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            self._csv_writer = None
+
+
+def write_manifest(manifest_path, entries, manifest_format=None):
+    """
+    Args:
+        manifest_path(str):
+        entries(iterable of dict): can be a generator, see get_file_entry()
+        manifest_format(str or None): ManifestFormat, None to deduce it from the extension
+
+    Returns:
+        int: number of entries written
+    """
+    with ManifestWriter(manifest_path, manifest_format=manifest_format) as writer:
+        for entry in entries:
+            writer.write(entry)
+    logger.info("[write_manifest] {} entries written to {}".format(writer.count, manifest_path))
+    return writer.count
+
+
+def _convert_csv_value(field, value):
+    if value == "":
+        return None
+    field_type = FIELD_TYPES.get(field)
+    if field_type is bool:
+        return value == "True"
+    if field_type:
+        return field_type(value)
+    return value
+
+
+def read_manifest(manifest_path, manifest_format=None):
+    """ Read the entries one by one.
+
+    Args:
+        manifest_path(str):
+        manifest_format(str or None): ManifestFormat, None to deduce it from the extension
+
+    Returns:
+        generator: dict for each entry, with the same types whatever the format
+    """
+    manifest_format = manifest_format or get_format(manifest_path)
+    if manifest_format == ManifestFormat.csv:
+        with _open_csv(manifest_path, "r") as manifest_file:
+            for row in csv.DictReader(manifest_file):
+                yield dict((field, _convert_csv_value(field, row.get(field, ""))) for field in FIELDS)
+        return
+
+    with open(manifest_path, "r") as manifest_file:
+        for line_index, line in enumerate(manifest_file):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                logger.warning("[read_manifest] Ignored invalid line {} in {}".format(line_index + 1, manifest_path))
+                continue
+            yield dict((field, entry.get(field)) for field in FIELDS)
+
+
+def get_entry_key(entry):
+    return tuple(entry.get(field) for field in KEY_FIELDS)
+
+
+class ManifestDiff(object):
+    """
+    Differences between two manifests
+    """
+
+    def __init__(self):
+        self.added = []  # entries only in the new manifest
+        self.removed = []  # entries only in the old manifest
+        self.changed = []  # (old entry, new entry, list of the fields that changed)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    __nonzero__ = __bool__  # python 2
+
+    def get_text(self):
+        lines = ["{} added, {} removed, {} changed".format(len(self.added), len(self.removed), len(self.changed))]
+        lines += ["+ {}".format(entry["file_path"]) for entry in self.added]
+        lines += ["- {}".format(entry["file_path"]) for entry in self.removed]
+        for old_entry, new_entry, fields in self.changed:
+            lines.append("~ {}".format(new_entry["file_path"]))
+            lines += ["    {}: {} -> {}".format(field, old_entry[field], new_entry[field]) for field in fields]
+        return "\n".join(lines)
+
+
+def diff_manifests(old_entries, new_entries, fields=None):
+    """
+    Args:
+        old_entries(iterable of dict): ex: read_manifest(old_path)
+        new_entries(iterable of dict):
+        fields(list of str or None): fields compared between entries with the same key, None for all of them
+
+    Returns:
+        ManifestDiff:
+    """
+    fields = [field for field in (fields or FIELDS) if field not in KEY_FIELDS]
+    old_by_key = {}
+    for entry in old_entries:
+        old_by_key[get_entry_key(entry)] = entry
+
+    diff = ManifestDiff()
+    for new_entry in new_entries:
+        old_entry = old_by_key.pop(get_entry_key(new_entry), None)
+        if old_entry is None:
+            diff.added.append(new_entry)
+            continue
+        changed_fields = [field for field in fields if old_entry.get(field) != new_entry.get(field)]
+        if changed_fields:
+            diff.changed.append((old_entry, new_entry, changed_fields))
+    diff.removed = list(old_by_key.values())
+    return diff
+
+
+def get_summary(entries):
+    """
+    Returns:
+        dict: number of entries, missing files, total size and count of each RetexState
+    """
+    summary = {"entries": 0, "missing": 0, "size": 0, "retex": {}}
+    for entry in entries:
+        summary["entries"] += 1
+        if not entry["exists"]:
+            summary["missing"] += 1
+        summary["size"] += entry["size"] or 0
+        retex = entry["retex"] or RetexState.unknown
+        summary["retex"][retex] = summary["retex"].get(retex, 0) + 1
+    return summary
+
+
+def _main(argv):
+    """ Read the texture manifests exported from the Texture Monitor.
+
+    usage:
+        texture_manifest.py diff <old manifest> <new manifest> [field ...]
+            exit code 1 if the manifests differ
+        texture_manifest.py convert <manifest> <output manifest>
+        texture_manifest.py summary <manifest>
+    """
+    if len(argv) < 2 or argv[0] in ("-h", "--help"):
+        print(_main.__doc__)
+        return 2
+
+    command = argv[0]
+    if command == "diff" and len(argv) >= 3:
+        diff = diff_manifests(read_manifest(argv[1]), read_manifest(argv[2]), fields=argv[3:] or None)
+        print(diff.get_text())
+        return 1 if diff else 0
+
+    if command == "convert" and len(argv) == 3:
+        write_manifest(argv[2], read_manifest(argv[1]))
+        return 0
+
+    if command == "summary":
+        summary = get_summary(read_manifest(argv[1]))
+        print("{} files, {} missing, {:.0f} MB".format(summary["entries"], summary["missing"],
+                                                        summary["size"] / (1024.0 * 1024.0)))
+        for retex, count in sorted(summary["retex"].items()):
+            print("  retex {}: {}".format(retex or "unknown", count))
+        return 0
+
+    print(_main.__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
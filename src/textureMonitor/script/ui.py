@@ -14,11 +14,23 @@ from Katana import NodegraphAPI, UI4, KatanaFile
 
 from PyQt5 import QtWidgets, QtCore, QtGui
 
-from .utilities import (return_children_textures, open_file_inexplorer)
+from .utilities import (return_children_textures, return_sequence_textures, open_file_inexplorer, PhaseTimer,
+                        compress_frame_range)
+from .expressions import (EvaluationCache, evaluate_parameter_paths, get_frame_samples)
+from .watcher import DirectoryWatcher
+from .bake_stats import (BakeStats, JobTiming, append_history)
+from .bake_budget import get_file_size
+from .filtering import (FilterIndex, FilterMode, StatusFlag, compile_text_filter)
+from .records import (TextureStore, get_directory_groups)
+from .directory_index import DirectoryIndex
 from .exceptions import (DisplayError, CustomWarning, raise_dialog, TreeWidgetItemError)
-from .constants import (TREEW_DATA, DataRole, LOCKED_LIST, RESOURCES_LOCATION, ENABLE_RETEX)
+from .constants import (TREEW_DATA, DataRole, LOCKED_RULES, RESOURCES_LOCATION, ENABLE_RETEX,
+                        VALIDATE_TEXTURE_HEADERS, MAX_TILE_SIZE, FIND_DUPLICATES)
 
 from . import constants
+from . import bake_manifest
+from . import bake_journal
+from . import texture_manifest
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -67,11 +79,11 @@ class Icons:
     check_ok = os.path.join(_base_location, "retex_bake.png")
 
 
-def get_icon_for_qitem(qitem):
-    """ Return an icon path corresponding to the data of the QTreeWidgetItem
+def get_icon_for_role(retex_role):
+    """ Return an icon path corresponding to the render engine texture status of an item
 
     Args:
-        qitem (QtWidgets.QTreeWidgetItem):
+        retex_role (int): DataRole value
 
     Returns:
         str: file path
@@ -79,16 +91,31 @@ def get_icon_for_qitem(qitem):
     Raises:
         CustomWarning: if no corresponding icon found
     """
-    retex = qitem.data(TREEW_DATA["enginetex_baked"]["column"], QtCore.Qt.UserRole)  # int from DataRole
-
-    if retex == DataRole.all_enginetex:
+    if retex_role == DataRole.all_enginetex:
         return Icons.check_ok
-    if retex == DataRole.some_enginetex:
+    if retex_role == DataRole.some_enginetex:
         return Icons.check_warning
-    if retex == DataRole.no_enginetex:
+    if retex_role == DataRole.no_enginetex:
         return Icons.check_error
 
-    raise CustomWarning("No corresponding icon found for qitem {}".format(qitem))
+    raise CustomWarning("No corresponding icon found for render engine texture status {}".format(retex_role))
+
+
+def get_retex_role(baked_count, total_count):
+    """ Return the DataRole corresponding to the given render engine textures state
+
+    Args:
+        baked_count (int): number of files whose render engine texture exists
+        total_count (int): number of files
+
+    Returns:
+        int: DataRole value
+    """
+    if total_count and baked_count >= total_count:
+        return DataRole.all_enginetex
+    if baked_count:
+        return DataRole.some_enginetex
+    return DataRole.no_enginetex
 
 
 """ -------------------------------------------------------------------------------------------------------------------- 
@@ -112,6 +139,39 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
         self.parent_window = self.parentWidget().parentWidget()  # UI4.App.Layouts.FloatingLayoutWidget
         self.parent_window.setMinimumWidth(constants.UI_WIDTH)
 
+        self._store = TextureStore()  # state of all the textures displayed, the items only display it
+        self._item_records = {}  # {QTreeWidgetItem: TextureRecord} to find the record of the selected items
+        # directories listed once per scan to resolve the udim tiles and sequences
+        self._directory_index = DirectoryIndex(stat_service=constants.STAT_SERVICE,
+                                               shared_index=constants.SHARED_INDEX)
+        self._duplicate_groups = {}  # {file_path: list of file paths with identical content}
+        self.dup_worker = None  # FindDuplicates of the last scan
+        self._scanned_engines = []  # names of the render engines whose textures are in the treewidget
+        self._expression_cache = EvaluationCache(max_entries=constants.EXPRESSION_CACHE_SIZE)
+        self._watched_items = {}  # {watched file path: list of TextureRecord affected by a change of this file}
+        self._filter_index = FilterIndex()  # keys are the root TextureRecord
+        self._filter_hidden = set()  # root TextureRecord whose item is currently hidden
+        self._failed_bakes = []  # file paths that failed in the last bake
+        self._group_items = {}  # {QTreeWidgetItem: DirectoryGroup} items of the directory view
+        self._file_sizes = {}  # {file path: bytes or None if missing} cached for the directory view
+        # files processed by the bake, their records are refreshed together at each timeout
+        self._retex_processed_files = set()
+        self._retex_bake_files = set()  # all the files processed by the current bake
+        self._retex_file_leaves = {}  # {file path: list of TextureRecord} records of the files being baked
+        self._retex_refresh_timer = QtCore.QTimer(self)
+        self._retex_refresh_timer.setSingleShot(True)
+        self._retex_refresh_timer.setInterval(250)  # ms
+        self._retex_refresh_timer.timeout.connect(self._retex_refresh_processed)
+
+        self.watcher = None
+        if constants.ENABLE_WATCHER:
+            self.watcher = DirectoryWatcher(backend=constants.WATCHER_BACKEND,
+                                            poll_interval=constants.WATCHER_POLL_INTERVAL,
+                                            coalesce_delay=constants.WATCHER_COALESCE_DELAY,
+                                            parent=self)
+            self.watcher.paths_changed.connect(self.tw_on_paths_changed)
+            self.watcher.overflowed.connect(self.tw_on_watcher_overflowed)
+
         self.setup_ui()
 
     def setup_ui(self):
@@ -131,6 +191,14 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
         self.cbb_renderengine.addItems(constants.RENDER_ENGINES_AVAILABLE)
         self.cbb_renderengine.setCurrentText(str(constants.RENDER_ENGINE.__name__).split(".")[-1])
 
+        # filter
+        self.le_filter = QtWidgets.QLineEdit()
+        self.cbb_filter_mode = QtWidgets.QComboBox()
+        self.cbb_filter_mode.addItems(FilterMode.all)
+        self.cbb_filter_status = QtWidgets.QComboBox()
+        for status_name, status_flag in StatusFlag.pretty_names:
+            self.cbb_filter_status.addItem(status_name, status_flag)
+
         self.grp_tree = QtWidgets.QGroupBox("ALL Textures in scene")
 
         """ Toolbar above the treewidget """
@@ -168,8 +236,12 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
                                                       transformMode=QtCore.Qt.SmoothTransformation)
         self.btn_sr_apply = UI4.Widgets.ToolbarButton("Apply Replace", self, pixmap_searchreplace)
 
+        self.chkbox_group_dir = QtWidgets.QCheckBox("Group by Directory")
+
         self.treewidget = QtWidgets.QTreeWidget()
         self.header_treeview = self.treewidget.header()
+        # directory view, display the files of the visible items grouped by directory
+        self.tw_groups = QtWidgets.QTreeWidget()
 
     def create_layouts(self):
         self.main_layout = QtWidgets.QVBoxLayout(self.main_widget)
@@ -184,9 +256,14 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
         self.main_layout.addWidget(self.grp_tree)
 
         self.lyt_top.addWidget(self.cbb_renderengine)
+        self.lyt_top.addWidget(self.le_filter)
+        self.lyt_top.addWidget(self.cbb_filter_mode)
+        self.lyt_top.addWidget(self.cbb_filter_status)
         self.lyt_treegroup.addLayout(self.lyt_toolbar_top)
         self.lyt_treegroup.addWidget(self.treewidget)
+        self.lyt_treegroup.addWidget(self.tw_groups)
         self.lyt_toolbar_top.addWidget(self.toolbar_tw)
+        self.lyt_toolbar_top.addWidget(self.chkbox_group_dir)
         self.lyt_toolbar_top.addWidget(self.chkbox_sr_expr)
         self.lyt_toolbar_top.addWidget(self.le_sr_l)
         self.lyt_toolbar_top.addWidget(self.le_sr_r)
@@ -203,6 +280,9 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
         self.lyt_toolbar_top.insertStretch(1, 3)
 
         self.cbb_renderengine.setMinimumWidth(90)
+        self.le_filter.setMinimumWidth(250)
+        self.le_filter.setPlaceholderText("Filter")
+        self.le_filter.setClearButtonEnabled(True)
         self.toolbar_tw.setIconSize(QtCore.QSize(self.size_toolbar_icon, self.size_toolbar_icon))
         self.toolbar_tw.setStyleSheet("border: none;")
         self.btn_toolbar_refresh.setMaximumSize(self.size_toolbar_icon, self.size_toolbar_icon)
@@ -242,16 +322,38 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
         # self.treewidget.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         # self.treewidget.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
 
+        # Directory view
+        self.chkbox_group_dir.setToolTip("Display the textures grouped by directory with their statistics")
+        self.tw_groups.setHeaderLabels(["Directory", "Textures", "Missing", "Baked %", "Size (MB)"])
+        self.tw_groups.setColumnWidth(0, constants.UI_WIDTH - 400)
+        self.tw_groups.setAlternatingRowColors(True)
+        self.tw_groups.setSortingEnabled(True)
+        self.tw_groups.sortByColumn(0, QtCore.Qt.AscendingOrder)
+        self.tw_groups.setRootIsDecorated(False)
+        self.tw_groups.setUniformRowHeights(True)
+        self.tw_groups.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.tw_groups.setHidden(True)
+
     def setup_connections(self):
         self.cbb_renderengine.currentTextChanged.connect(self.change_renderengine)
-        self.btn_toolbar_refresh.clicked.connect(self.populate_treewidget)
+        # the refresh button check again the render engine textures known by the shared index
+        self.btn_toolbar_refresh.clicked.connect(lambda: self.populate_treewidget(refresh=True))
         self.btn_toolbar_expand.clicked.connect(self.treewidget.expandAll)
         self.btn_toolbar_collapse.clicked.connect(self.treewidget.collapseAll)
 
         self.treewidget.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
         self.treewidget.customContextMenuRequested[QtCore.QPoint].connect(self.tw_context_menu)
+        self.treewidget.itemExpanded.connect(self.tw_on_item_expanded)
         self.btn_sr_apply.clicked.connect(self.search_n_replace)
 
+        self.chkbox_group_dir.toggled.connect(self.toggle_group_view)
+        self.tw_groups.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.tw_groups.customContextMenuRequested[QtCore.QPoint].connect(self.groups_context_menu)
+
+        self.le_filter.textChanged.connect(self.tw_apply_filter)
+        self.cbb_filter_mode.currentIndexChanged.connect(self.tw_apply_filter)
+        self.cbb_filter_status.currentIndexChanged.connect(self.tw_apply_filter)
+
     """ ----------------------------------------------------------------------------------------------------------------
     API methods 
     """
@@ -267,9 +369,30 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
         except Exception as excp:
             logger.error("[Re change]: Cannot change render engine to {}: {}".format(re_value, excp))
 
+        if re_value in self._scanned_engines:
+            # all the render engines textures are already in the treewidget, only the view change
+            self.tw_apply_render_engine_view()
+            return
+
         self.populate_treewidget()
         return
 
+    def get_scan_render_engines(self):
+        """ Return the render engines that needs to be scanned when populating the treewidget.
+
+        Returns:
+            list of module: modules Representing a RenderEngine
+        """
+        render_engines = [constants.RENDER_ENGINE]
+        for re_name in constants.COMBINED_SCAN_ENGINES:
+            if re_name not in constants.RENDER_ENGINES_AVAILABLE:
+                logger.error("[get_scan_render_engines]: render engine {} is not supported".format(re_name))
+                continue
+            render_engine = getattr(constants.render_engine, re_name)
+            if render_engine not in render_engines:
+                render_engines.append(render_engine)
+        return render_engines
+
     def tw_context_menu(self, point):
         """ Create a context menu at the given point
         Render engine agnostic
@@ -297,7 +420,7 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
                                                                                6,
                                                                                transformMode=QtCore.Qt.SmoothTransformation)))
 
-            path2open = os.path.dirname(item_sel[0].data(TREEW_DATA["file_path"]["column"], QtCore.Qt.UserRole))
+            path2open = self.get_record(item_sel[0]).directory
             act_open = menu.addAction("Open the location in Explorer")
             act_open.triggered.connect(partial(open_file_inexplorer, path2open))
             act_open.setIcon(QtGui.QIcon(QtGui.QPixmap(Icons.open_folder).scaled(self.size_contextmenu_icons,
@@ -318,17 +441,36 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
                                                                                      transformMode=QtCore.Qt.SmoothTransformation)))
 
                 act_retex = menu.addAction("Bake ALL the {} ".format(constants.RENDER_ENGINE.re_tex_ext))
-                act_retex.triggered.connect(partial(self.bake_selection2retex, '_', True))
+                act_retex.triggered.connect(partial(self.bake_selection2retex, '_', True, None))
                 act_retex.setIcon(QtGui.QIcon(QtGui.QPixmap(Icons.retex_bake).scaled(self.size_contextmenu_icons,
                                                                                      self.size_contextmenu_icons,
                                                                                      transformMode=QtCore.Qt.SmoothTransformation)))
 
+                if self._failed_bakes:
+                    act_rebake = menu.addAction("Rebake the {} failed {}".format(len(self._failed_bakes),
+                                                                                constants.RENDER_ENGINE.re_tex_ext))
+                    act_rebake.triggered.connect(partial(self.bake_selection2retex, [], False,
+                                                         list(self._failed_bakes)))
+                    act_rebake.setIcon(QtGui.QIcon(QtGui.QPixmap(Icons.retex_bake).scaled(
+                        self.size_contextmenu_icons, self.size_contextmenu_icons,
+                        transformMode=QtCore.Qt.SmoothTransformation)))
+
+                if constants.BAKE_PARALLEL:
+                    act_calib = menu.addAction("Calibrate the bake concurrency with selection")
+                    act_calib.triggered.connect(partial(self.calibrate_bake, item_sel))
+
             act_del_retex = menu.addAction("Delete the {} for selection".format(constants.RENDER_ENGINE.re_tex_ext))
             act_del_retex.triggered.connect(partial(self.qitem_delete_retex, item_sel))
             act_del_retex.setIcon(QtGui.QIcon(QtGui.QPixmap(Icons.retex_remove).scaled(self.size_contextmenu_icons,
                                                                                        self.size_contextmenu_icons,
                                                                                        transformMode=QtCore.Qt.SmoothTransformation)))
 
+        menu.addSeparator()
+        act_export = menu.addAction("Export the texture manifest ...")
+        act_export.triggered.connect(self.export_texture_manifest)
+        act_compare = menu.addAction("Compare with a texture manifest ...")
+        act_compare.triggered.connect(self.compare_texture_manifest)
+
         menu.exec_(QtGui.QCursor.pos())
         return True
 
@@ -341,7 +483,7 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
         Returns:
             Katana Node edited
         """
-        ktn_node = qitem.data(TREEW_DATA["katana_node"]["column"], QtCore.Qt.UserRole)
+        ktn_node = self.get_record(qitem).katana_node
         NodegraphAPI.SetNodeEdited(ktn_node, edited=True, exclusive=True)  # edit only the given node
         return ktn_node
 
@@ -361,10 +503,9 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
             qitems = [qitems]
 
         for qitem in qitems:
-            file_param = qitem.data(TREEW_DATA["path_parameter"]["column"], QtCore.Qt.UserRole)
-
-            qitem_filepath = qitem.data(TREEW_DATA["file_path"]["column"], QtCore.Qt.UserRole)
-            if qitem_filepath in LOCKED_LIST:
+            record = self.get_record(qitem)
+            file_param = record.path_parameter
+            if record.file_path in LOCKED_RULES:
                 continue
 
             if file_param.isExpression():
@@ -374,6 +515,16 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
         # Update the treewidget
         self.tw_detect_expression()
 
+    def get_record(self, qitem):
+        """
+        Args:
+            qitem(QtWidgets.QTreeWidgetItem):
+
+        Returns:
+            TextureRecord: record displayed by the given item
+        """
+        return self._item_records[qitem]
+
     def qitem_return_filepaths(self, qitem):
         """ Mostly for baking
 
@@ -383,19 +534,7 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
         Returns:
             list: list of file_paths associated with the given qitem
         """
-        files2bake = []
-        qitem_child_count = qitem.childCount()
-        if qitem_child_count:
-            # iterate through every child
-            for index in range(qitem_child_count):
-                qsubitem = qitem.child(index)
-                qsubitem_path = qsubitem.data(TREEW_DATA["file_path"]["column"], QtCore.Qt.UserRole)
-                files2bake.append(qsubitem_path)
-        else:
-            qitem_path = qitem.data(TREEW_DATA["file_path"]["column"], QtCore.Qt.UserRole)
-            files2bake.append(qitem_path)
-
-        return files2bake
+        return self.get_record(qitem).get_file_paths()
 
     def qitem_delete_retex(self, qitems_selected):
         """ Delete the render engine texture corresponding to the given items
@@ -415,17 +554,29 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
         files2delete_retex = []
         for qitem in qitems_selected:
             files2delete_retex += self.qitem_return_filepaths(qitem=qitem)
+        self.delete_retex(files2delete_retex)
+        return
 
-        retex2delete = []
-        for retex_file in files2delete_retex:
-            retex = constants.RENDER_ENGINE.return_retex_from_path(retex_file)
-            if os.path.exists(retex):
-                retex2delete.append(retex)
+    def delete_retex(self, files2delete_retex):
+        """ Delete the render engine texture of the given source textures, as a single job
+        Render Engine agnostic
+
+        Args:
+            files2delete_retex(list of str): source texture paths
+
+        Returns:
+            None
+        """
+        retex_paths = constants.STAT_SERVICE.map(constants.RENDER_ENGINE.return_retex_from_path, files2delete_retex)
+        existing = constants.STAT_SERVICE.exists_many(retex for retex in retex_paths.values() if retex)
+        retex2delete = sorted(retex for retex, retex_exists in existing.items() if retex_exists)
 
         error_dict = {}
         for retex in retex2delete:  # all the retex exists as they always been verified just above
             try:
                 os.remove(retex)
+                if constants.BAKE_MANIFEST:
+                    bake_manifest.remove_manifest(retex, settings=constants.BAKE_MANIFEST)
             except Exception as excp:
                 error_dict[retex] = excp
 
@@ -440,8 +591,8 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
                                                                 error_dict)
         raise_dialog(message, "Process Finished")
 
-        self.tw_update_retex()
-        self.tw_update_all_icons()
+        deleted = set(retex2delete) - set(error_dict)
+        self.tw_refresh_files_retex([file_path for file_path, retex in retex_paths.items() if retex in deleted])
         return
 
     def search_n_replace(self):
@@ -456,17 +607,15 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
         if not txt_search:
             return
 
-        all_qitems_list = self.tw_return_root_items()
-        for qitem in all_qitems_list:
-            qitem_filepath = qitem.data(TREEW_DATA["file_path"]["column"], QtCore.Qt.UserRole)
-            if qitem_filepath in LOCKED_LIST:
+        for record in self.tw_return_root_records(visible_only=True):
+            if record.file_path in LOCKED_RULES:
                 continue
 
             # use the re module to see if the submitted search text return a match
-            match_grp = re.search(txt_search, qitem_filepath)
+            match_grp = re.search(txt_search, record.file_path)
             if match_grp:
                 try:
-                    self.qitem_change_path(qitem=qitem, matched_grp=match_grp, replace_txt=txt_replace,
+                    self.qitem_change_path(qitem=record.qitem, matched_grp=match_grp, replace_txt=txt_replace,
                                            ignore_expression=ignore_expression_status)
                 except Exception as excp:
                     logger.error(excp)
@@ -491,7 +640,7 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
             CustomWarning: If the value can't be set on the path parameter
         """
 
-        qitem_path_param = qitem.data(TREEW_DATA["path_parameter"]["column"], QtCore.Qt.UserRole)
+        qitem_path_param = self.get_record(qitem).path_parameter
         if not qitem_path_param:
             raise DisplayError("Qitem {} doesn't have a path_parameter".format(qitem), "Qt Error")
 
@@ -521,16 +670,76 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
                                         filepath_new_value))
         return
 
+    """ --------------
+    TEXTURE MANIFEST - """
+
+    def get_manifest_entries(self):
+        """ Describe every resolved file of the scan, see texture_manifest.FIELDS.
+        Files are stat one by one while the entries are consumed.
+
+        Returns:
+            generator: dict for each resolved file
+        """
+        retex_states = {DataRole.all_enginetex: texture_manifest.RetexState.baked,
+                        DataRole.some_enginetex: texture_manifest.RetexState.partial,
+                        DataRole.no_enginetex: texture_manifest.RetexState.missing}
+        for root in self._store.roots:
+            fields = {"node": root.katana_node.getName() if root.katana_node else None,
+                      "parameter": root.path_parameter.getFullName() if root.path_parameter else None,
+                      "render_engine": root.render_engine,
+                      "root_path": root.file_path,
+                      "expression": root.is_expression}
+            for record in root.get_leaves():
+                retex = retex_states.get(record.get_retex_role(record.render_engine),
+                                         texture_manifest.RetexState.unknown)
+                for file_path in record.get_file_paths():
+                    yield texture_manifest.get_file_entry(file_path, retex=retex, locked=record.locked, **fields)
+
+    def export_texture_manifest(self):
+        manifest_path = QtWidgets.QFileDialog.getSaveFileName(self, "Export the texture manifest", "",
+                                                              "JSON Lines (*.jsonl);;CSV (*.csv)")[0]
+        if not manifest_path:
+            return
+        try:
+            count = texture_manifest.write_manifest(manifest_path, self.get_manifest_entries())
+        except (IOError, OSError) as excp:
+            raise DisplayError("Cannot write the texture manifest {}: {}".format(manifest_path, excp),
+                               "Texture Manifest")
+        raise_dialog("{} textures exported to {}".format(count, manifest_path), "Texture Manifest")
+
+    def compare_texture_manifest(self):
+        """ Diff a previously exported manifest (old) with the current scan (new).
+        """
+        manifest_path = QtWidgets.QFileDialog.getOpenFileName(self, "Compare with a texture manifest", "",
+                                                              "Texture manifest (*.jsonl *.csv)")[0]
+        if not manifest_path:
+            return
+        try:
+            diff = texture_manifest.diff_manifests(texture_manifest.read_manifest(manifest_path),
+                                                   self.get_manifest_entries())
+        except (IOError, OSError) as excp:
+            raise DisplayError("Cannot read the texture manifest {}: {}".format(manifest_path, excp),
+                               "Texture Manifest")
+        text = diff.get_text()
+        logger.info("[compare_texture_manifest] {} -> current scan:\n{}".format(manifest_path, text))
+        max_lines = 30
+        lines = text.split("\n")
+        if len(lines) > max_lines:
+            text = "\n".join(lines[:max_lines] + ["... see the script editor for the full diff"])
+        raise_dialog(text, "Texture Manifest")
+
     """ --------------
     BAKING RETEX - """
 
-    def bake_selection2retex(self, qitems_selected, all_qitems=False):
+    def bake_selection2retex(self, qitems_selected, all_qitems=False, file_paths=None):
         """
         Render Engine agnostic
 
         Args:
             all_qitems(bool): True to ignore arg qitems_selected and bake all the item in the treewidget
             qitems_selected(list): list of QtWidgets.QTreeWidgetItems
+            file_paths(list of str or None): if specified bake these files instead of the items ones
+                ex: the files that failed in the previous bake
 
         Returns:
             none
@@ -540,23 +749,59 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
                 constants.RENDER_ENGINE.name)
             raise DisplayError(_message, "ReTex baking not supported")
 
+        resumed_session = self._retex_get_session_to_resume() if file_paths is None else None
+        if resumed_session is False:
+            return
+
         files2bake = []
+        records = [self.get_record(qitem) for qitem in qitems_selected] if not all_qitems else []
+        if file_paths is not None:
+            files2bake = [file_path for file_path in file_paths if file_path not in LOCKED_RULES]
+            records = []
         # get all the root items in the treewidget
         if all_qitems:
-            qitems_selected = self.tw_return_root_items()
+            records = self.tw_return_root_records(visible_only=True)
 
-        for qitem in qitems_selected:
-            qitem_filepath = self.qitem_return_filepaths(qitem=qitem)
-            if qitem_filepath not in LOCKED_LIST:
-                files2bake += qitem_filepath
+        if resumed_session:
+            files2bake = [file_path for file_path in resumed_session.remaining if file_path not in LOCKED_RULES]
+            records = []
+
+        for record in records:
+            if record.locked:
+                continue  # locked item
+            files2bake += [file_path for file_path in record.get_file_paths() if file_path not in LOCKED_RULES]
 
+        # the progress dialog still count the duplicates as they are processed (propagated) by the worker
         self._prg_dialog = self._retex_progress_dialog(dialog_length=len(files2bake))
 
+        duplicates = {}
+        if FIND_DUPLICATES:
+            files2bake, duplicates = constants.render_engine.common.collapse_duplicates(files2bake,
+                                                                                        self._duplicate_groups)
+
+        # duplicates are not counted, their propagation is negligible compared to a bake
+        self._bake_stats = BakeStats(dict((file_path, get_file_size(file_path)) for file_path in files2bake),
+                                     render_engine_name=constants.RENDER_ENGINE.name)
+
         self.thread = QtCore.QThread(self)
-        self.worker = constants.render_engine.common.ReTexBake(file_paths=files2bake,
-                                                               render_engine=constants.RENDER_ENGINE)
+        self.worker = constants.render_engine.common.ReTexBake(
+            file_paths=files2bake,
+            render_engine=constants.RENDER_ENGINE,
+            max_tile_size=MAX_TILE_SIZE if VALIDATE_TEXTURE_HEADERS else None,
+            duplicates=duplicates,
+            manifest=constants.BAKE_MANIFEST,
+            journal=self._retex_get_journal(),
+            bake_options=self._retex_get_bake_options(),
+            thread_policy=self._retex_get_thread_policy(),
+            retry_policy=constants.render_engine.common.RetryPolicy(max_attempts=constants.BAKE_RETRY_ATTEMPTS,
+                                                                    delay=constants.BAKE_RETRY_DELAY),
+            stat_service=constants.STAT_SERVICE)
+        self._retex_processed_files = set()
+        self._retex_bake_files = set()
+        self._retex_file_leaves = self._store.get_file_leaves()
         self.worker.moveToThread(self.thread)
         self.worker.file_processed.connect(self._retex_processed)
+        self.worker.job_finished.connect(self._retex_job_finished)
         self.worker.finished.connect(self._retex_finished)
 
         self._prg_dialog.canceled.connect(self._retex_aborted)
@@ -567,47 +812,231 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
         logger.debug("[retex bake]: Thread started for {}: {}".format(constants.RENDER_ENGINE.name, files2bake))
         self._retex_processed()
 
+    def _retex_get_session_to_resume(self):
+        """ If a previous bake session of the current render engine has been interrupted, ask the user to
+        resume it.
+
+        Returns:
+            bake_journal.BakeSession or None or bool: the session to resume, None to bake the selection,
+                False if the user canceled
+        """
+        if not constants.BAKE_JOURNAL_DIR:
+            return None
+
+        session = constants.render_engine.common.get_resumable_bake_session(constants.BAKE_JOURNAL_DIR,
+                                                                            render_engine=constants.RENDER_ENGINE,
+                                                                            manifest=constants.BAKE_MANIFEST)
+        if session is None:
+            return None
+
+        message = ("A previous {} bake session has been interrupted with {}/{} textures remaining.\n"
+                   "Resume it instead of baking the selection ?\n\n"
+                   "(No will discard the interrupted session)".format(session.render_engine_name,
+                                                                       len(session.remaining),
+                                                                       len(session.file_paths)))
+        answer = QtWidgets.QMessageBox.question(self, "Resume Baking", message,
+                                                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No |
+                                                QtWidgets.QMessageBox.Cancel)
+        if answer == QtWidgets.QMessageBox.Cancel:
+            return False
+        if answer == QtWidgets.QMessageBox.No:
+            # the partial outputs of the interrupted bake would otherwise be left next to the textures
+            bake_journal.discard_outputs(session)
+            bake_journal.discard_journal(session.journal_path)
+            return None
+        logger.info("[retex bake]: Resuming {}".format(session))
+        bake_journal.discard_outputs(session)
+        return session
+
+    @staticmethod
+    def _retex_get_journal():
+        if not constants.BAKE_JOURNAL_DIR:
+            return None
+        journal_path = bake_journal.get_journal_path(constants.BAKE_JOURNAL_DIR, constants.RENDER_ENGINE.name)
+        return bake_journal.BakeJournal(journal_path)
+
+    @staticmethod
+    def _retex_get_bake_options():
+        return constants.render_engine.common.get_bake_options(
+            constants.RENDER_ENGINE,
+            preset=constants.BAKE_PRESET,
+            overrides=constants.BAKE_OPTIONS.get(constants.RENDER_ENGINE.name))
+
+    @staticmethod
+    def _retex_get_thread_policy():
+        if not constants.BAKE_PARALLEL:
+            return None
+        return constants.render_engine.common.get_thread_policy(constants.RENDER_ENGINE,
+                                                                cores=constants.BAKE_CORES,
+                                                                calibration_path=constants.BAKE_CALIBRATION_PATH,
+                                                                small_file_size=constants.BAKE_SMALL_FILE_SIZE,
+                                                                large_file_size=constants.BAKE_LARGE_FILE_SIZE)
+
+    def calibrate_bake(self, qitems_selected):
+        """ Bake the selected textures with several concurrency levels to find the fastest on this host.
+        The selected files should be representative of the textures usually baked, they are baked several times.
+
+        Args:
+            qitems_selected(list): list of QtWidgets.QTreeWidgetItems
+        """
+        sample_paths = []
+        for qitem in qitems_selected:
+            record = self.get_record(qitem)
+            if record.locked:
+                continue
+            sample_paths += [file_path for file_path in record.get_file_paths()
+                             if file_path not in LOCKED_RULES and os.path.exists(file_path)]
+        if not sample_paths:
+            raise DisplayError("No texture to bake in the selection", "Bake calibration")
+
+        self._calib_dialog = QtWidgets.QProgressDialog("Calibrating the {} bake with {} textures ...".format(
+            constants.RENDER_ENGINE.name, len(sample_paths)), None, 0, 0, self)
+        self._calib_dialog.setWindowTitle("Bake calibration")
+        self._calib_dialog.show()
+
+        self.calib_thread = QtCore.QThread(self)
+        self.calib_worker = constants.render_engine.common.BakeCalibration(
+            sample_paths=sample_paths,
+            render_engine=constants.RENDER_ENGINE,
+            calibration_path=constants.BAKE_CALIBRATION_PATH,
+            cores=constants.BAKE_CORES,
+            bake_options=self._retex_get_bake_options())
+        self.calib_worker.moveToThread(self.calib_thread)
+        self.calib_worker.finished.connect(self._calibration_finished)
+        self.calib_thread.started.connect(self.calib_worker.calibrate)
+        self.calib_thread.start()
+
+    def _calibration_finished(self, calibration):
+        self.calib_thread.quit()
+        self._calib_dialog.close()
+        for sample_path in self.calib_worker.sample_paths:
+            constants.STAT_SERVICE.invalidate(constants.render_engine.common.get_retex_target_path(
+                sample_path, render_engine=constants.RENDER_ENGINE))
+        if not calibration:
+            raise_dialog("The calibration failed, see the script editor for details.", "Bake calibration")
+            return
+
+        measures = "\n".join("  {} jobs: {:.1f} MB/s".format(level, value) for level, value in
+                              sorted(calibration["measures"].items(), key=lambda item: int(item[0])))
+        raise_dialog("Best throughput with {} jobs of {} threads on {} cores:\n{}".format(
+            calibration["concurrency"], calibration["job_threads"], calibration["cores"], measures),
+            "Bake calibration")
+        self.tw_update_retex(refresh=True)
+
     def _retex_processed(self, file_processed=None):
         logger.debug("One file processed: {}".format(file_processed))
         self._prg_dialog.setValue(self._prg_dialog.value() + 1)
+        if file_processed and ENABLE_RETEX:
+            self._retex_processed_files.add(file_processed)
+            self._retex_bake_files.add(file_processed)
+            if not self._retex_refresh_timer.isActive():
+                self._retex_refresh_timer.start()
+        return
+
+    def _retex_refresh_processed(self):
+        """ Refresh the records of the files processed since the last call so the tree display the bake progress.
+        The files processed in between are refreshed together, whatever the rate of the bakes.
+
+        Returns:
+            None
+        """
+        self._retex_refresh_timer.stop()
+        processed_files = self._retex_processed_files
+        self._retex_processed_files = set()
+        self.tw_refresh_files_retex(processed_files, file_leaves=self._retex_file_leaves)
         return
 
+    def _retex_job_finished(self, job):
+        """
+        Args:
+            job(dict): see bake_stats.JobTiming
+        """
+        self._bake_stats.add(JobTiming(**job))
+        self._prg_dialog.setLabelText("Baking {} {} ...\n{}".format(len(self._bake_stats.file_sizes),
+                                                                    constants.RENDER_ENGINE.re_tex_ext,
+                                                                    self._bake_stats.get_progress_text()))
+
     def _retex_aborted(self):
         logger.debug("retex baking aborted by user")
         self.worker.abort = True
         self.thread.quit()
 
-    def _retex_finished(self, error_dict, canceled=False):
+    def _retex_finished(self, error_list, canceled=False):
         """ Called when baking for render engine finished or aborted by user
 
         Args:
-            error_dict(dict):
+            error_list(list): file paths that failed to bake, details in self.worker.results
             canceled(bool): True if the method has been called due to a Cancel from the user
 
         Returns:
             None
         """
-        num_texture_bake = self._prg_dialog.maximum() - len(error_dict)
+        num_texture_bake = self._prg_dialog.maximum() - len(error_list)
         logger.info("\n {} baking completed for {} texture: \n"
                     "  -canceled:{} ,"
-                    "  -errors:{}".format(constants.RENDER_ENGINE.re_tex_ext, num_texture_bake, canceled, error_dict))
+                    "  -errors:{}".format(constants.RENDER_ENGINE.re_tex_ext, num_texture_bake, canceled, error_list))
         self.thread.quit()
+        self._failed_bakes = list(error_list)
 
         self._prg_dialog.setValue(self._prg_dialog.maximum())  # end the progress dialog
 
-        self.tw_update_retex()
-        self.tw_update_all_icons()
+        self._bake_stats.finish()
+        logger.info("[retex bake]: {}".format(self._bake_stats.get_summary_text()))
+        if constants.BAKE_HISTORY_PATH and self._bake_stats.jobs:
+            summary = self._bake_stats.get_summary()
+            summary["canceled"] = canceled
+            try:
+                append_history(constants.BAKE_HISTORY_PATH, summary)
+            except (IOError, OSError) as excp:
+                logger.error("[retex bake]: Cannot write the bake history: {}".format(excp))
+
+        self._retex_refresh_processed()  # the files processed since the last refresh
+        if VALIDATE_TEXTURE_HEADERS:
+            # only the baked textures changed, their roots are updated to also refresh the children summary
+            roots = []
+            for file_path in self._retex_bake_files:
+                for record in self._retex_file_leaves.get(file_path, []):
+                    if record.root not in roots:
+                        roots.append(record.root)
+            self.tw_update_texture_issues(roots)
+        self._retex_file_leaves = {}
+        self._retex_bake_files = set()
 
         if canceled:
-            raise_dialog("Baking canceled by user, some items might have been baked thought.", "Baking Canceled")
+            message = "Baking canceled by user, some items might have been baked thought."
+            if constants.BAKE_JOURNAL_DIR:
+                message += "\nThe remaining items can be baked by resuming the session at the next bake."
+            message += "\n\n" + self._bake_stats.get_summary_text()
+            raise_dialog(message, "Baking Canceled")
         else:
             message = "{} baking completed for {}/{} textures: \n".format(constants.RENDER_ENGINE.re_tex_ext,
                                                                           num_texture_bake,
                                                                           self._prg_dialog.maximum())
-            message += "  {} errors: {}".format(len(error_dict), error_dict)
+            message += "  {} errors\n".format(len(error_list))
+            message += self._retex_get_errors_text(error_list)
+            message += "\n" + self._bake_stats.get_summary_text()
             raise_dialog(message, "Baking finished")
         return
 
+    def _retex_get_errors_text(self, error_list, max_errors=10):
+        """
+        Args:
+            error_list(list of str): file paths that failed to bake
+            max_errors(int): maximum number of errors detailed
+
+        Returns:
+            str: one paragraph per error with the processor output
+        """
+        text = ""
+        for file_path in error_list[:max_errors]:
+            result = self.worker.results.get(file_path)
+            # files not in the results are duplicates which failed to be propagated
+            description = result.get_description() if result else "cannot copy the baked duplicate"
+            text += "  {}: {}\n".format(file_path, description)
+        if len(error_list) > max_errors:
+            text += "  ... and {} more, see the script editor\n".format(len(error_list) - max_errors)
+        return text
+
     def _retex_progress_dialog(self, dialog_length):
         prg_dialog = QtWidgets.QProgressDialog("Baking {} Rstex ...".format(dialog_length),
                                                "Abort Operation",
@@ -620,54 +1049,281 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
 
     """ - END BAKING """
 
-    def populate_treewidget(self):
+    def populate_treewidget(self, refresh=False):
         """ Populate the tree widget with all the texture in the scene
 
+        Args:
+            refresh(bool): True to check the render engine textures even if their state is in the shared index
+
         Returns:
             bool: False if no items added
 
         """
         # Clear the treewidget before populating it
         self.tw_remove_items(all_items=True)
-
+        self._scanned_engines = []
+        self._directory_index.clear()
+        # the cache is keyed by expression text, the values it refers to may have changed since the last scan
+        self._expression_cache.clear()
+        self._file_sizes = {}
+
+        timer = PhaseTimer("populate_treewidget")
+        render_engines = self.get_scan_render_engines()
         try:
-            texture_nodes_dict = constants.RENDER_ENGINE.get_re_texture_nodes()
+            if len(render_engines) > 1:
+                nodes_by_engine = constants.render_engine.common.get_texture_nodes_by_engine(render_engines)
+            else:
+                nodes_by_engine = {constants.RENDER_ENGINE.name: constants.RENDER_ENGINE.get_re_texture_nodes()}
         except ValueError as excp:
             logger.warning("TreeWidget not updated: {}".format(excp))
             return False
 
-        for node, data in texture_nodes_dict.items():
-            file_path = data[0]
-            file_param = data[1]
-            self.tw_add_item(in_filepath=file_path, ktn_node=node, file_param=file_param)
+        timer.lap("traversal")
+
+        for re_name, texture_nodes_dict in nodes_by_engine.items():
+            for node, data in texture_nodes_dict.items():
+                self.tw_add_item(in_filepath=data[0], ktn_node=node, file_param=data[1], render_engine=re_name,
+                                 is_expression=data[2])
+        self._scanned_engines = [render_engine.name for render_engine in render_engines]
 
         self.treewidget.collapseAll()
-        self.tw_detect_expression()
-        if ENABLE_RETEX:
-            self.tw_update_retex()
-            self.tw_update_all_icons()
+        if constants.SHARED_INDEX:
+            constants.SHARED_INDEX.flush()  # directory listings done by the scan
+        timer.lap("items")
+        self.tw_detect_expression(query=False)  # the expression flags were read during the traversal
         self.tw_update_path_notexists()
+        timer.lap("existence")
+        if ENABLE_RETEX:
+            self.tw_update_retex(refresh=refresh)
+            timer.lap("retex")
+        self.tw_apply_render_engine_view()
+        timer.lap("view")
+        if FIND_DUPLICATES:
+            self.tw_update_duplicates()
+            timer.lap("duplicates")
+        if self.watcher:
+            self.tw_watch_paths()
+        logger.info(timer.get_text())
         return True
 
-    def tw_add_item(self, in_filepath, ktn_node, file_param):
+    def closeEvent(self, event):
+        if self.watcher:
+            self.watcher.stop()
+        super(TextureMonitorUI, self).closeEvent(event)
+
+    def tw_watch_paths(self):
+        """ Give to the watcher the source and render engine texture paths of all the records.
+
+        Returns:
+            None
+        """
+        self._watched_items = {}
+        watched_directories = set()
+        for record in self._store.get_leaves():
+            if record.sequence_paths is not None:
+                # frames created or deleted later are only seen through the directory of the sequence
+                watched_directories.add(os.path.normpath(record.directory))
+                self._watched_items.setdefault(os.path.normpath(record.directory), []).append(record)
+            for file_path in record.get_file_paths():
+                watched_paths = [file_path]
+                for re_name in self._scanned_engines:
+                    render_engine = getattr(constants.render_engine, re_name)
+                    watched_paths.append(constants.render_engine.common.get_retex_target_path(
+                        file_path, render_engine=render_engine))
+                for watched_path in watched_paths:
+                    self._watched_items.setdefault(os.path.normpath(watched_path), []).append(record)
+
+        self.watcher.set_paths([path for path in self._watched_items if path not in watched_directories],
+                               directories=watched_directories)
+        return
+
+    def tw_on_paths_changed(self, changed_paths):
+        """ Update only the records affected by the given changed files: existence color and render engine
+        texture status.
+
+        Args:
+            changed_paths(list of str): file paths created/deleted/modified, or directories of sequences whose content
+                changed
+
+        Returns:
+            None
+        """
+        records = []
+        sequence_records = []
+        for changed_path in changed_paths:
+            constants.STAT_SERVICE.invalidate(changed_path)
+            self._directory_index.invalidate(os.path.dirname(changed_path))
+            for record in self._watched_items.get(changed_path, []):
+                if record.sequence_paths is not None and changed_path == os.path.normpath(record.directory):
+                    self._directory_index.invalidate(changed_path)
+                    if record not in sequence_records:
+                        sequence_records.append(record)
+                if record not in records:
+                    records.append(record)
+        if not records:
+            return
+        logger.debug("[tw_on_paths_changed] {} items affected by {} changes".format(len(records), len(changed_paths)))
+
+        for record in sequence_records:
+            self._tw_update_sequence(record)
+
+        self._tw_update_existence(records)
+        if ENABLE_RETEX:
+            self.tw_update_retex(records, refresh=True)
+        roots = []
+        for record in records:
+            if record.root not in roots:
+                roots.append(record.root)
+        self.tw_update_root_summaries(roots)
+
+        for root in roots:
+            self._filter_index.set_flags(root, self._get_item_status_flags(root))
+        self.tw_apply_filter()
+        return
+
+    def tw_on_watcher_overflowed(self):
+        """ Events were lost by the watcher, the changed files are unknown: scan everything again.
+
+        Returns:
+            None
+        """
+        logger.warning("[tw_on_watcher_overflowed] Too many file changes to follow, refreshing all the textures")
+        self.populate_treewidget(refresh=True)
+        return
+
+    def _tw_update_sequence(self, record):
+        """ Resolve again the frames of a sequence record, after frames were created or deleted in its directory.
+        The new frames are then watched at the next scan.
+
+        Args:
+            record (TextureRecord): root record of a frame sequence
+
+        Returns:
+            None
+        """
+        render_engine = getattr(constants.render_engine, record.render_engine) if record.render_engine else None
+        sequence = return_sequence_textures(record.file_path, directory_index=self._directory_index,
+                                            path_pattern=render_engine.PATH_PATTERN if render_engine else None)
+        if not sequence:
+            return
+        record.sequence_paths = sequence.file_paths
+        record.missing_frames = sequence.missing_frames
+        if record.qitem is not None:
+            record.qitem.setText(TREEW_DATA["display_path"]["column"],
+                                 get_sequence_display_path(record.file_path, sequence))
+        self._tw_update_item_tooltip(record)
+        return
+
+    def _tw_update_existence(self, records):
+        """ Update the existence of the given records files and their item color.
+        All the files are checked at once by the stat service.
+
+        Args:
+            records (list of TextureRecord):
+
+        Returns:
+            None
+        """
+        existing = constants.STAT_SERVICE.exists_many(file_path for record in records
+                                                      if record.sequence_paths is None
+                                                      for file_path in record.get_file_paths())
+        for record in records:
+            if record.sequence_paths is not None:
+                record.path_missing = not record.sequence_paths
+            else:
+                record.path_missing = not all(existing[file_path] for file_path in record.get_file_paths())
+            if record.path_missing:
+                logger.debug("[TreeWidget] File path ({}) does not exists".format(record.file_path))
+            self._tw_update_item_color(record)
+        return
+
+    def _tw_update_item_color(self, record):
+        """ Set the color of the displayed path from the record state:
+        red if missing, grey for the children, blue if computed from an expression.
+
+        Args:
+            record (TextureRecord):
+
+        Returns:
+            None
+        """
+        if record.locked or record.qitem is None:
+            return  # locked item keep their color
+        if record.path_missing:
+            color = Colors.red_color
+        elif not record.is_root:
+            color = Colors.child
+        elif record.is_expression:
+            color = Colors.blue_color
+        else:
+            color = Colors.text_basic
+
+        record.qitem.setForeground(TREEW_DATA["display_path"]["column"], QtGui.QBrush(QtGui.QColor(color[0],
+                                                                                                   color[1],
+                                                                                                   color[2])))
+        return
+
+    def tw_add_item(self, in_filepath, ktn_node, file_param, render_engine, is_expression=None):
         """ Method used to add a new root item to the treewidget
 
         Args:
             in_filepath(str):
             ktn_node(Nodes3DAPI.ShadingNodeBase):
             file_param:
+            render_engine(str): name of the render engine the node belongs to
+            is_expression(bool or None): expression flag of file_param if already read, None to query it
 
         Returns:
             QWidgets.QTreeWidgetItem
 
         """
 
-        new_root_item = TreewidgetItemHandler(self.treewidget,
-                                              file_path=in_filepath,
-                                              ktn_node=ktn_node,
-                                              file_param=file_param).root_item
+        if is_expression is None:
+            is_expression = bool(file_param.isExpression())
+
+        evaluated_paths = None
+        frames = get_frame_samples(constants.EXPRESSION_FRAME_RANGE, step=constants.EXPRESSION_FRAME_STEP)
+        if frames and is_expression:
+            evaluated_paths = evaluate_parameter_paths(file_param,
+                                                       frames=frames,
+                                                       graph_states=constants.EXPRESSION_GRAPH_STATES,
+                                                       cache=self._expression_cache)
+
+        item_handler = TreewidgetItemHandler(self.treewidget,
+                                             store=self._store,
+                                             file_path=in_filepath,
+                                             ktn_node=ktn_node,
+                                             file_param=file_param,
+                                             evaluated_paths=evaluated_paths,
+                                             render_engine=render_engine,
+                                             directory_index=self._directory_index)
+        item_handler.root_record.is_expression = is_expression
+        self._item_records[item_handler.root_item] = item_handler.root_record
+
+        return item_handler.root_item
+
+    def tw_on_item_expanded(self, qitem):
+        """ Create the items of the children of the expanded root item the first time it is expanded and display
+        the state of their records.
+
+        Args:
+            qitem(QtWidgets.QTreeWidgetItem):
+
+        Returns:
+            None
+        """
+        record = self._item_records.get(qitem)
+        if record is None or not record.is_root:
+            return
 
-        return new_root_item
+        for child in TreewidgetItemHandler.create_child_items(record):
+            self._item_records[child.qitem] = child
+            self._tw_update_item_color(child)
+            self._tw_update_item_font(child)
+            self._tw_update_item_tooltip(child)
+            if ENABLE_RETEX:
+                self._tw_update_item_icon(child)
+        return
 
     def tw_remove_items(self, items2remove=None, all_items=False):
         """ Remove a given item or all the items in the TreeWidget
@@ -682,6 +1338,10 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
         """
         if all_items:
             self.treewidget.clear()
+            self._store.clear()
+            self._item_records = {}
+            self._filter_index.clear()
+            self._filter_hidden = set()
             return True
 
         # Ensure items2remove is iterable
@@ -691,168 +1351,526 @@ class TextureMonitorUI(UI4.Tabs.BaseTab):
             items2remove = [items2remove]
 
         for tree_items in items2remove:
+            record = self._item_records.get(tree_items)
+            if record is not None:
+                self._store.remove(record)
+                for removed in [record] + record.children:
+                    self._item_records.pop(removed.qitem, None)
             self.treewidget.takeTopLevelItem(self.treewidget.indexOfTopLevelItem(tree_items))
 
         return True
 
-    def tw_return_root_items(self):
-        """ Return all items in the treewidget that are direct child of the invisibleRootItem
+    def tw_return_root_records(self, visible_only=False):
+        """ Return the records of all the root items of the treewidget
+
+        Args:
+            visible_only(bool): True to skip the hidden items (ex: items of an other render engine or filtered)
 
         Returns:
-            (list of QtWidgets.QTreeWidgetItem): list of QtWidgets.QTreeWidgetItem
+            list of TextureRecord:
         """
+        if not visible_only:
+            return self._store.get_roots()
+        return [record for record in self._store.get_roots() if record not in self._filter_hidden]
 
-        tw_item_list = []
+    def tw_detect_expression(self, query=True):
+        """ Iterate trough the records and determine if the node source file path is computed from an expression
+
+        Args:
+            query(bool): False to only update the colors from the expression flags already stored on the records
 
-        # source: https://stackoverflow.com/questions/8961449/pyqt-qtreewidget-iterating
-        root = self.treewidget.invisibleRootItem()
-        child_count = root.childCount()
-        # iterate through the direct child of the invisible_root_item
-        for index in range(child_count):
-            qitem_root = root.child(index)
-            tw_item_list.append(qitem_root)
+        Returns:
+            None
 
-        return tw_item_list
+        """
+        for record in self._store.roots:
+            if query:
+                record.is_expression = bool(record.path_parameter.isExpression())
+            self._tw_update_item_color(record)
+        return
 
-    def tw_detect_expression(self):
-        """ Iterate trough the item in the tw and determine if the node source file path is computed from an expression
+    def tw_update_path_notexists(self):
+        """ Check if the paths of the root records without children exist, if not the displayed path take a red
+        color. Children existence is checked when they are created.
 
         Returns:
             None
+        """
+        self._tw_update_existence([record for record in self._store.roots if not record.children])
+        return
+
+    def tw_update_retex(self, records=None, refresh=False):
+        """ Update the renderengine-tex status of the given records, for every scanned render engine.
+        The leaves are checked then the counts of their roots are summed from them, only the items whose
+        status changed are modified.
+        Render Engine agnostic
+
+        Args:
+            records (list of TextureRecord or None): records without children, None for all the leaves of the store
+            refresh (bool): True to check the files even if their state is in the shared index
 
+        Returns:
+            list of TextureRecord: records whose status changed
+        """
+        leaves = self._store.get_leaves() if records is None else records
+        changed = self._tw_update_records_retex(leaves, refresh=refresh)
+        # once children are processed, do the roots
+        roots = set(record.parent for record in leaves if record.parent is not None)
+        for root in roots:
+            if self._tw_update_root_retex(root):
+                changed.append(root)
+
+        for record in changed:
+            self._tw_update_item_icon(record)
+        self.tw_update_root_summaries([record for record in changed if record.children])
+        return changed
+
+    def _tw_update_records_retex(self, records, refresh=False):
+        """ Update the renderengine-tex status of records that don't have children, for every scanned render engine.
+        The files of all the records are checked at once by the stat service.
+
+        Args:
+            records (list of TextureRecord):
+            refresh (bool): True to check the files even if their state is in the shared index
+
+        Returns:
+            list of TextureRecord: records whose status changed
+        """
+        file_paths = set()
+        for record in records:
+            file_paths.update(record.get_file_paths())
+
+        baked_by_engine = {}  # {render engine name: {file path: bool}}
+        for re_name in self._scanned_engines:
+            render_engine = getattr(constants.render_engine, re_name)
+            baked_by_engine[re_name] = constants.render_engine.common.is_retex_baked_many(
+                file_paths, render_engine=render_engine, manifest=constants.BAKE_MANIFEST,
+                stat_service=constants.STAT_SERVICE, shared_index=constants.SHARED_INDEX, refresh=refresh)
+
+        changed = []
+        for record in records:
+            file_paths = record.get_file_paths()
+            retex_counts = {}  # {render engine name: (baked files count, files count)}
+            for re_name, baked in baked_by_engine.items():
+                retex_counts[re_name] = (sum(1 for filepath in file_paths if baked[filepath]), len(file_paths))
+            if self._tw_set_retex_counts(record, retex_counts):
+                changed.append(record)
+        return changed
+
+    def _tw_update_root_retex(self, root):
+        """ Update the renderengine-tex status of a root record by summing the counts of its children,
+        no file is checked.
+
+        Args:
+            root (TextureRecord):
+
+        Returns:
+            bool: True if the status of the root changed
+        """
+        return self._tw_set_retex_counts(root, root.get_children_retex_counts())
+
+    @staticmethod
+    def _tw_set_retex_counts(record, retex_counts):
+        """
+        Args:
+            record (TextureRecord):
+            retex_counts (dict): {render engine name: (baked files count, files count)}
+
+        Returns:
+            bool: True if the counts changed, the DataRole of the record are then updated
+        """
+        if not record.set_retex_counts(retex_counts):
+            return False
+        record.enginetex_status = dict((re_name, get_retex_role(*counts)) for re_name, counts in retex_counts.items())
+        return True
+
+    def tw_refresh_files_retex(self, file_paths, file_leaves=None):
+        """ Update the renderengine-tex status of only the records using the given files, their roots and their
+        filter status.
+
+        Args:
+            file_paths(iterable of str): source texture paths whose render engine texture changed
+            file_leaves(dict or None): result of TextureStore.get_file_leaves(), computed if None
+
+        Returns:
+            None
+        """
+        file_leaves = self._store.get_file_leaves() if file_leaves is None else file_leaves
+        records = set()
+        for file_path in file_paths:
+            records.update(file_leaves.get(file_path, []))
+        if not records:
+            return
+
+        roots = set(record.root for record in self.tw_update_retex(list(records), refresh=True))
+        for root in roots:
+            self._filter_index.set_flags(root, self._get_item_status_flags(root))
+        if roots:
+            self.tw_apply_filter()
+        return
+
+    def tw_update_root_summaries(self, roots=None):
+        """ Display on the root items with children the number of tiles found, baked for the current render engine
+        and missing, so the state of a root is visible without expanding it.
+
+        Args:
+            roots(list of TextureRecord or None): None for all the root records
+
+        Returns:
+            None
         """
-        qitem_root_list = self.tw_return_root_items()
-        for qitem in qitem_root_list:
-            # skip if the item is disabled
-            if qitem.isDisabled():
+        for root in (self._store.roots if roots is None else roots):
+            if not root.children:
                 continue
-            param = qitem.data(TREEW_DATA["path_parameter"]["column"], QtCore.Qt.UserRole)
-            if param.isExpression():
-                qitem.setForeground(TREEW_DATA["display_path"]["column"],
-                                    QtGui.QBrush(QtGui.QColor(Colors.blue_color[0],
-                                                              Colors.blue_color[1],
-                                                              Colors.blue_color[2])))
-            else:
-                qitem.setForeground(TREEW_DATA["display_path"]["column"],
-                                    QtGui.QBrush(QtGui.QColor(Colors.text_basic[0],
-                                                              Colors.text_basic[1],
-                                                              Colors.text_basic[2])))
+            summary = ["{} tiles".format(len(root.children))]
+            if ENABLE_RETEX:
+                summary.append("{} baked".format(root.get_retex_counts(constants.RENDER_ENGINE.name)[0]))
+            missing_count = len([child for child in root.children if child.path_missing])
+            if missing_count:
+                summary.append("{} missing".format(missing_count))
+            root.qitem.setText(TREEW_DATA["display_path"]["column"],
+                               "{}  [{}]".format(root.file_path, ", ".join(summary)))
+        return
+
+    def tw_apply_render_engine_view(self):
+        """ Only display the items belonging to the current render engine and update their icons and issues
+        for it. No node graph traversal is done.
+
+        Returns:
+            None
+        """
+        self.tw_update_root_summaries()
+        if ENABLE_RETEX:
+            self.tw_update_all_icons()
+            if VALIDATE_TEXTURE_HEADERS:
+                self.tw_update_texture_issues()
 
+        # the filter only display the items of the current render engine
+        self.tw_build_filter_index()
+        self.tw_apply_filter()
         return
 
-    def tw_update_path_notexists(self):
-        """ Iterate trough the item in the treewidget. IF the item doesn't have child check if its path exists, if not
-        the displayed path take a red color.
+    def tw_build_filter_index(self):
+        """ Store the paths and status of every root record in the filter index.
 
         Returns:
             None
         """
-        qitem_root_list = self.tw_return_root_items()
-        for qitem_root in qitem_root_list:
-            sub_item_count = qitem_root.childCount()
-            # check if the item has child
-            if not sub_item_count:
-                filepath = qitem_root.data(TREEW_DATA["file_path"]["column"], QtCore.Qt.UserRole)
-                if not os.path.exists(filepath):
-                    qitem_root.setForeground(TREEW_DATA["display_path"]["column"],
-                                             QtGui.QBrush(QtGui.QColor(Colors.red_color[0],
-                                                                       Colors.red_color[1],
-                                                                       Colors.red_color[2])))  # set root item to red
+        self._filter_index.clear()
+        for record in self._store.roots:
+            paths = [record.file_path] + [child.file_path for child in record.children]
+            self._filter_index.add(record,
+                                   paths=paths,
+                                   flags=self._get_item_status_flags(record),
+                                   group=record.render_engine)
+        # records removed since the last build are not hidden anymore
+        self._filter_hidden &= self._filter_index.keys()
         return
 
-    def tw_update_retex(self):
-        """ Update the renderengine-tex value for all the items in the TreeWidget
-        Render Engine agnostic
+    def _get_item_status_flags(self, root):
+        """
+        Args:
+            root (TextureRecord):
+
+        Returns:
+            int: combination of StatusFlag for the given root record and its children
+        """
+        flags = StatusFlag.none
+        if root.path_missing or any(child.path_missing for child in root.children):
+            flags |= StatusFlag.missing
+        if root.is_expression:
+            flags |= StatusFlag.expression
+        if root.get_retex_role(constants.RENDER_ENGINE.name) != DataRole.all_enginetex:
+            flags |= StatusFlag.no_enginetex
+        if root.locked:
+            flags |= StatusFlag.locked
+        return flags
+
+    def tw_apply_filter(self):
+        """ Hide the root items not matching the filter widgets or not belonging to the current render engine.
+        Only the items whose visibility changed are modified.
+
+        Returns:
+            None
+        """
+        try:
+            text_filter = compile_text_filter(self.le_filter.text(), mode=self.cbb_filter_mode.currentText())
+        except ValueError as excp:
+            logger.debug("[tw_apply_filter] {}".format(excp))
+            return  # keep the current filter while the user is typing the regex
+
+        matching = self._filter_index.filter(text_filter=text_filter,
+                                             status_flag=self.cbb_filter_status.currentData(),
+                                             group=constants.RENDER_ENGINE.name)
+        to_hide = self._filter_index.keys() - matching - self._filter_hidden
+        to_show = self._filter_hidden & matching
+        for record in to_hide:
+            record.qitem.setHidden(True)
+        for record in to_show:
+            record.qitem.setHidden(False)
+        self._filter_hidden = (self._filter_hidden | to_hide) - to_show
+        self.tw_update_groups()
+        return
+
+    def toggle_group_view(self, checked):
+        """ Switch between the items per node and the directory view
+
+        Args:
+            checked(bool): True to display the directory view
+        """
+        self.treewidget.setHidden(checked)
+        self.tw_groups.setHidden(not checked)
+        self.tw_update_groups()
+
+    def tw_update_groups(self):
+        """ Rebuild the directory view from the records of the visible root items. Nothing is done while the view
+        is hidden. The file sizes are read once per scan, in bulk.
 
         Returns:
             None
         """
+        if self.tw_groups.isHidden():
+            return
 
-        qitem_root_list = self.tw_return_root_items()
-
-        for qitem_root in qitem_root_list:
-            sub_item_count = qitem_root.childCount()
-            if sub_item_count:
-                # process childrens
-                sub_item_baked_list = []
-                for subitem_index in range(sub_item_count):
-                    qitem_sub = qitem_root.child(subitem_index)
-                    sub_filepath = qitem_sub.data(TREEW_DATA["file_path"]["column"], QtCore.Qt.UserRole)
-
-                    rstex_baked = constants.render_engine.common.is_retex_baked(sub_filepath,
-                                                                      render_engine=constants.RENDER_ENGINE)
-                    if rstex_baked:
-                        qitem_sub.setData(TREEW_DATA["enginetex_baked"]["column"],
-                                          QtCore.Qt.UserRole,
-                                          DataRole.all_enginetex)
-                    else:
-                        qitem_sub.setData(TREEW_DATA["enginetex_baked"]["column"],
-                                          QtCore.Qt.UserRole,
-                                          DataRole.no_enginetex)
-                    sub_item_baked_list.append(rstex_baked)
-
-                # once children are processed, do the root
-                if all(sub_item_baked_list):
-                    qitem_root.setData(TREEW_DATA["enginetex_baked"]["column"],
-                                       QtCore.Qt.UserRole,
-                                       DataRole.all_enginetex)
-                elif any(sub_item_baked_list):
-                    qitem_root.setData(TREEW_DATA["enginetex_baked"]["column"],
-                                       QtCore.Qt.UserRole,
-                                       DataRole.some_enginetex)
-                else:
-                    qitem_root.setData(TREEW_DATA["enginetex_baked"]["column"],
-                                       QtCore.Qt.UserRole,
-                                       DataRole.no_enginetex)
+        groups = get_directory_groups(self.tw_return_root_records(visible_only=True),
+                                      render_engine_name=constants.RENDER_ENGINE.name)
+        unknown_sizes = [file_path for group in groups for file_path in group.file_paths
+                         if file_path not in self._file_sizes]
+        for file_path, file_stat in constants.STAT_SERVICE.stat_many(unknown_sizes).items():
+            self._file_sizes[file_path] = file_stat.st_size if file_stat else None
+
+        self.tw_groups.setSortingEnabled(False)  # else the items move while being filled
+        self.tw_groups.clear()
+        self._group_items = {}
+        for group in groups:
+            group.size = sum(self._file_sizes[file_path] or 0 for file_path in group.file_paths)
+            qitem = QtWidgets.QTreeWidgetItem(self.tw_groups)
+            qitem.setText(0, group.directory)
+            # numbers are set as DisplayRole data so the columns are sorted numerically
+            qitem.setData(1, QtCore.Qt.DisplayRole, group.file_count)
+            qitem.setData(2, QtCore.Qt.DisplayRole, group.missing_count)
+            qitem.setData(3, QtCore.Qt.DisplayRole, int(round(group.bake_ratio * 100)))
+            qitem.setData(4, QtCore.Qt.DisplayRole, round(group.size / (1024.0 * 1024.0), 1))
+            if group.missing_count:
+                qitem.setForeground(0, QtGui.QBrush(QtGui.QColor(200, 70, 70)))
+            self._group_items[qitem] = group
+        self.tw_groups.setSortingEnabled(True)
+        return
+
+    def groups_context_menu(self, point):
+        """ Context menu of the directory view, the actions are done on all the selected directories at once
+
+        Args:
+            point(QtCore.QPoint):
+
+        Returns:
+            bool: True if created
+        """
+        if not self.tw_groups.indexAt(point).isValid():
+            return False
+
+        groups = [self._group_items[qitem] for qitem in self.tw_groups.selectedItems()]
+        # locked textures are never baked or deleted
+        file_paths = [file_path for group in groups for record in group.records if not record.locked
+                      for file_path in record.get_file_paths()]
 
-            # else means this is a toplevel item without children:
+        menu = QtWidgets.QMenu(self)
+        if len(groups) == 1:
+            act_open = menu.addAction("Open the location in Explorer")
+            act_open.triggered.connect(partial(open_file_inexplorer, groups[0].directory))
+            act_open.setIcon(QtGui.QIcon(QtGui.QPixmap(Icons.open_folder).scaled(
+                self.size_contextmenu_icons, self.size_contextmenu_icons,
+                transformMode=QtCore.Qt.SmoothTransformation)))
+            menu.addSeparator()
+
+        if ENABLE_RETEX:
+            if constants.RENDER_ENGINE.support_re_baking:
+                act_retex = menu.addAction("Bake the {} of the {} directories".format(
+                    constants.RENDER_ENGINE.re_tex_ext, len(groups)))
+                act_retex.triggered.connect(partial(self.bake_selection2retex, [], False, file_paths))
+                act_retex.setIcon(QtGui.QIcon(QtGui.QPixmap(Icons.retex_bake).scaled(
+                    self.size_contextmenu_icons, self.size_contextmenu_icons,
+                    transformMode=QtCore.Qt.SmoothTransformation)))
+
+            act_del_retex = menu.addAction("Delete the {} of the {} directories".format(
+                constants.RENDER_ENGINE.re_tex_ext, len(groups)))
+            act_del_retex.triggered.connect(partial(self.delete_retex, file_paths))
+            act_del_retex.setIcon(QtGui.QIcon(QtGui.QPixmap(Icons.retex_remove).scaled(
+                self.size_contextmenu_icons, self.size_contextmenu_icons,
+                transformMode=QtCore.Qt.SmoothTransformation)))
+
+        menu.exec_(QtGui.QCursor.pos())
+        return True
+
+    def tw_update_texture_issues(self, roots=None):
+        """ Read the header of the texture used at render time for every record and store the issues found
+        (untiled, unmipped, ...) on the record, they are displayed in the item tooltip.
+        Render Engine agnostic
+
+        Args:
+            roots(list of TextureRecord or None): root records to update with their children, all if None
+
+        Returns:
+            None
+        """
+        for record in (self._store.roots if roots is None else roots):
+            if record.children:
+                issues_count = 0
+                for child in record.children:
+                    if self._tw_update_item_issues(child):
+                        issues_count += 1
+
+                record.texture_issues = []
+                if issues_count:
+                    record.texture_issues.append("{}/{} files have issues".format(issues_count,
+                                                                                  len(record.children)))
+                self._tw_update_item_tooltip(record)
             else:
-                filepath = qitem_root.data(TREEW_DATA["file_path"]["column"], QtCore.Qt.UserRole)
-                rstex_baked = constants.render_engine.common.is_retex_baked(filepath,
-                                                                            render_engine=constants.RENDER_ENGINE)
-                if rstex_baked:
-                    qitem_root.setData(TREEW_DATA["enginetex_baked"]["column"],
-                                       QtCore.Qt.UserRole,
-                                       DataRole.all_enginetex)
-                else:
-                    qitem_root.setData(TREEW_DATA["enginetex_baked"]["column"],
-                                       QtCore.Qt.UserRole,
-                                       DataRole.no_enginetex)
-            # end of iterating through root items
+                self._tw_update_item_issues(record)
+        if constants.SHARED_INDEX:
+            constants.SHARED_INDEX.flush()
         return
 
-    def tw_update_all_icons(self):
-        """ Iterate trough all the item in th TreeWidget and update their icons
+    def _tw_update_item_issues(self, record):
+        """ Update the texture issues on a single record
+
+        Args:
+            record (TextureRecord):
+
+        Returns:
+            list of str: issues found for the file used at render time
+        """
+        filepath = record.file_path
+        if record.sequence_paths:
+            filepath = record.sequence_paths[0]  # frames of a sequence are expected to share the same storage
+        issues = constants.render_engine.common.get_retex_issues(filepath,
+                                                                 render_engine=constants.RENDER_ENGINE,
+                                                                 max_tile_size=MAX_TILE_SIZE,
+                                                                 shared_index=constants.SHARED_INDEX)
+        render_issues = issues["source"] if issues["retex"] is None else issues["retex"]
+
+        record.texture_issues = []
+        if render_issues:
+            file_type = "Source texture" if issues["retex"] is None else constants.RENDER_ENGINE.re_tex_ext
+            record.texture_issues.append("{} is {}".format(file_type, ", ".join(render_issues)))
+        self._tw_update_item_tooltip(record)
+        return render_issues
+
+    def tw_update_duplicates(self):
+        """ Hash the content of all the textures in the treewidget to find the identical ones, in a thread so the
+        interface is not frozen. See _duplicates_found().
 
         Returns:
             None
         """
-        qitem_root_list = self.tw_return_root_items()
-        for qitem_root in qitem_root_list:
-            self._tw_update_item_icon(qitem_root)
+        self._duplicate_groups = {}
+        self.dup_thread = QtCore.QThread(self)
+        self.dup_worker = constants.render_engine.common.FindDuplicates(
+            file_paths=list(set(record.file_path for record in self._store.get_leaves())),
+            workers=constants.HASH_WORKERS,
+            cache_path=constants.HASH_CACHE_PATH)
+        self.dup_worker.moveToThread(self.dup_thread)
+        # the worker is given so the results of a previous scan can be ignored
+        self.dup_worker.finished.connect(partial(self._duplicates_found, self.dup_worker))
+        self.dup_thread.started.connect(self.dup_worker.find)
+        self.dup_thread.finished.connect(self.dup_thread.deleteLater)
+        self.dup_thread.start()
+        return
+
+    def _duplicates_found(self, worker, groups):
+        """ Items with duplicates are displayed in italic and list their duplicates in their tooltip.
+
+        Args:
+            worker(FindDuplicates): worker that found the groups
+            groups(list of list): groups of file paths with identical content
+
+        Returns:
+            None
+        """
+        worker.thread().quit()
+        if worker is not self.dup_worker:
+            return  # the treewidget has been populated again since this search started
+
+        file_path_records = {}  # {file_path: list of TextureRecord}
+        for record in self._store.get_leaves():
+            file_path_records.setdefault(record.file_path, []).append(record)
+
+        self._duplicate_groups = {}
+        for group in groups:
+            for file_path in group:
+                self._duplicate_groups[file_path] = group
+                for record in file_path_records.get(file_path, []):
+                    record.duplicates = [dup_path for dup_path in group if dup_path != file_path]
+                    self._tw_update_item_font(record)
+                    self._tw_update_item_tooltip(record)
+        return
 
-            sub_item_count = qitem_root.childCount()
-            for subitem_index in range(sub_item_count):
-                qitem_sub = qitem_root.child(subitem_index)
-                self._tw_update_item_icon(qitem_sub)
+    def _tw_update_item_font(self, record):
+        """ Items with duplicates are displayed in italic
 
+        Args:
+            record (TextureRecord):
+
+        Returns:
+            None
+        """
+        if record.qitem is None:
+            return
+        qfont = record.qitem.font(TREEW_DATA["display_path"]["column"])
+        qfont.setItalic(bool(record.duplicates))
+        record.qitem.setFont(TREEW_DATA["display_path"]["column"], qfont)
         return
 
-    def _tw_update_item_icon(self, qitem):
-        """ Update the icon on a single qitem
+    def _tw_update_item_tooltip(self, record):
+        """ Build the tooltip of the given record item from its data (texture issues, duplicates)
 
         Args:
-            qitem (QtWidgets.QTreeWidgetItem):
+            record (TextureRecord):
+
+        Returns:
+            None
+        """
+        if record.qitem is None:
+            return  # the tooltip is built when the item is created
+        tooltip_lines = list(record.texture_issues)
+
+        if record.missing_frames:
+            tooltip_lines.append("Missing frames: {}".format(compress_frame_range(record.missing_frames)))
+
+        if record.duplicates:
+            tooltip_lines.append("{} identical textures:".format(len(record.duplicates)))
+            tooltip_lines += ["  {}".format(dup_path) for dup_path in record.duplicates]
+
+        record.qitem.setToolTip(TREEW_DATA["display_path"]["column"], "\n".join(tooltip_lines))
+        return
+
+    def tw_update_all_icons(self):
+        """ Iterate trough all the records and update the icons of their items
 
         Returns:
             None
         """
+        for record in self._store:
+            self._tw_update_item_icon(record)
+        return
 
-        icon_path = get_icon_for_qitem(qitem=qitem)
+    def _tw_update_item_icon(self, record):
+        """ Update the icon of a single record item for the current render engine
+
+        Args:
+            record (TextureRecord):
+
+        Returns:
+            None
+        """
+        if record.qitem is None:
+            return  # child item not created yet, see tw_on_item_expanded()
+
+        icon_path = get_icon_for_role(record.get_retex_role(constants.RENDER_ENGINE.name, DataRole.no_enginetex))
         pixmap = QtGui.QPixmap(icon_path).scaled(self.size_tw_icons[0],
                                                  self.size_tw_icons[1],
                                                  transformMode=QtCore.Qt.SmoothTransformation)
-        qitem.setIcon(0, QtGui.QIcon(pixmap))
+        record.qitem.setIcon(0, QtGui.QIcon(pixmap))
         return
 
 
@@ -860,123 +1878,189 @@ class TreewidgetItemHandler:
     root_item_font_size = 7.5
     child_item_font_size = 7
 
-    def __init__(self, treewidget, file_path, ktn_node, file_param, **kwargs):
-        """ Create a QTreeWidgetItem with its potential child
+    def __init__(self, treewidget, store, file_path, ktn_node, file_param, evaluated_paths=None, render_engine=None,
+                 directory_index=None):
+        """ Create the TextureRecord of a node path parameter with its potential children and the QTreeWidgetItem
+        of the root. The items of the children are only created when the root item is expanded,
+        see create_child_items().
 
         Args:
             file_param (param): # TODO
             treewidget:
+            store(TextureStore): where the records are added
             file_path(str):
             ktn_node(Nodes3DAPI.ShadingNodeBase):
-            **kwargs: optionnal keyword argument added into TREEW_DATA
+            evaluated_paths(list of str or None): paths returned by the file_param expression over the frames/graph
+                states sampled. Each one is resolved as a child of the root item.
+            render_engine(str): name of the render engine the node belongs to
+            directory_index(DirectoryIndex or None): used to resolve the children and check their existence
 
         Note:
             If file path is computed from an expression: root item get a blue color
             If child item doesn't exists: red color
         """
         self.treewidget = treewidget
+        self.store = store
         self.file_path = os.path.normpath(file_path)
 
         self.locked_item = False
-        if file_path in LOCKED_LIST:
+        if file_path in LOCKED_RULES:
             self.locked_item = True  # the created root item is going to be locked
 
         self.ktn_node = ktn_node
         self.file_param = file_param
-        self.kwargs = kwargs
+        self.evaluated_paths = evaluated_paths
+        self.render_engine = render_engine
+        # tokens of the render engine of the node, not the current one, as several engines can be scanned
+        render_engine_module = getattr(constants.render_engine, render_engine) if render_engine else None
+        self.path_pattern = render_engine_module.PATH_PATTERN if render_engine_module else None
+        self.directory_index = directory_index
 
         self.setup()
 
     def setup(self):
 
+        self.root_record = self.store.add(self.file_path,
+                                          katana_node=self.ktn_node,
+                                          path_parameter=self.file_param,
+                                          render_engine=self.render_engine)
+        self.root_record.locked = self.locked_item
         # return QtWidgets.QTreeWidgetItem
         self.root_item = tw_create_and_add_item(self.treewidget,
+                                                record=self.root_record,
                                                 font_family=FONT_JetBrainNL_Medium,
                                                 font_size=self.root_item_font_size,
-                                                locked_item=self.locked_item,
-                                                display_path=self.file_path,
-                                                katana_node=self.ktn_node,
-                                                file_path=self.file_path,
-                                                path_parameter=self.file_param,
-                                                enginetex_baked=False,
-                                                **self.kwargs)
+                                                display_path=self.file_path)
 
         logger.debug("[TreeWidget] Root-item created for {} with args: {}".format(self.file_path,
                                                                                   [self.file_path, self.ktn_node]))
 
-        child_list = return_children_textures(self.file_path)
-        if child_list:
-            self._create_child_from_root(root_item=self.root_item, matched_path_list=child_list)
+        if self.evaluated_paths and self.evaluated_paths != [self.file_path]:
+            # the expression return different paths over time, each of them is a potential child
+            for evaluated_path in self.evaluated_paths:
+                child_list = return_children_textures(evaluated_path, directory_index=self.directory_index,
+                                                      path_pattern=self.path_pattern)
+                if child_list:
+                    self._create_child_from_root(matched_path_list=child_list)
+                else:
+                    self._create_child_from_root(matched_path_list=[evaluated_path], keep_missing=True)
         else:
-            # means there is no TOKEN/Pattern use in the file path or the child creation tell the pattern used didn't -.
-            # .- return existing files.
-            if not os.path.exists(self.file_path):
-                # If the file doesn't exists it means there is an error in the path
-                self.root_item.setForeground(TREEW_DATA["display_path"]["column"],
-                                             QtGui.QBrush(QtGui.QColor(Colors.red_color[0],
-                                                                       Colors.red_color[1],
-                                                                       Colors.red_color[2])))  # set root item to red
-                logging.info(" File path ({}) does not exists".format(self.file_path))
-            else:
-                # the file exists but doesn't has children so as the root item as already been created return
-                pass
+            sequence = return_sequence_textures(self.file_path, directory_index=self.directory_index,
+                                                path_pattern=self.path_pattern)
+            if sequence:
+                # a frame sequence only use the root item whatever its number of frames
+                self._setup_sequence(sequence)
+                return
+
+            child_list = return_children_textures(self.file_path, directory_index=self.directory_index,
+                                                  path_pattern=self.path_pattern)
+            if child_list:
+                self._create_child_from_root(matched_path_list=child_list)
+            # else means there is no TOKEN/Pattern use in the file path or the child creation tell the pattern used
+            # didn't return existing files. The existence of the root items without children is checked for all of
+            # them at once by TextureMonitorUI.tw_update_path_notexists()
+
+        if self.root_record.children:
+            self.root_item.setChildIndicatorPolicy(QtWidgets.QTreeWidgetItem.ShowIndicator)
+        return
+
+    def _setup_sequence(self, sequence):
+        """ Display the frame range of the sequence on the root item and store its files on the root record.
+
+        Args:
+            sequence(TextureSequence):
+
+        Returns:
+            None
+        """
+        self.root_record.sequence_paths = sequence.file_paths
+        self.root_record.missing_frames = sequence.missing_frames
+
+        self.root_item.setText(TREEW_DATA["display_path"]["column"],
+                               get_sequence_display_path(self.file_path, sequence))
+        if not sequence.frames:
+            logging.info(" Sequence ({}) has no frames".format(self.file_path))
+            return
+
+        if sequence.missing_frames:
+            self.root_item.setToolTip(TREEW_DATA["display_path"]["column"],
+                                      "Missing frames: {}".format(compress_frame_range(sequence.missing_frames)))
         return
 
-    def _create_child_from_root(self, root_item, matched_path_list):
-        """ Create QTreeWidgetItems parented to an item
+    def _create_child_from_root(self, matched_path_list, keep_missing=False):
+        """ Create the child records of the root record, their items are created on expand.
 
         Args:
             matched_path_list (list): list of file paths
-            root_item(QtWidgets.QTreeWidgetItem):
+            keep_missing(bool): True to also create the child for non-existing paths, displayed in red
 
         Returns:
             bool: False if no child created
 
         """
+        if self.directory_index is not None:
+            existing = dict((path, self.directory_index.exists(path)) for path in matched_path_list)
+        else:
+            existing = constants.STAT_SERVICE.exists_many(matched_path_list)
         for matched_path in matched_path_list:
+            path_exists = existing[matched_path]
             # only create child fro existing paths
-            if os.path.exists(matched_path):
-                locked_item = False
-                if self.locked_item or matched_path in LOCKED_LIST:
-                    locked_item = True
-
-                display_path = matched_path
-                try:
-                    tw_create_and_add_item(parent=root_item,
-                                           font_color=Colors.child,
-                                           font_family=FONT_JetBrainNL_Medium,
-                                           font_size=self.child_item_font_size,
-                                           locked_item=locked_item,
-                                           display_path=display_path,
-                                           katana_node=self.ktn_node,
-                                           file_path=matched_path,
-                                           path_parameter=self.file_param,
-                                           enginetex_baked=False,
-                                           **self.kwargs)
-                except Exception as excp:
-                    logger.debug("[Child Item creation]ERROR: {}".format(excp))
-                    continue
-
-                logger.debug("  - One child item created: {} ".format(matched_path))
+            if path_exists or keep_missing:
+                child_record = self.store.add(matched_path,
+                                              katana_node=self.ktn_node,
+                                              path_parameter=self.file_param,
+                                              render_engine=self.render_engine,
+                                              parent=self.root_record)
+                child_record.locked = self.locked_item or matched_path in LOCKED_RULES
+                child_record.path_missing = not path_exists
+                logger.debug("  - One child created: {} ".format(matched_path))
             else:
-                logger.debug("[Child Item creation]: path ({}) doesn't exists".format(matched_path))
+                logger.debug("[Child creation]: path ({}) doesn't exists".format(matched_path))
 
         return True
 
+    @classmethod
+    def create_child_items(cls, root_record):
+        """ Create the QTreeWidgetItems of the children of the given root record, if not already created.
+
+        Args:
+            root_record(TextureRecord):
+
+        Returns:
+            list of TextureRecord: children whose item has been created
+        """
+        created = []
+        for child_record in root_record.children:
+            if child_record.qitem is not None:
+                continue
+            try:
+                tw_create_and_add_item(parent=root_record.qitem,
+                                       record=child_record,
+                                       font_color=Colors.red_color if child_record.path_missing else Colors.child,
+                                       font_family=FONT_JetBrainNL_Medium,
+                                       font_size=cls.child_item_font_size,
+                                       display_path=child_record.file_path)
+            except TreeWidgetItemError as excp:
+                logger.debug("[Child Item creation]ERROR: {}".format(excp))
+                continue
+            created.append(child_record)
+
+        return created
+
 
 def tw_create_and_add_item(parent,
+                           record,
                            font_color=None,
                            font_bold=False,
                            font_family=None,
                            font_size=None,
-                           locked_item=False,
                            **kwargs):
-    """ Create a QTreeWidgetItem for the given parent
+    """ Create the QTreeWidgetItem displaying the given record for the given parent
     font* args are used for the display_path (column 0)
     **kwargs keyword should have a name existing as a key in the TREEW_DATA dict
 
     Args:
-        locked_item(bool): if True item.setFlags(QtCore.Qt.NoItemFlags)
+        record(TextureRecord): record displayed by the item, the item is locked if the record is
         font_size(float):
         font_bold(bool):
         parent (QtWidgets.QTreeWidgetItem or QtWidgets.QTreeWidget)
@@ -985,10 +2069,7 @@ def tw_create_and_add_item(parent,
         **kwargs
 
     Keyword Args:
-        file_param (NodegraphAPI.Parameter):
-        file_path (str):
         display_path(str): file path
-        ktn_node(Nodes3DAPI.ShadingNodeBase): Nodes3DAPI.ShadingNodeBase node (depends of the Render Engine)
 
     Returns:
         QtWidgets.QTreeWidgetItem
@@ -1006,11 +2087,7 @@ def tw_create_and_add_item(parent,
         if not treew_data_dict:
             logger.debug("[TWItem creation]: kwarg ({}={}) not found in TREEW_DATA".format(key_arg, arg_value))
             continue
-
-        if treew_data_dict["visible"]:
-            qitem.setText(treew_data_dict["column"], arg_value)
-        else:
-            qitem.setData(treew_data_dict["column"], QtCore.Qt.UserRole, arg_value)
+        qitem.setText(treew_data_dict["column"], arg_value)
 
     # Modify the column 0
     qitem.setTextAlignment(TREEW_DATA["display_path"]["column"], QtCore.Qt.AlignLeft)
@@ -1027,34 +2104,50 @@ def tw_create_and_add_item(parent,
         qfont.setPointSizeF(font_size)
 
     qitem.setFont(TREEW_DATA["display_path"]["column"], qfont)
-    if locked_item:
+    if record.locked:
         qitem.setFlags(QtCore.Qt.NoItemFlags)
         qitem.setForeground(TREEW_DATA["display_path"]["column"],
                             QtGui.QBrush(QtGui.QColor(Colors.text_disable[0],
                                                       Colors.text_disable[1],
                                                       Colors.text_disable[2])))
+    record.qitem = qitem
     return qitem
 
 
-def get_texture_dict_from_twitem(twitem_list):
+def get_sequence_display_path(file_path, sequence):
+    """ Text displayed for a frame sequence: its path followed by its frame range and missing frames count
+
+    Args:
+        file_path(str): path using a frame token
+        sequence(TextureSequence):
+
+    Returns:
+        str
+    """
+    if not sequence.frames:
+        return "{}  [no frames]".format(file_path)
+    display_path = "{}  [{}]".format(file_path, sequence.frame_range)
+    if sequence.missing_frames:
+        display_path += " ({} missing)".format(len(sequence.missing_frames))
+    return display_path
+
+
+def get_texture_dict_from_records(record_list):
     """
 
     Args:
-        twitem_list(list of QtWidgets.QTreeWidgetItem):
+        record_list(list of TextureRecord): root records
 
     Returns:
         dict: {KatanaNode: [file_path, file_param]}
     """
 
     all_texture_node = {}
-    for qitems_root in twitem_list:
-        file_path = qitems_root.data(TREEW_DATA["file_path"]["column"], QtCore.Qt.UserRole)
-        if file_path in LOCKED_LIST:
+    for record in record_list:
+        if record.file_path in LOCKED_RULES:
             continue
-        ktn_node = qitems_root.data(TREEW_DATA["katana_node"]["column"], QtCore.Qt.UserRole)  # int from DataRole
-        file_param = qitems_root.data(TREEW_DATA["path_parameter"]["column"], QtCore.Qt.UserRole)
         # construct the dict for the KLF baking
-        all_texture_node[ktn_node] = [file_path, file_param]
+        all_texture_node[record.katana_node] = [record.file_path, record.path_parameter]
 
     return all_texture_node
 
@@ -1071,6 +2164,10 @@ def get_textures_path_from_texturenodesdict(texturenodes_dict):
     textures_path_list = []
     for ktn_node, data in texturenodes_dict.items():
         file_path = data[0]
+        sequence = return_sequence_textures(file_path)
+        if sequence:
+            textures_path_list += sequence.file_paths
+            continue
         children_list = return_children_textures(file_path)
         if children_list:
             textures_path_list += children_list
@@ -10,6 +10,7 @@ import os
 import glob
 import logging
 import re
+import time
 import webbrowser
 
 from . import constants
@@ -17,13 +18,219 @@ from . import constants
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 
+""" 
+Frame tokens used in file path to load a different file per frame, they are render engine agnostic.
+    - the dict key is a regular expression matching the token
+    - the dict value is the regular expression used to match the frame number in the file name. The token match
+      object is given to format it (ex: to get the padding) """
 
-def return_children_textures(source_texture):
+SEQUENCE_PATTERN = {
+    r'#+': lambda match: r"(-?\d{{{}}})".format(len(match.group())),
+    r'%0?(\d*)d': lambda match: r"(-?\d{{{},}})".format(match.group(1) or 1),
+    r'<frame>|<f>|<FRAME>': lambda match: r"(-?\d+)",
+    r'\$F(\d*)': lambda match: r"(-?\d{{{},}})".format(match.group(1) or 1),
+}
+_SEQUENCE_TOKEN = re.compile("|".join("(?:{})".format(token) for token in SEQUENCE_PATTERN))
+
+
+class TextureSequence(object):
+    """
+    Files of a frame sequence found for a file path using a frame token.
+    """
+
+    def __init__(self, file_path, frame_paths):
+        """
+        Args:
+            file_path(str): file path with the frame token
+            frame_paths(dict): {frame(int): list of file paths for this frame (several if other tokens like UDIM)}
+        """
+        self.file_path = file_path
+        self.frame_paths = frame_paths
+        self.frames = sorted(frame_paths.keys())
+
+    def __repr__(self):
+        return "TextureSequence({}, [{}])".format(self.file_path, self.frame_range)
+
+    @property
+    def file_paths(self):
+        """
+        Returns:
+            list of str: all the files of the sequence ordered by frame
+        """
+        return [path for frame in self.frames for path in sorted(self.frame_paths[frame])]
+
+    @property
+    def frame_range(self):
+        return compress_frame_range(self.frames)
+
+    @property
+    def missing_frames(self):
+        return get_missing_frames(self.frames)
+
+
+def _glob_to_regex(glob_pattern):
+    """ Convert a glob module expression to a regular expression (without anchors).
+
+    Args:
+        glob_pattern(str):
+
+    Returns:
+        str: regular expression
+    """
+    regex = ""
+    index = 0
+    while index < len(glob_pattern):
+        char = glob_pattern[index]
+        if char == "*":
+            regex += ".*"
+        elif char == "?":
+            regex += "."
+        elif char == "[" and "]" in glob_pattern[index + 1:]:
+            end = glob_pattern.index("]", index + 1)
+            char_class = glob_pattern[index + 1:end]
+            if char_class.startswith("!"):
+                char_class = "^" + char_class[1:]  # negated class
+            regex += "[{}]".format(char_class)
+            index = end
+        else:
+            regex += re.escape(char)
+        index += 1
+    return regex
+
+
+def has_sequence_token(file_path):
+    """
+    Returns:
+        bool: True if the file name of the given path use a frame token like #### or %04d
+    """
+    return bool(_SEQUENCE_TOKEN.search(os.path.basename(file_path)))
+
+
+def get_sequence_regex(filename, path_pattern=None):
+    """ Return a compiled regular expression that match the files names of the sequence described by the given
+    filename. The first group capture the frame number. Render engine tokens (UDIM, ...) are also supported.
+    Like glob, the regular expression match the os.path.normcase() file names.
+
+    Args:
+        filename(str): file name (without directory) using a frame token
+        path_pattern(dict or None): PATH_PATTERN of the render engine the path belongs to, the current render
+            engine one if None
+
+    Returns:
+        re.Pattern or None: None if there is no frame token in filename
+    """
+    token_match = _SEQUENCE_TOKEN.search(filename)
+    if not token_match:
+        return None
+
+    frame_regex = None
+    for token, token_regex in SEQUENCE_PATTERN.items():
+        match = re.match(token, token_match.group())
+        if match and match.group() == token_match.group():
+            frame_regex = token_regex(match)
+            break
+
+    if path_pattern is None:
+        path_pattern = constants.RENDER_ENGINE.PATH_PATTERN
+    regex_parts = []
+    for part in (filename[:token_match.start()], filename[token_match.end():]):
+        for pattern, pattern_match in path_pattern.items():
+            part = re.sub(pattern, pattern_match, part)
+        # additional frame tokens use the same frame, they are not captured
+        part = _SEQUENCE_TOKEN.sub("*", part)
+        regex_parts.append(_glob_to_regex(os.path.normcase(part)))
+
+    return re.compile("^{}{}{}$".format(regex_parts[0], frame_regex, regex_parts[1]))
+
+
+def return_sequence_textures(source_texture, directory_index=None, path_pattern=None):
+    """ From a given file path using a frame token, return the files of the sequence.
+    The directory is only listed once whatever the number of frames.
+
+    Args:
+        source_texture(str): filepath
+        directory_index(DirectoryIndex or None): if specified the directory listing is read from it
+        path_pattern(dict or None): PATH_PATTERN of the render engine the path belongs to, the current render
+            engine one if None
+
+    Returns:
+        TextureSequence or bool: False if there is no frame token in the path
+    """
+    source_path, filename = os.path.split(source_texture)
+    sequence_regex = get_sequence_regex(filename, path_pattern=path_pattern)
+    if not sequence_regex:
+        return False
+
+    if directory_index is not None:
+        matches = directory_index.match(source_path, sequence_regex)
+    else:
+        try:
+            dir_content = os.listdir(source_path or ".")
+        except OSError:
+            dir_content = []  # the directory doesn't exists, the sequence is empty
+        # normcased like glob does
+        matches = [(os.path.join(source_path, dir_filename), sequence_regex.match(os.path.normcase(dir_filename)))
+                   for dir_filename in dir_content]
+
+    frame_paths = {}
+    for file_path, match in matches:
+        if match:
+            frame_paths.setdefault(int(match.group(1)), []).append(file_path)
+
+    logger.debug("{} frames find for texture {}".format(len(frame_paths), source_texture))
+    return TextureSequence(source_texture, frame_paths)
+
+
+def compress_frame_range(frames):
+    """ Return a compact representation of the given frames.
+
+    Args:
+        frames(list of int): sorted frames
+
+    Returns:
+        str: ex: "1001-1240, 1250"
+    """
+    ranges = []
+    start = previous = None
+    for frame in frames:
+        if start is None:
+            start = previous = frame
+            continue
+        if frame == previous + 1:
+            previous = frame
+            continue
+        ranges.append((start, previous))
+        start = previous = frame
+    if start is not None:
+        ranges.append((start, previous))
+
+    return ", ".join(str(first) if first == last else "{}-{}".format(first, last) for first, last in ranges)
+
+
+def get_missing_frames(frames):
+    """
+    Args:
+        frames(list of int): sorted frames
+
+    Returns:
+        list of int: frames missing between the first and last frame
+    """
+    if not frames:
+        return []
+    existing = set(frames)
+    return [frame for frame in range(frames[0], frames[-1] + 1) if frame not in existing]
+
+
+def return_children_textures(source_texture, directory_index=None, path_pattern=None):
     """ From a given file path return its potential children. By children, it means other files that are associated
     to the source thanks to a tokken/pattern like <UDIM>.
 
     Args:
         source_texture(str): filepath
+        directory_index(DirectoryIndex or None): if specified the children are matched against its directory listing
+            instead of using glob
+        path_pattern(dict or None): PATH_PATTERN of the render engine the path belongs to, the current render
+            engine one if None
 
     Returns:
         list of str or bool:
@@ -31,8 +238,10 @@ def return_children_textures(source_texture):
     """
 
     source_path, filename = os.path.split(source_texture)  # split the path to apply search only on the filename
+    if path_pattern is None:
+        path_pattern = constants.RENDER_ENGINE.PATH_PATTERN
     pattern_find_list = []
-    for pattern, pattern_match in constants.RENDER_ENGINE.PATH_PATTERN.items():
+    for pattern, pattern_match in path_pattern.items():
         c_pattern = re.compile(pattern)
         match_grp = c_pattern.findall(filename)
         if match_grp:  # this means there is more than one texture (ex: UDIM)
@@ -42,8 +251,14 @@ def return_children_textures(source_texture):
     if filename == os.path.split(source_texture)[-1]:
         # means there was no pattern replace in the original source_texture path so no children will be find
         return False
-    path2match = os.path.join(source_path, filename)
-    matched_path_list = glob.glob(path2match)  # list of file path
+    if directory_index is not None:
+        # normcased like glob does, the index match the normcased file names
+        filename_regex = re.compile("^{}$".format(_glob_to_regex(os.path.normcase(filename))))
+        matched_path_list = [path for path, _match in directory_index.match(source_path, filename_regex)
+                             if filename.startswith(".") or not os.path.basename(path).startswith(".")]  # as glob
+    else:
+        path2match = os.path.join(source_path, filename)
+        matched_path_list = glob.glob(path2match)  # list of file path
     if not matched_path_list:  # means there is an error in the filepath given by the user (no file found)
         return False
     else:
@@ -52,6 +267,34 @@ def return_children_textures(source_texture):
         return matched_path_list
 
 
+class PhaseTimer(object):
+    """
+    Measure the duration of the successive phases of a process (ex: the scan of the scene) for the logs.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.phases = []  # list of (phase name, seconds)
+        self._start_time = time.time()
+        self._lap_time = self._start_time
+
+    def lap(self, phase_name):
+        """ End the current phase.
+        """
+        now = time.time()
+        self.phases.append((phase_name, now - self._lap_time))
+        self._lap_time = now
+
+    @property
+    def total(self):
+        return self._lap_time - self._start_time
+
+    def get_text(self):
+        return "[{}] {:.3f}s: {}".format(self.name, self.total,
+                                         ", ".join("{} {:.3f}s".format(name, duration)
+                                                   for name, duration in self.phases))
+
+
 def open_file_inexplorer(path2open):
     """ Open the given file path in the OS explorer
 
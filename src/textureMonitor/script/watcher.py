@@ -0,0 +1,321 @@
+"""
+Watch the directories used by the textures of the scene and report the files created/deleted/modified in them,
+so the interface can be updated without a full refresh.
+
+Linux use inotify when available, other OS (or network filesystems where inotify doesn't see remote changes) can
+use the polling backend. Events are collected in a background thread and emitted in batches from the Qt thread,
+so a burst of events (ex: a bake writing hundreds of files) only trigger a few updates.
+
+Python 2.7 only
+Katana script, tested on 3.6v4
+"""
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import logging
+import threading
+
+from PyQt5 import QtCore
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class WatcherBackend:
+    """
+    Available methods to watch the directories
+    """
+    auto = "auto"
+    inotify = "inotify"
+    polling = "polling"
+
+
+# inotify constants from <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_CLOEXEC = 0x00080000
+_IN_WATCH_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE |
+                  _IN_DELETE)
+_INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _load_libc_inotify():
+    """
+    Returns:
+        ctypes.CDLL or None: libc if it supports inotify
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1  # raise AttributeError if not available
+        return libc
+    except (ImportError, OSError, AttributeError):
+        return None
+
+
+class _InotifyThread(threading.Thread):
+    """
+    Read the inotify events of the watched directories and push the paths affected to the callback.
+    overflow_callback is called instead when the kernel queue overflowed and events were lost.
+    """
+
+    def __init__(self, libc, directories, callback, overflow_callback):
+        super(_InotifyThread, self).__init__()
+        self.daemon = True
+        self.libc = libc
+        self.callback = callback
+        self.overflow_callback = overflow_callback
+        self._stop_event = threading.Event()
+        self._watch_dirs = {}  # {watch descriptor: directory}
+
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError("inotify_init1 failed with errno {}".format(self._errno()))
+
+        for directory in directories:
+            wd = libc.inotify_add_watch(self.fd, directory.encode(sys.getfilesystemencoding()), _IN_WATCH_MASK)
+            if wd < 0:
+                logger.debug("[_InotifyThread] Cannot watch {}: errno {}".format(directory, self._errno()))
+                continue
+            self._watch_dirs[wd] = directory
+
+    @staticmethod
+    def _errno():
+        import ctypes
+        return ctypes.get_errno()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                readable, _, _ = select.select([self.fd], [], [], 0.5)
+                if not readable:
+                    continue
+                try:
+                    data = os.read(self.fd, 64 * 1024)
+                except OSError as excp:
+                    if excp.errno == errno.EAGAIN:
+                        continue
+                    raise
+                self.callback(self._parse_events(data))
+        finally:
+            os.close(self.fd)
+
+    def _parse_events(self, data):
+        """
+        Args:
+            data(bytes): raw inotify events
+
+        Returns:
+            list of str: paths affected by the events
+        """
+        paths = []
+        offset = 0
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            wd, mask, _cookie, name_length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            if mask & _IN_Q_OVERFLOW:
+                self.overflow_callback()
+                offset += name_length
+                continue
+            name = data[offset:offset + name_length].rstrip(b"\0").decode(sys.getfilesystemencoding())
+            offset += name_length
+            directory = self._watch_dirs.get(wd)
+            if directory and name:
+                paths.append(os.path.join(directory, name))
+        return paths
+
+
+class _PollingThread(threading.Thread):
+    """
+    Periodically stat the watched files to find the ones created/deleted/modified.
+    Only the files of interest are checked, not the full directories content.
+    """
+
+    def __init__(self, file_paths, callback, interval):
+        super(_PollingThread, self).__init__()
+        self.daemon = True
+        self.file_paths = list(file_paths)
+        self.callback = callback
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._snapshot = None  # taken by run(), the thread is created from the UI thread
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _take_snapshot(self):
+        """
+        Returns:
+            dict: {file path: (mtime, size) or None if it doesn't exists}
+        """
+        snapshot = {}
+        for file_path in self.file_paths:
+            try:
+                file_stat = os.stat(file_path)
+                snapshot[file_path] = (file_stat.st_mtime, file_stat.st_size)
+            except OSError:
+                snapshot[file_path] = None
+        return snapshot
+
+    def run(self):
+        self._snapshot = self._take_snapshot()
+        while not self._stop_event.wait(self.interval):
+            snapshot = self._take_snapshot()
+            changed = [path for path, state in snapshot.items() if self._snapshot.get(path) != state]
+            self._snapshot = snapshot
+            if changed:
+                self.callback(changed)
+
+
+class DirectoryWatcher(QtCore.QObject):
+    """
+    Watch a set of files (through their directories) and emit the ones that changed.
+    Whole directories can also be watched, any change of their content is then emitted as the directory path.
+
+    Signals:
+        paths_changed(list): list of file paths created/deleted/modified since the last emission
+        overflowed(): events were lost, the changes since the last emission are unknown
+    """
+    paths_changed = QtCore.pyqtSignal(list)
+    overflowed = QtCore.pyqtSignal()
+
+    def __init__(self, backend=WatcherBackend.auto, poll_interval=5.0, coalesce_delay=0.5, parent=None):
+        """
+        Args:
+            backend(str): a WatcherBackend value
+            poll_interval(float): seconds between two checks with the polling backend
+            coalesce_delay(float): seconds without new events before emitting the changes collected
+            parent(QtCore.QObject or None):
+        """
+        super(DirectoryWatcher, self).__init__(parent)
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.coalesce_delay = coalesce_delay
+
+        self._file_paths = set()
+        self._directories = set()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._overflowed = False
+        self._last_event_time = 0
+        self._first_event_time = 0
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(int(coalesce_delay * 1000 / 2) or 100)
+        self._timer.timeout.connect(self._flush)
+
+    def set_paths(self, file_paths, directories=None):
+        """ Set the files to watch and (re)start watching.
+
+        Args:
+            file_paths(list of str):
+            directories(iterable of str or None): directories whose whole content is watched
+        """
+        self.stop()
+        self._file_paths = set(os.path.normpath(path) for path in file_paths if path)
+        self._directories = set(os.path.normpath(path) for path in directories or [] if path)
+        if self._file_paths or self._directories:
+            self.start()
+
+    def start(self):
+        directories = set(os.path.dirname(path) for path in self._file_paths) | self._directories
+        directories = [directory for directory in directories if os.path.isdir(directory)]
+
+        libc = _load_libc_inotify() if self.backend != WatcherBackend.polling else None
+        if libc:
+            try:
+                self._thread = _InotifyThread(libc, directories, self._on_events, self._on_overflow)
+            except OSError as excp:
+                logger.warning("[DirectoryWatcher] inotify not available, fallback to polling: {}".format(excp))
+        elif self.backend == WatcherBackend.inotify:
+            logger.warning("[DirectoryWatcher] inotify not available, fallback to polling")
+
+        if not self._thread:
+            # the mtime of a directory changes when a file is created or deleted in it
+            self._thread = _PollingThread(self._file_paths | self._directories, self._on_events,
+                                          interval=self.poll_interval)
+
+        self._thread.start()
+        self._timer.start()
+        logger.info("[DirectoryWatcher] Watching {} files in {} directories with {}".format(
+            len(self._file_paths), len(directories), type(self._thread).__name__))
+
+    def stop(self):
+        self._timer.stop()
+        if self._thread:
+            self._thread.stop()
+            self._thread = None
+        with self._lock:
+            self._pending = set()
+            self._overflowed = False
+
+    def _on_events(self, paths):
+        """ Called from the watcher thread
+        """
+        changed = set()
+        for path in paths:
+            if path in self._file_paths or path in self._directories:
+                changed.add(path)
+            directory = os.path.dirname(path)
+            if directory in self._directories:
+                changed.add(directory)
+        paths = changed
+        if not paths:
+            return
+        with self._lock:
+            now = time.time()
+            if not self._pending:
+                self._first_event_time = now
+            self._pending.update(paths)
+            self._last_event_time = now
+
+    def _on_overflow(self):
+        """ Called from the watcher thread
+        """
+        with self._lock:
+            self._overflowed = True
+
+    def _flush(self):
+        """ Called from the Qt thread, emit the pending paths once no new event arrived for coalesce_delay.
+        A continuous stream of events is still emitted every 10*coalesce_delay.
+        """
+        with self._lock:
+            overflowed = self._overflowed
+            if overflowed:
+                self._overflowed = False
+                self._pending = set()
+        if overflowed:
+            logger.warning("[DirectoryWatcher] Event queue overflowed, changes were lost")
+            self.overflowed.emit()
+            return
+
+        with self._lock:
+            if not self._pending:
+                return
+            now = time.time()
+            quiet = now - self._last_event_time >= self.coalesce_delay
+            overdue = now - self._first_event_time >= self.coalesce_delay * 10
+            if not (quiet or overdue):
+                return
+            paths = sorted(self._pending)
+            self._pending = set()
+
+        logger.debug("[DirectoryWatcher] {} paths changed".format(len(paths)))
+        self.paths_changed.emit(paths)
@@ -0,0 +1,118 @@
+"""
+Benchmark of the node graph traversal done at each scan, with a mocked NodegraphAPI so it can run outside Katana
+with thousands of nodes. The parameter reads are counted as they are the expensive calls in Katana.
+
+usage (PyQt5 must be importable, ex: with the python of Katana):
+    python benchmark_traversal.py [node count]
+"""
+import os
+import sys
+import time
+import types
+import random
+
+
+class FakeParameter(object):
+
+    reads = 0  # getValue/isExpression calls of all the parameters
+
+    def __init__(self, value, expression=False):
+        self.value = value
+        self.expression = expression
+
+    def getValue(self, frame):
+        FakeParameter.reads += 1
+        return self.value
+
+    def isExpression(self):
+        FakeParameter.reads += 1
+        return self.expression
+
+
+class FakeNode(object):
+
+    def __init__(self, name, node_type, parameters):
+        self.name = name
+        self.node_type = node_type
+        self.parameters = parameters  # {parameter path: FakeParameter}
+
+    def __repr__(self):
+        return "FakeNode({})".format(self.name)
+
+    def getName(self):
+        return self.name
+
+    def getType(self):
+        return self.node_type
+
+    def getParameter(self, parameter_path):
+        return self.parameters.get(parameter_path)
+
+
+class FakeNodegraphAPI(object):
+
+    nodes = []
+
+    @classmethod
+    def GetAllNodes(cls, includeDeleted=False):
+        return list(cls.nodes)
+
+    @classmethod
+    def GetAllNodesByType(cls, node_type, includeDeleted=False, sortByName=True):
+        nodes = [node for node in cls.nodes if node.node_type == node_type]
+        if sortByName:
+            nodes.sort(key=lambda node: node.name)
+        return nodes
+
+
+def build_scene(node_count, texture_ratio=0.3, expression_ratio=0.05):
+    """ Fill the mocked node graph with Arnold shading nodes, some of them being image nodes.
+
+    Args:
+        node_count(int):
+        texture_ratio(float): part of the nodes using a texture
+        expression_ratio(float): part of the texture paths computed from an expression
+    """
+    random.seed(0)
+    nodes = []
+    for index in range(node_count):
+        if random.random() < texture_ratio:
+            file_path = "/show/assets/asset{}/textures/tex{}.<UDIM>.tif".format(index % 40, index)
+            parameters = {"nodeType": FakeParameter("image"),
+                          "parameters.filename": FakeParameter(file_path,
+                                                               expression=random.random() < expression_ratio)}
+        else:
+            parameters = {"nodeType": FakeParameter("standard_surface")}
+        nodes.append(FakeNode("node{}".format(index), "ArnoldShadingNode", parameters))
+    # nodes of other types, skipped by the traversal
+    nodes += [FakeNode("group{}".format(index), "Group", {}) for index in range(node_count // 10)]
+    FakeNodegraphAPI.nodes = nodes
+
+
+def main(node_count):
+    katana_module = types.ModuleType("Katana")
+    katana_module.NodegraphAPI = FakeNodegraphAPI
+    sys.modules["Katana"] = katana_module
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+    from textureMonitor.script.render_engine import (common, Arnold)
+
+    build_scene(node_count)
+
+    FakeParameter.reads = 0
+    start_time = time.time()
+    texture_nodes = Arnold.get_re_texture_nodes()
+    duration = time.time() - start_time
+    print("get_re_texture_nodes: {} nodes, {} textures, {} parameter reads in {:.3f}s".format(
+        len(FakeNodegraphAPI.nodes), len(texture_nodes), FakeParameter.reads, duration))
+
+    FakeParameter.reads = 0
+    start_time = time.time()
+    nodes_by_engine = common.get_texture_nodes_by_engine([Arnold])
+    duration = time.time() - start_time
+    print("get_texture_nodes_by_engine: {} textures, {} parameter reads in {:.3f}s".format(
+        len(nodes_by_engine["Arnold"]), FakeParameter.reads, duration))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
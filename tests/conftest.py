@@ -0,0 +1,97 @@
+"""
+The textureMonitor package __init__ loads the Katana interface: the packages are registered here without running
+their __init__ so the pure python modules can be tested outside Katana.
+PyQt5 and Katana are stubbed when they aren't installed, the tests mock NodegraphAPI themselves, so the modules
+defining QObject workers or loading the constants can still be imported.
+
+All python version
+All OS
+"""
+import os
+import sys
+import types
+
+SRC_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+def _register_package(name, path):
+    if name in sys.modules:
+        return
+    package = types.ModuleType(name)
+    package.__path__ = [path]
+    sys.modules[name] = package
+
+
+class _BoundSignal(object):
+
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def emit(self, *args):
+        for slot in self.slots:
+            slot(*args)
+
+
+class _Signal(object):
+    """ Descriptor giving each QObject instance its own signal, like pyqtSignal
+    """
+
+    def __init__(self, *types):
+        self.types = types
+        self.name = "_signal_{}".format(id(self))
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        signal = instance.__dict__.get(self.name)
+        if signal is None:
+            signal = instance.__dict__[self.name] = _BoundSignal()
+        return signal
+
+
+class _QObject(object):
+
+    def __init__(self, parent=None):
+        self._parent = parent
+
+    def moveToThread(self, thread):
+        pass
+
+
+def _stub_pyqt5():
+    try:
+        from PyQt5 import QtCore  # noqa: F401
+        return
+    except ImportError:
+        pass
+    qt_core = types.ModuleType("PyQt5.QtCore")
+    qt_core.QObject = _QObject
+    qt_core.pyqtSignal = _Signal
+    pyqt5 = types.ModuleType("PyQt5")
+    pyqt5.__path__ = []
+    pyqt5.QtCore = qt_core
+    sys.modules["PyQt5"] = pyqt5
+    sys.modules["PyQt5.QtCore"] = qt_core
+
+
+def _stub_katana():
+    try:
+        import Katana  # noqa: F401
+        return
+    except ImportError:
+        pass
+    katana = types.ModuleType("Katana")
+    katana.NodegraphAPI = None  # replaced by the tests using the node graph
+    sys.modules["Katana"] = katana
+
+
+_stub_pyqt5()
+_stub_katana()
+_register_package("textureMonitor", os.path.join(SRC_DIR, "textureMonitor"))
+_register_package("textureMonitor.script", os.path.join(SRC_DIR, "textureMonitor", "script"))
+
+# scratch scripts run at import, they are not tests
+collect_ignore = ["temp_test.py", "test_rstex.py"]
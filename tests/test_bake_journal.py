@@ -0,0 +1,131 @@
+import os
+
+from textureMonitor.script import bake_journal
+
+
+def _write_output(file_path, content="baked"):
+    with open(file_path, "w") as output_file:
+        output_file.write(content)
+
+
+def test_read_journal_events(tmp_path):
+    journal_path = bake_journal.get_journal_path(str(tmp_path), "Arnold")
+    journal = bake_journal.BakeJournal(journal_path)
+    journal.open(["a.tif", "b.tif", "c.tif", "d.tif"], "Arnold")
+    journal.start("a.tif", "a.tx")
+    journal.done("a.tif", "a.tx")
+    journal.start("b.tif", "b.tx")
+    journal.failed("b.tif")
+    journal.start("c.tif", "c.tx")
+    journal.close(completed=False)
+
+    session = bake_journal.read_journal(journal_path)
+    assert session.render_engine_name == "Arnold"
+    assert session.completed == {"a.tif": "a.tx"}
+    assert session.failed == {"b.tif"}
+    assert session.interrupted == {"c.tif": "c.tx"}
+    assert session.remaining == ["b.tif", "c.tif", "d.tif"]
+
+
+def test_truncated_line_ignored(tmp_path):
+    journal_path = str(tmp_path / "Arnold.journal.jsonl")
+    journal = bake_journal.BakeJournal(journal_path)
+    journal.open(["a.tif", "b.tif"], "Arnold")
+    journal.done("a.tif", "a.tx")
+    journal.close(completed=False)
+    with open(journal_path, "a") as journal_file:
+        journal_file.write('{"event": "done", "file": "b.t')
+
+    session = bake_journal.read_journal(journal_path)
+    assert session.remaining == ["b.tif"]
+
+
+def test_journal_without_plan(tmp_path):
+    journal_path = str(tmp_path / "Arnold.journal.jsonl")
+    with open(journal_path, "w") as journal_file:
+        journal_file.write('{"event": "done", "file": "a.tif", "output": "a.tx"}\n')
+
+    assert bake_journal.read_journal(journal_path) is None
+    assert bake_journal.read_journal(str(tmp_path / "missing.journal.jsonl")) is None
+
+
+def test_completed_session_deletes_journal(tmp_path):
+    journal_path = str(tmp_path / "Arnold.journal.jsonl")
+    journal = bake_journal.BakeJournal(journal_path)
+    journal.open(["a.tif"], "Arnold")
+    journal.done("a.tif", "a.tx")
+    journal.close(completed=True)
+
+    assert not os.path.exists(journal_path)
+
+
+def test_resumable_session_has_no_side_effect(tmp_path):
+    journal_path = str(tmp_path / "Arnold.journal.jsonl")
+    partial_output = str(tmp_path / "b.tx")
+    invalid_output = str(tmp_path / "a.tx")
+    _write_output(partial_output, "partial")
+    _write_output(invalid_output)
+
+    journal = bake_journal.BakeJournal(journal_path)
+    journal.open(["a.tif", "b.tif", "c.tif"], "Arnold")
+    journal.done("a.tif", invalid_output)
+    journal.start("b.tif", partial_output)
+    journal.close(completed=False)
+
+    session = bake_journal.get_resumable_session(journal_path, verify_output=lambda source, output: False)
+    assert session.remaining == ["a.tif", "b.tif", "c.tif"]
+    assert session.discarded == {"a.tif": invalid_output, "b.tif": partial_output}
+    assert os.path.exists(partial_output)
+    assert os.path.exists(invalid_output)
+
+    bake_journal.discard_outputs(session)
+    assert not os.path.exists(partial_output)
+    assert not os.path.exists(invalid_output)
+    assert session.discarded == {}
+
+
+def test_nothing_to_resume(tmp_path):
+    journal_path = str(tmp_path / "Arnold.journal.jsonl")
+    journal = bake_journal.BakeJournal(journal_path)
+    journal.open(["a.tif"], "Arnold")
+    journal.done("a.tif", "a.tx")
+    journal.close(completed=False)
+
+    assert bake_journal.get_resumable_session(journal_path) is None
+    assert os.path.exists(journal_path)
+
+
+def test_running_session_is_locked(tmp_path):
+    journal_path = str(tmp_path / "Arnold.journal.jsonl")
+    journal = bake_journal.BakeJournal(journal_path)
+    journal.open(["a.tif", "b.tif"], "Arnold")
+    journal.start("a.tif", "a.tx")
+    try:
+        assert bake_journal.is_journal_locked(journal_path)
+        assert bake_journal.get_resumable_session(journal_path) is None
+
+        other_journal = bake_journal.BakeJournal(journal_path)
+        try:
+            other_journal.open(["c.tif"], "Arnold")
+        except IOError:
+            pass
+        else:
+            raise AssertionError("a running journal must not be overwritten")
+        assert bake_journal.read_journal(journal_path).file_paths == ["a.tif", "b.tif"]
+    finally:
+        journal.close(completed=False)
+
+    assert not bake_journal.is_journal_locked(journal_path)
+    assert bake_journal.get_resumable_session(journal_path).remaining == ["a.tif", "b.tif"]
+
+
+def test_list_journals(tmp_path):
+    for name in ("Arnold", "Redshift"):
+        journal = bake_journal.BakeJournal(bake_journal.get_journal_path(str(tmp_path), name))
+        journal.open(["a.tif"], name)
+        journal.close(completed=False)
+    _write_output(str(tmp_path / "notes.txt"))
+
+    assert [os.path.basename(path) for path in bake_journal.list_journals(str(tmp_path))] == \
+        ["Arnold.journal.jsonl", "Redshift.journal.jsonl"]
+    assert bake_journal.list_journals(str(tmp_path / "missing")) == []
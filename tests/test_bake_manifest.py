@@ -0,0 +1,100 @@
+import os
+import json
+
+from textureMonitor.script import bake_manifest
+from textureMonitor.script.bake_manifest import ManifestSettings, ManifestStatus
+
+
+class RenderEngine(object):
+    name = "Arnold"
+    re_textool = None
+
+
+def _write(file_path, content):
+    with open(file_path, "w") as texture_file:
+        texture_file.write(content)
+
+
+def _bake(tmp_path, settings):
+    source_path = str(tmp_path / "diffuse.tif")
+    output_path = str(tmp_path / "diffuse.tx")
+    _write(source_path, "source")
+    _write(output_path, "output")
+    bake_manifest.write_manifest(source_path, output_path, RenderEngine, settings)
+    return source_path, output_path
+
+
+def test_valid(tmp_path):
+    settings = ManifestSettings()
+    source_path, output_path = _bake(tmp_path, settings)
+
+    assert os.path.exists(output_path + bake_manifest.MANIFEST_EXT)
+    assert bake_manifest.verify_manifest(source_path, output_path, settings) == ManifestStatus.valid
+    assert bake_manifest.verify_manifest_content(output_path, settings) == ManifestStatus.valid
+
+
+def test_missing(tmp_path):
+    settings = ManifestSettings()
+    source_path = str(tmp_path / "diffuse.tif")
+    output_path = str(tmp_path / "diffuse.tx")
+    _write(source_path, "source")
+    _write(output_path, "output")
+
+    assert bake_manifest.verify_manifest(source_path, output_path, settings) == ManifestStatus.missing
+    assert bake_manifest.verify_manifest_content(output_path, settings) == ManifestStatus.missing
+
+
+def test_source_modified(tmp_path):
+    settings = ManifestSettings()
+    source_path, output_path = _bake(tmp_path, settings)
+    _write(source_path, "source painted again")
+
+    assert bake_manifest.verify_manifest(source_path, output_path, settings) == ManifestStatus.stale
+
+
+def test_output_truncated_or_deleted(tmp_path):
+    settings = ManifestSettings()
+    source_path, output_path = _bake(tmp_path, settings)
+    _write(output_path, "out")
+    assert bake_manifest.verify_manifest(source_path, output_path, settings) == ManifestStatus.corrupt
+
+    os.remove(output_path)
+    assert bake_manifest.verify_manifest(source_path, output_path, settings) == ManifestStatus.corrupt
+
+
+def test_output_replaced_same_size(tmp_path):
+    settings = ManifestSettings()
+    source_path, output_path = _bake(tmp_path, settings)
+    _write(output_path, "OUTPUT")
+
+    assert bake_manifest.verify_manifest(source_path, output_path, settings) == ManifestStatus.valid
+    assert bake_manifest.verify_manifest_content(output_path, settings) == ManifestStatus.corrupt
+
+
+def test_malformed_manifest(tmp_path):
+    settings = ManifestSettings()
+    source_path, output_path = _bake(tmp_path, settings)
+    manifest_path = bake_manifest.get_manifest_path(output_path, settings)
+
+    for content in ([], {"output": 1}, {"output": {}, "source": {}}):
+        with open(manifest_path, "w") as manifest_file:
+            json.dump(content, manifest_file)
+        assert bake_manifest.verify_manifest(source_path, output_path, settings) == ManifestStatus.corrupt
+        assert bake_manifest.verify_manifest_content(output_path, settings) == ManifestStatus.corrupt
+
+    _write(manifest_path, "{not json")
+    assert bake_manifest.verify_manifest(source_path, output_path, settings) == ManifestStatus.missing
+
+
+def test_store(tmp_path):
+    settings = ManifestSettings(store=str(tmp_path / "store"))
+    source_path, output_path = _bake(tmp_path, settings)
+
+    manifest_path = bake_manifest.get_manifest_path(output_path, settings)
+    assert manifest_path.startswith(settings.store)
+    assert os.path.exists(manifest_path)
+    assert not os.path.exists(output_path + bake_manifest.MANIFEST_EXT)
+    assert bake_manifest.verify_manifest(source_path, output_path, settings) == ManifestStatus.valid
+
+    bake_manifest.remove_manifest(output_path, settings)
+    assert bake_manifest.verify_manifest(source_path, output_path, settings) == ManifestStatus.missing
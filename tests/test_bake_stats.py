@@ -0,0 +1,51 @@
+import pytest
+
+from textureMonitor.script import bake_stats
+from textureMonitor.script.bake_stats import BakeStats, JobTiming, MEGABYTE
+
+
+def test_format_duration():
+    assert bake_stats.format_duration(None) == "--:--"
+    assert bake_stats.format_duration(59.6) == "1:00"
+    assert bake_stats.format_duration(3725) == "1:02:05"
+
+
+def test_throughput_of_small_files():
+    stats = BakeStats({"a.tif": 500 * 1024, "b.tif": 500 * 1024})
+    stats.add(JobTiming("a.tif", size=500 * 1024, duration=1.0))
+
+    mb_per_second, files_per_second = stats.get_throughput()
+    assert mb_per_second == pytest.approx(500 / 1024.0, rel=0.01)
+    assert files_per_second == pytest.approx(1.0, rel=0.01)
+    assert stats.get_eta() == pytest.approx(1.0, rel=0.01)
+
+
+def test_eta_weighted_by_size():
+    stats = BakeStats({"small.tif": MEGABYTE, "large.tif": 9 * MEGABYTE})
+    assert stats.get_eta() is None
+
+    stats.add(JobTiming("small.tif", size=MEGABYTE, duration=1.0))
+    assert stats.get_eta() == pytest.approx(9.0, rel=0.01)
+
+
+def test_summary(tmp_path):
+    stats = BakeStats({"a.tif": MEGABYTE, "b.tif": 2 * MEGABYTE}, render_engine_name="Arnold")
+    stats.add(JobTiming("a.tif", size=MEGABYTE, duration=1.0))
+    stats.add(JobTiming("b.tif", size=2 * MEGABYTE, duration=3.0, success=False))
+    stats.finish()
+
+    summary = stats.get_summary(slowest_count=1)
+    assert summary["render_engine"] == "Arnold"
+    assert summary["files"] == 2
+    assert summary["failed"] == 1
+    assert summary["bytes"] == 3 * MEGABYTE
+    assert [job["file_path"] for job in summary["slowest"]] == ["b.tif"]
+    assert "b.tif" in stats.get_summary_text()
+
+    history_path = str(tmp_path / "history" / "bakes.jsonl")
+    bake_stats.append_history(history_path, summary)
+    with open(history_path, "a") as history_file:
+        history_file.write("{truncated\n")
+    bake_stats.append_history(history_path, summary)
+    assert [entry["files"] for entry in bake_stats.read_history(history_path)] == [2, 2]
+    assert bake_stats.read_history(str(tmp_path / "missing.jsonl")) == []
@@ -0,0 +1,84 @@
+import os
+import re
+import time
+
+from textureMonitor.script import directory_index
+from textureMonitor.script.directory_index import DirectoryIndex
+from textureMonitor.script.shared_index import SharedIndex
+
+
+def _touch(file_path):
+    with open(file_path, "w"):
+        pass
+
+
+def test_listed_once_until_invalidated(tmp_path):
+    directory = str(tmp_path)
+    _touch(os.path.join(directory, "tex.1001.tif"))
+    index = DirectoryIndex()
+
+    assert index.get_filenames(directory) == frozenset(["tex.1001.tif"])
+    _touch(os.path.join(directory, "tex.1002.tif"))
+    assert index.exists(os.path.join(directory, "tex.1001.tif"))
+    assert not index.exists(os.path.join(directory, "tex.1002.tif"))
+
+    index.invalidate(directory)
+    assert index.exists(os.path.join(directory, "tex.1002.tif"))
+
+
+def test_missing_directory(tmp_path):
+    index = DirectoryIndex()
+    missing_dir = str(tmp_path / "missing")
+
+    assert index.get_filenames(missing_dir) is None
+    assert not index.exists(os.path.join(missing_dir, "tex.tif"))
+    assert index.match(missing_dir, re.compile("^.*$")) == []
+
+
+def test_match_sorted(tmp_path):
+    directory = str(tmp_path)
+    for filename in ("tex.1002.tif", "tex.1001.tif", "other.tif"):
+        _touch(os.path.join(directory, filename))
+    index = DirectoryIndex()
+
+    matches = index.match(directory, re.compile(r"^tex\.(\d{4})\.tif$"))
+    assert [path for path, _match in matches] == [os.path.join(directory, "tex.1001.tif"),
+                                                  os.path.join(directory, "tex.1002.tif")]
+    assert [match.group(1) for _path, match in matches] == ["1001", "1002"]
+
+
+def test_case_insensitive_os(tmp_path, monkeypatch):
+    """ Behave like glob on Windows, where os.path.normcase lower the names
+    """
+    monkeypatch.setattr(directory_index, "_CASE_SENSITIVE", False)
+    monkeypatch.setattr(directory_index.os.path, "normcase", lambda path: path.lower())
+    directory = str(tmp_path)
+    _touch(os.path.join(directory, "Tex.1001.TIF"))
+    index = DirectoryIndex()
+
+    assert index.exists(os.path.join(directory, "tex.1001.tif"))
+    matches = index.match(directory, re.compile(r"^tex\.\d{4}\.tif$"))
+    assert [path for path, _match in matches] == [os.path.join(directory, "Tex.1001.TIF")]
+
+
+def test_listing_reused_from_shared_index(tmp_path):
+    directory = str(tmp_path / "textures")
+    os.makedirs(directory)
+    _touch(os.path.join(directory, "tex.1001.tif"))
+    old_time = time.time() - 60
+    os.utime(directory, (old_time, old_time))
+
+    shared_index = SharedIndex(str(tmp_path / "index.sqlite"))
+    DirectoryIndex(shared_index=shared_index).get_filenames(directory)
+    shared_index.flush()
+
+    # a file added without changing the mtime is not seen: the listing comes from the shared index
+    _touch(os.path.join(directory, "tex.1002.tif"))
+    os.utime(directory, (old_time, old_time))
+    assert DirectoryIndex(shared_index=shared_index).get_filenames(directory) == frozenset(["tex.1001.tif"])
+
+    # the mtime changed, the directory is listed again
+    os.utime(directory, (old_time + 1, old_time + 1))
+    assert DirectoryIndex(shared_index=shared_index).get_filenames(directory) == frozenset(["tex.1001.tif",
+                                                                                            "tex.1002.tif"])
+    shared_index.close()
@@ -0,0 +1,54 @@
+import pytest
+
+from textureMonitor.script.filtering import (FilterIndex, FilterMode, StatusFlag, compile_text_filter)
+
+
+def test_empty_text_filter():
+    for mode in FilterMode.all:
+        assert compile_text_filter("", mode) is None
+
+
+def test_substring_filter():
+    text_filter = compile_text_filter("Wood", FilterMode.substring)
+
+    assert text_filter("/show/tex/wood.tif")
+    assert not text_filter("/show/tex/oak.tif")
+
+
+def test_regex_filter():
+    text_filter = compile_text_filter(r"\.1\d{3}\.", FilterMode.regex)
+
+    assert text_filter("/show/tex/wood.1001.tif")
+    assert not text_filter("/show/tex/wood.tif")
+    with pytest.raises(ValueError):
+        compile_text_filter("wood(", FilterMode.regex)
+
+
+def test_glob_filter():
+    text_filter = compile_text_filter("*/TEX/*.tif", FilterMode.glob)
+    assert text_filter("/show/tex/wood.tif")
+    assert not text_filter("/show/tex/wood.exr")
+
+    # without wildcard the glob is a substring
+    text_filter = compile_text_filter("wood", FilterMode.glob)
+    assert text_filter("/show/tex/wood.tif")
+
+
+def test_filter_index():
+    index = FilterIndex()
+    index.add("wood", ["/show/tex/Wood.tif", "/show/tex/wood.tx"], flags=StatusFlag.missing, group="Arnold")
+    index.add("oak", ["/show/tex/oak.tif"], flags=StatusFlag.missing | StatusFlag.locked, group="Arnold")
+    index.add("pine", ["/show/tex/pine.tif"], group="Redshift")
+
+    assert len(index) == 3
+    assert index.filter() == set(["wood", "oak", "pine"])
+    assert index.filter(text_filter=compile_text_filter(".tx", FilterMode.substring)) == set(["wood"])
+    assert index.filter(text_filter=compile_text_filter("wood", FilterMode.substring)) == set(["wood"])
+    assert index.filter(status_flag=StatusFlag.missing) == set(["wood", "oak"])
+    assert index.filter(status_flag=StatusFlag.locked, group="Arnold") == set(["oak"])
+    assert index.filter(group="Redshift") == set(["pine"])
+
+    index.set_flags("pine", StatusFlag.locked)
+    assert index.filter(status_flag=StatusFlag.locked) == set(["oak", "pine"])
+    index.clear()
+    assert index.keys() == set()
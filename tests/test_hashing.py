@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from textureMonitor.script import hashing
+from textureMonitor.script.hashing import HashCache
+
+
+def test_cache_saved_and_loaded(tmp_path):
+    cache_path = str(tmp_path / "cache" / "hashes.json")
+    cache = HashCache(cache_path)
+    cache.set("/tex/wood.tif", 1600000000.0, 1024, "abc")
+    cache.save()
+
+    loaded = HashCache(cache_path)
+    assert loaded.get("/tex/wood.tif", 1600000000.0, 1024) == "abc"
+    assert loaded.get("/tex/wood.tif", 1600000001.0, 1024) is None
+
+    loaded.set("/tex/oak.tif", 1600000000.0, 2048, "def")
+    loaded.save()
+    assert HashCache(cache_path).get("/tex/oak.tif", 1600000000.0, 2048) == "def"
+    assert os.listdir(str(tmp_path / "cache")) == ["hashes.json"]
+
+
+def test_failed_save_keeps_the_previous_cache(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "hashes.json")
+    cache = HashCache(cache_path)
+    cache.set("/tex/wood.tif", 1600000000.0, 1024, "abc")
+    cache.save()
+
+    def failing_dump(data, json_file):
+        json_file.write("{\"/tex/oak.tif\": ")
+        raise IOError("disk full")
+
+    cache.set("/tex/oak.tif", 1600000000.0, 2048, "def")
+    monkeypatch.setattr(hashing.json, "dump", failing_dump)
+    with pytest.raises(IOError):
+        cache.save()
+    monkeypatch.undo()
+
+    assert HashCache(cache_path).get("/tex/wood.tif", 1600000000.0, 1024) == "abc"
+    assert os.listdir(str(tmp_path)) == ["hashes.json"]
+
+
+def test_hash_files(tmp_path):
+    file_paths = []
+    for name, content in (("a.tif", "same"), ("b.tif", "same"), ("c.tif", "other")):
+        file_path = str(tmp_path / name)
+        with open(file_path, "w") as texture_file:
+            texture_file.write(content)
+        file_paths.append(file_path)
+
+    hashes = hashing.hash_files(file_paths, workers=2, cache=HashCache())
+    assert hashes[file_paths[0]] == hashes[file_paths[1]] != hashes[file_paths[2]]
@@ -0,0 +1,134 @@
+import struct
+
+from textureMonitor.script import image_header
+
+
+def _exr_attribute(name, attr_type, value):
+    return name + b"\x00" + attr_type + b"\x00" + struct.pack("<i", len(value)) + value
+
+
+def write_exr(file_path, width, height, tile_size=None, level_mode=0, round_up=False):
+    version = 2 | (0x200 if tile_size else 0)
+    data = b"\x76\x2f\x31\x01" + struct.pack("<i", version)
+    data += _exr_attribute(b"dataWindow", b"box2i", struct.pack("<iiii", 0, 0, width - 1, height - 1))
+    if tile_size:
+        mode = level_mode | (int(round_up) << 4)
+        data += _exr_attribute(b"tiles", b"tiledesc", struct.pack("<IIB", tile_size, tile_size, mode))
+    data += b"\x00"
+    with open(file_path, "wb") as exr_file:
+        exr_file.write(data)
+
+
+def write_tiff(file_path, width, height, tile_size=None, levels=1):
+    """ Little endian TIFF with one directory per level, the tags are only written on the first one.
+    """
+    entries = [(256, 4, width), (257, 4, height)]
+    if tile_size:
+        entries += [(322, 3, tile_size), (323, 3, tile_size)]
+
+    data = b"II" + struct.pack("<HI", 42, 8)
+    for level in range(levels):
+        level_entries = entries if level == 0 else []
+        next_offset = len(data) + 2 + 12 * len(level_entries) + 4
+        data += struct.pack("<H", len(level_entries))
+        for tag, tag_type, value in level_entries:
+            value_bytes = struct.pack("<H", value) + b"\x00\x00" if tag_type == 3 else struct.pack("<I", value)
+            data += struct.pack("<HHI", tag, tag_type, 1) + value_bytes
+        data += struct.pack("<I", next_offset if level < levels - 1 else 0)
+    with open(file_path, "wb") as tiff_file:
+        tiff_file.write(data)
+
+
+def test_scanline_extension(tmp_path):
+    header = image_header.read_image_header(str(tmp_path / "diffuse.png"))
+    assert header.image_format == "png"
+    assert not header.tiled
+    assert not header.mipmapped
+
+
+def test_exr_tiled_mipmap(tmp_path):
+    file_path = str(tmp_path / "tiled.exr")
+    write_exr(file_path, 1024, 512, tile_size=64, level_mode=1)
+
+    header = image_header.read_image_header(file_path)
+    assert header.image_format == "exr"
+    assert (header.width, header.height) == (1024, 512)
+    assert header.tiled
+    assert (header.tile_width, header.tile_height) == (64, 64)
+    assert header.mip_levels == 11
+    assert header.error is None
+
+
+def test_exr_mipmap_round_up(tmp_path):
+    file_path = str(tmp_path / "round_up.exr")
+    write_exr(file_path, 1000, 1000, tile_size=32, level_mode=1, round_up=True)
+
+    assert image_header.read_image_header(file_path).mip_levels == 11
+
+
+def test_exr_scanline(tmp_path):
+    file_path = str(tmp_path / "scanline.exr")
+    write_exr(file_path, 256, 256)
+
+    header = image_header.read_image_header(file_path)
+    assert (header.width, header.height) == (256, 256)
+    assert not header.tiled
+    assert header.mip_levels == 1
+
+
+def test_tiff_levels(tmp_path):
+    file_path = str(tmp_path / "texture.tx")
+    write_tiff(file_path, 2048, 1024, tile_size=64, levels=3)
+
+    header = image_header.read_image_header(file_path)
+    assert header.image_format == "tiff"
+    assert (header.width, header.height) == (2048, 1024)
+    assert header.tiled
+    assert (header.tile_width, header.tile_height) == (64, 64)
+    assert header.mip_levels == 3
+
+
+def test_tiff_scanline(tmp_path):
+    file_path = str(tmp_path / "texture.tif")
+    write_tiff(file_path, 64, 32)
+
+    header = image_header.read_image_header(file_path)
+    assert (header.width, header.height) == (64, 32)
+    assert not header.tiled
+    assert header.mip_levels == 1
+
+
+def test_truncated_exr_is_reported(tmp_path):
+    file_path = str(tmp_path / "truncated.exr")
+    write_exr(file_path, 1024, 1024, tile_size=64, level_mode=1)
+    with open(file_path, "rb") as exr_file:
+        data = exr_file.read()
+    with open(file_path, "wb") as exr_file:
+        exr_file.write(data[:30])
+
+    header = image_header.read_image_header(file_path)
+    assert header is not None
+    assert header.image_format == "exr"
+    assert header.error
+
+
+def test_truncated_tiff_is_reported(tmp_path):
+    file_path = str(tmp_path / "truncated.tif")
+    write_tiff(file_path, 64, 64)
+    with open(file_path, "rb") as tiff_file:
+        data = tiff_file.read()
+    with open(file_path, "wb") as tiff_file:
+        tiff_file.write(data[:12])
+
+    header = image_header.read_image_header(file_path)
+    assert header.image_format == "tiff"
+    assert header.error
+
+
+def test_unsupported_and_missing(tmp_path):
+    file_path = str(tmp_path / "texture.dat")
+    with open(file_path, "wb") as data_file:
+        data_file.write(b"not an image")
+
+    assert image_header.read_image_header(file_path) is None
+    assert image_header.read_image_header(str(tmp_path / "missing.exr")) is None
@@ -0,0 +1,59 @@
+from textureMonitor.script.locking import LockedRules
+
+
+def test_no_rules():
+    rules = LockedRules()
+
+    assert not len(rules)
+    assert "/show/tex/wood.exr" not in rules
+    assert not rules.match("")
+
+
+def test_exact_rule():
+    rules = LockedRules(["/show/tex/wood.exr"])
+
+    assert "/show/tex/wood.exr" in rules
+    assert "/show/tex/../tex/wood.exr" in rules
+    assert "/show/tex/wood.exr.bak" not in rules
+    assert "/show/tex/oak.exr" not in rules
+
+
+def test_prefix_rule():
+    rules = LockedRules(["/show/library/"])
+
+    assert "/show/library/wood.exr" in rules
+    assert "/show/library/wood/diffuse.exr" in rules
+    assert "/show/library" not in rules
+    assert "/show/library_old/wood.exr" not in rules
+    assert "/show/tex/wood.exr" not in rules
+
+
+def test_glob_rules():
+    rules = LockedRules(["*/legacy/*.tif", "/show/tex/wood_v??.exr"])
+
+    assert "/show/legacy/wood.tif" in rules
+    assert "/show/legacy/wood.exr" not in rules
+    assert "/show/tex/wood_v01.exr" in rules
+    assert "/show/tex/wood_v1.exr" not in rules
+
+
+def test_backslash_rules():
+    """ Rules written with Windows separators match the paths on all the OS
+    """
+    rules = LockedRules(["R:\\show\\wood.exr", "R:\\show\\library\\", "*\\legacy\\*.tif"])
+
+    assert "R:/show/wood.exr" in rules
+    assert "R:\\show\\wood.exr" in rules
+    assert "R:/show/library/wood.exr" in rules
+    assert "/show/legacy/wood.tif" in rules
+    assert "R:\\show\\legacy\\wood.tif" in rules
+
+
+def test_set_rules():
+    rules = LockedRules(["/show/tex/wood.exr"])
+    assert "/show/tex/wood.exr" in rules
+
+    rules.set_rules(["/show/library/"])
+    assert "/show/tex/wood.exr" not in rules
+    assert "/show/library/wood.exr" in rules
+    assert rules.rules == ["/show/library/"]
@@ -0,0 +1,77 @@
+import os
+
+from textureMonitor.script import records
+from textureMonitor.script.records import TextureStore
+
+
+def _path(*parts):
+    return os.path.join(os.sep, "show", *parts)
+
+
+def test_store_hierarchy():
+    store = TextureStore()
+    udim = store.add(_path("tex", "color.<UDIM>.tif"), render_engine="Arnold")
+    tiles = [store.add(_path("tex", "color.{}.tif".format(tile)), parent=udim) for tile in (1001, 1002)]
+    single = store.add(_path("tex", "rough.tif"), render_engine="Redshift")
+
+    assert len(store) == 4
+    assert list(store) == [udim] + tiles + [single]
+    assert store.get_leaves() == tiles + [single]
+    assert udim.get_file_paths() == [tile.file_path for tile in tiles]
+    assert tiles[0].root is udim and udim.is_root and not tiles[0].is_root
+    assert store.get_roots("Redshift") == [single]
+    assert store.get_records(_path("tex", "rough.tif")) == [single]
+    # the directories are interned
+    assert tiles[0].directory is single.directory
+
+    store.remove(udim)
+    assert store.roots == [single]
+    assert store.get_records(tiles[0].file_path) == []
+
+
+def test_sequence_file_leaves():
+    store = TextureStore()
+    sequence = store.add(_path("seq", "smoke.####.exr"))
+    sequence.sequence_paths = [_path("seq", "smoke.1001.exr"), _path("seq", "smoke.1002.exr")]
+    shared = store.add(_path("tex", "rough.tif"))
+    other_node = store.add(_path("tex", "rough.tif"))
+
+    file_leaves = store.get_file_leaves()
+    assert file_leaves[_path("seq", "smoke.1002.exr")] == [sequence]
+    assert file_leaves[_path("tex", "rough.tif")] == [shared, other_node]
+
+
+def test_retex_counts():
+    store = TextureStore()
+    root = store.add(_path("tex", "color.<UDIM>.tif"))
+    first = store.add(_path("tex", "color.1001.tif"), parent=root)
+    second = store.add(_path("tex", "color.1002.tif"), parent=root)
+
+    assert first.get_retex_counts("Arnold") == (0, 0)
+    assert first.set_retex_counts({"Arnold": (1, 1)})
+    assert not first.set_retex_counts({"Arnold": (1, 1)})
+    second.set_retex_counts({"Arnold": (0, 1), "Redshift": (1, 1)})
+    assert root.get_children_retex_counts() == {"Arnold": (1, 2), "Redshift": (1, 1)}
+
+
+def test_directory_groups():
+    store = TextureStore()
+    udim = store.add(_path("tex", "color.<UDIM>.tif"))
+    for tile, baked in ((1001, 1), (1002, 0)):
+        tile_record = store.add(_path("tex", "color.{}.tif".format(tile)), parent=udim)
+        tile_record.set_retex_counts({"Arnold": (baked, 1)})
+    missing = store.add(_path("tex", "missing.tif"))
+    missing.path_missing = True
+    sequence = store.add(_path("seq", "smoke.####.exr"))
+    sequence.sequence_paths = [_path("seq", "smoke.1001.exr"), _path("seq", "smoke.1004.exr")]
+    sequence.missing_frames = [1002, 1003]
+
+    groups = records.get_directory_groups(store.roots, "Arnold")
+    assert [group.directory for group in groups] == [_path("seq"), _path("tex")]
+    sequence_group, texture_group = groups
+    assert sequence_group.file_count == 2
+    assert sequence_group.missing_count == 2
+    assert texture_group.file_count == 3
+    assert texture_group.missing_count == 1
+    assert texture_group.baked_count == 1
+    assert texture_group.bake_ratio == 1 / 3.0
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+
+from textureMonitor.script import shared_index
+from textureMonitor.script.shared_index import SharedIndex
+
+
+def _index(tmp_path, **kwargs):
+    return SharedIndex(str(tmp_path / "index" / "index.sqlite"), **kwargs)
+
+
+def test_listing(tmp_path):
+    index = _index(tmp_path)
+    mtime = time.time() - 60
+    index.set_listing("/textures", mtime, ["b.tif", "a.tif"])
+
+    assert index.get_listing("/textures", mtime) == frozenset(["a.tif", "b.tif"])
+    index.flush()
+    assert _index(tmp_path).get_listing("/textures", mtime) == frozenset(["a.tif", "b.tif"])
+    assert _index(tmp_path).get_listing("/textures", mtime + 1) is None
+    assert _index(tmp_path).get_listing("/other", mtime) is None
+
+
+def test_recent_listing_not_trusted(tmp_path):
+    index = _index(tmp_path)
+    mtime = time.time()
+    index.set_listing("/textures", mtime, ["a.tif"])
+    index.flush()
+
+    assert index.get_listing("/textures", mtime) is None
+
+
+def test_retex_states(tmp_path):
+    index = _index(tmp_path)
+    index.set_retex_states({"/a.tif": True, "/b.tif": False}, "Arnold")
+
+    assert index.get_retex_states(["/a.tif", "/b.tif", "/c.tif"], "Arnold") == {"/a.tif": True, "/b.tif": False}
+    assert index.get_retex_states(["/a.tif"], "Redshift") == {}
+    index.flush()
+    assert _index(tmp_path).get_retex_states(["/a.tif", "/b.tif"], "Arnold") == {"/a.tif": True, "/b.tif": False}
+
+
+def test_retex_states_expire(tmp_path):
+    index = _index(tmp_path)
+    index.set_retex_states({"/a.tif": True}, "Arnold")
+    index.flush()
+
+    assert _index(tmp_path, retex_ttl=-1).get_retex_states(["/a.tif"], "Arnold") == {}
+
+
+def test_many_retex_states(tmp_path):
+    """ More paths than the SQLite parameters limit
+    """
+    index = _index(tmp_path)
+    states = dict(("/tex.{}.tif".format(frame), frame % 2 == 0) for frame in range(1200))
+    index.set_retex_states(states, "Arnold")
+    index.flush()
+
+    assert _index(tmp_path).get_retex_states(list(states), "Arnold") == states
+
+
+def test_non_ascii_byte_paths(tmp_path):
+    index = _index(tmp_path)
+    file_path = u"/textures/été.tif".encode(shared_index._FS_ENCODING)
+    index.set_retex_states({file_path: True}, "Arnold")
+    index.set_listing(b"/textures", time.time() - 60, [os.path.basename(file_path)])
+    index.flush()
+
+    assert index.enabled
+    assert index.get_retex_states([file_path], "Arnold") == {file_path: True}
+
+
+def test_image_header_cached(tmp_path, monkeypatch):
+    file_path = str(tmp_path / "diffuse.png")
+    with open(file_path, "w") as image_file:
+        image_file.write("png")
+
+    reads = []
+    read_image_header = shared_index.image_header.read_image_header
+
+    def counted_read(path):
+        reads.append(path)
+        return read_image_header(path)
+
+    monkeypatch.setattr(shared_index.image_header, "read_image_header", counted_read)
+    index = _index(tmp_path)
+    assert index.read_image_header(file_path).image_format == "png"
+    index.flush()
+    assert _index(tmp_path).read_image_header(file_path).image_format == "png"
+    assert reads == [file_path]
+
+    with open(file_path, "w") as image_file:
+        image_file.write("modified png")
+    assert _index(tmp_path).read_image_header(file_path).image_format == "png"
+    assert len(reads) == 2
+    assert index.read_image_header(str(tmp_path / "missing.png")) is None
+
+
+def test_unusable_database_disable_the_index(tmp_path):
+    db_path = str(tmp_path / "index.sqlite")
+    with open(db_path, "w") as db_file:
+        db_file.write("not a database" * 100)
+    index = SharedIndex(db_path)
+
+    assert index.get_listing("/textures", 0.0) is None
+    assert index.get_retex_states(["/a.tif"], "Arnold") == {}
+    assert not index.enabled
+    index.set_retex_states({"/a.tif": True}, "Arnold")
+    index.flush()
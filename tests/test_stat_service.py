@@ -0,0 +1,101 @@
+import time
+import threading
+
+import pytest
+
+from textureMonitor.script import stat_service
+from textureMonitor.script.stat_service import NegativeCache, StatService
+
+
+def test_map_results():
+    service = StatService(workers=4, batch_size=3)
+
+    # duplicates are only processed once
+    assert service.map(lambda item: item * 2, list(range(20)) + [3]) == dict((item, item * 2) for item in range(20))
+    assert service.map(lambda item: item, []) == {}
+
+
+def test_bounded_pool():
+    """ Never more batches checked at the same time than workers, even with several callers
+    """
+    service = StatService(workers=3, batch_size=2)
+    lock = threading.Lock()
+    running = [0]
+    max_running = [0]
+
+    def slow_check(item):
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.002)
+        with lock:
+            running[0] -= 1
+        return True
+
+    callers = [threading.Thread(target=service.map, args=(slow_check, range(caller * 100, caller * 100 + 40)))
+               for caller in range(3)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+
+    assert 1 < max_running[0] <= 3
+
+
+def test_map_error():
+    def check(item):
+        if item == 5:
+            raise ValueError(item)
+        return item
+
+    with pytest.raises(ValueError):
+        StatService(workers=4, batch_size=2).map(check, range(10))
+
+
+def test_stat_many(tmp_path):
+    file_path = str(tmp_path / "wood.tif")
+    with open(file_path, "w") as texture_file:
+        texture_file.write("tif")
+    missing_path = str(tmp_path / "missing.tif")
+    service = StatService(workers=2, batch_size=1)
+
+    stats = service.stat_many([file_path, missing_path])
+    assert stats[file_path].st_size == 3 and stats[missing_path] is None
+    assert service.exists_many([file_path, missing_path]) == {file_path: True, missing_path: False}
+    assert service.negative_cache is None
+
+
+def test_negative_cache_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(stat_service.time, "time", lambda: now[0])
+    cache = NegativeCache(ttl=30.0)
+    cache.add("/show/missing")
+
+    assert cache.is_missing("/show/missing")
+    assert cache.is_missing("/show/missing/wood.tif")
+    assert not cache.is_missing("/show/wood.tif")
+    now[0] += 31.0
+    assert not cache.is_missing("/show/missing/wood.tif")
+    assert not len(cache)
+
+    cache.add("/show/missing")
+    cache.invalidate("/show/missing/wood.tif")
+    assert not cache.is_missing("/show/missing")
+
+
+def test_missing_files_cached(tmp_path):
+    service = StatService(workers=1, negative_ttl=30.0)
+    file_path = str(tmp_path / "wood.tif")
+    missing_dir_file = str(tmp_path / "missing" / "oak.tif")
+
+    assert not service.exists(file_path)
+    assert not service.exists(missing_dir_file)
+    assert service.negative_cache.is_missing(str(tmp_path / "missing" / "pine.tif"))
+    assert not service.negative_cache.is_missing(str(tmp_path / "pine.tif"))
+
+    # created outside the tool: still missing until the entry expires or is invalidated
+    with open(file_path, "w"):
+        pass
+    assert not service.exists(file_path)
+    service.invalidate(file_path)
+    assert service.exists(file_path)
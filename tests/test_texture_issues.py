@@ -0,0 +1,71 @@
+"""
+Issues flagged from the texture headers and the bake queue sorted with them. PyQt5 and Katana are stubbed by
+conftest when not installed.
+"""
+import os
+
+from textureMonitor.script.render_engine import common
+from textureMonitor.script.render_engine.common import TextureIssue
+
+from test_image_header import (write_exr, write_tiff)
+
+
+class FakeRenderEngine(object):
+
+    re_tex_ext = ".tx"
+
+    @staticmethod
+    def return_retex_from_path(file_path):
+        retex_path = common.get_retex_target_path(file_path, FakeRenderEngine)
+        return retex_path if os.path.exists(retex_path) else None
+
+
+def test_texture_issues(tmp_path):
+    scanline = str(tmp_path / "scanline.exr")
+    write_exr(scanline, 1024, 1024)
+    oversized = str(tmp_path / "oversized.exr")
+    write_exr(oversized, 1024, 1024, tile_size=256, level_mode=1)
+    clean = str(tmp_path / "clean.tif")
+    write_tiff(clean, 1024, 1024, tile_size=64, levels=11)
+
+    assert common.get_texture_issues(scanline, max_tile_size=128) == [TextureIssue.untiled, TextureIssue.unmipped]
+    assert common.get_texture_issues(oversized, max_tile_size=128) == [TextureIssue.oversized_tile]
+    assert common.get_texture_issues(oversized, max_tile_size=256) == []
+    assert common.get_texture_issues(clean, max_tile_size=128) == []
+    assert common.get_texture_issues(str(tmp_path / "missing.exr"), max_tile_size=128) == []
+
+
+def test_corrupted_header(tmp_path):
+    file_path = str(tmp_path / "truncated.exr")
+    write_exr(file_path, 1024, 1024, tile_size=64, level_mode=1)
+    with open(file_path, "rb") as exr_file:
+        data = exr_file.read()
+    with open(file_path, "wb") as exr_file:
+        exr_file.write(data[:20])
+
+    assert common.get_texture_issues(file_path, max_tile_size=128) == [TextureIssue.corrupted]
+
+
+def test_retex_issues_read_the_retex(tmp_path):
+    source = str(tmp_path / "wood.exr")
+    write_exr(source, 1024, 1024)
+    assert common.get_retex_issues(source, FakeRenderEngine, max_tile_size=128) == {
+        "source": [TextureIssue.untiled, TextureIssue.unmipped], "retex": None}
+
+    write_tiff(str(tmp_path / "wood.tx"), 1024, 1024, tile_size=64, levels=11)
+    assert common.get_retex_issues(source, FakeRenderEngine, max_tile_size=128)["retex"] == []
+
+
+def test_sort_bake_queue(tmp_path):
+    """ The files costing the most at render time first, the order kept between files of the same priority
+    """
+    file_paths = []
+    for name, tile_size, level_mode in (("clean", 64, 1), ("scanline", None, 0), ("unmipped", 64, 0),
+                                        ("scanline2", None, 0)):
+        file_path = str(tmp_path / "{}.exr".format(name))
+        write_exr(file_path, 1024, 1024, tile_size=tile_size, level_mode=level_mode)
+        file_paths.append(file_path)
+
+    sorted_paths = common.sort_bake_queue(file_paths, FakeRenderEngine, max_tile_size=128)
+    assert [os.path.basename(path) for path in sorted_paths] == ["scanline.exr", "scanline2.exr", "unmipped.exr",
+                                                                 "clean.exr"]
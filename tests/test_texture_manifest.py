@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from textureMonitor.script import texture_manifest
+from textureMonitor.script.texture_manifest import RetexState
+
+
+def _entry(file_path, **fields):
+    entry = dict.fromkeys(texture_manifest.FIELDS)
+    entry.update({"node": "Image1", "parameter": "Image1.parameters.filename", "render_engine": "Arnold",
+                  "root_path": file_path, "file_path": file_path, "exists": True, "size": 1024,
+                  "mtime": 1600000000.0, "retex": RetexState.baked, "expression": False, "locked": False})
+    entry.update(fields)
+    return entry
+
+
+def test_get_file_entry(tmp_path):
+    file_path = str(tmp_path / "wood.tif")
+    with open(file_path, "w") as texture_file:
+        texture_file.write("tif")
+
+    entry = texture_manifest.get_file_entry(file_path, node="Image1")
+    assert entry["exists"] and entry["size"] == 3 and entry["node"] == "Image1"
+    missing = texture_manifest.get_file_entry(str(tmp_path / "missing.tif"))
+    assert not missing["exists"] and missing["size"] is None
+
+
+@pytest.mark.parametrize("extension", ["jsonl", "csv"])
+def test_write_read_round_trip(tmp_path, extension):
+    entries = [_entry("/tex/wood.1001.tif"),
+               _entry("/tex/wood.1002.tif", exists=False, size=None, mtime=None, retex=RetexState.missing)]
+    manifest_path = str(tmp_path / "manifests" / "scene.{}".format(extension))
+
+    assert texture_manifest.write_manifest(manifest_path, iter(entries)) == 2
+    assert os.path.exists(manifest_path)
+    assert list(texture_manifest.read_manifest(manifest_path)) == entries
+
+
+def test_diff():
+    old_entries = [_entry("/tex/wood.1001.tif"),
+                   _entry("/tex/wood.1002.tif"),
+                   _entry("/tex/oak.tif")]
+    new_entries = [_entry("/tex/wood.1001.tif"),
+                   _entry("/tex/wood.1002.tif", size=2048, retex=RetexState.missing),
+                   _entry("/tex/pine.tif")]
+
+    diff = texture_manifest.diff_manifests(old_entries, new_entries)
+    assert diff
+    assert [entry["file_path"] for entry in diff.added] == ["/tex/pine.tif"]
+    assert [entry["file_path"] for entry in diff.removed] == ["/tex/oak.tif"]
+    assert [(new["file_path"], fields) for _old, new, fields in diff.changed] == [
+        ("/tex/wood.1002.tif", ["size", "retex"])]
+    assert "~ /tex/wood.1002.tif" in diff.get_text()
+
+    # only the given fields are compared
+    diff = texture_manifest.diff_manifests(old_entries, new_entries, fields=["exists"])
+    assert not diff.changed
+
+    assert not texture_manifest.diff_manifests(old_entries, list(old_entries))
+
+
+def test_same_file_used_by_two_nodes():
+    """ Entries are identified by node and parameter too, not only the file
+    """
+    old_entries = [_entry("/tex/wood.tif")]
+    new_entries = [_entry("/tex/wood.tif"),
+                   _entry("/tex/wood.tif", node="Image2", parameter="Image2.parameters.filename")]
+
+    diff = texture_manifest.diff_manifests(old_entries, new_entries)
+    assert [entry["node"] for entry in diff.added] == ["Image2"]
+    assert not diff.removed and not diff.changed
+
+
+def test_summary():
+    summary = texture_manifest.get_summary([_entry("/tex/a.tif"),
+                                            _entry("/tex/b.tif", exists=False, size=None, retex=RetexState.missing),
+                                            _entry("/tex/c.tif", retex=None)])
+
+    assert summary == {"entries": 3, "missing": 1, "size": 2048,
+                       "retex": {RetexState.baked: 1, RetexState.missing: 1, RetexState.unknown: 1}}
@@ -0,0 +1,189 @@
+"""
+The single traversal of the node graph must find the same textures as the traversal it replaced, where each render
+engine read its own parameters and the expression flag was queried afterwards by the interface.
+NodegraphAPI is mocked so the scene can be built outside Katana, PyQt5 and Katana are stubbed by conftest when not
+installed.
+"""
+import os
+import random
+
+import pytest
+
+
+class FakeParameter(object):
+
+    reads = 0  # getValue/isExpression calls of all the parameters
+
+    def __init__(self, value, expression=False, error=None):
+        self.value = value
+        self.expression = expression
+        self.error = error  # exception raised by getValue, ex: an expression that can't be evaluated
+
+    def getValue(self, frame):
+        FakeParameter.reads += 1
+        if self.error:
+            raise self.error
+        return self.value
+
+    def isExpression(self):
+        FakeParameter.reads += 1
+        return self.expression
+
+
+class FakeNode(object):
+
+    def __init__(self, name, node_type, parameters):
+        self.name = name
+        self.node_type = node_type
+        self.parameters = parameters  # {parameter path: FakeParameter}
+
+    def __repr__(self):
+        return "FakeNode({})".format(self.name)
+
+    def getName(self):
+        return self.name
+
+    def getType(self):
+        return self.node_type
+
+    def getParameter(self, parameter_path):
+        return self.parameters.get(parameter_path)
+
+
+class FakeNodegraphAPI(object):
+
+    nodes = []
+
+    @classmethod
+    def GetAllNodes(cls, includeDeleted=False):
+        return list(cls.nodes)
+
+    @classmethod
+    def GetAllNodesByType(cls, node_type, includeDeleted=False, sortByName=True):
+        nodes = [node for node in cls.nodes if node.node_type == node_type]
+        if sortByName:
+            nodes.sort(key=lambda node: node.name)
+        return nodes
+
+
+# {render engine name: (katana node type, {nodeType value: path parameter})} as read by the previous traversal
+LEGACY_TEXTURE_PARAMETERS = {
+    "Arnold": ("ArnoldShadingNode", {"image": "parameters.filename"}),
+    "Delight": ("DlShadingNode", {"dlTexture": "parameters.textureFile.value",
+                                  "file": "parameters.fileTextureName.value"}),
+    "Redshift": ("RedshiftShadingNode", {"TextureSampler": "parameters.tex0.value"}),
+}
+
+
+def legacy_get_texture_from_node(ktnnode, render_engine_name):
+    """ get_texture_from_node() of the render engines before the traversal was shared
+    """
+    try:
+        node_type_value = ktnnode.getParameter("nodeType").getValue(0)
+    except:
+        return None
+
+    parameter_path = LEGACY_TEXTURE_PARAMETERS[render_engine_name][1].get(node_type_value)
+    if parameter_path is None:
+        return None
+    ts_path_param = ktnnode.getParameter(parameter_path)
+    try:
+        file_path = str(ts_path_param.getValue(0))
+    except Exception:
+        return None
+    if file_path:
+        return [os.path.normpath(file_path), ts_path_param]
+    return None
+
+
+def legacy_get_texture_nodes(render_engine_name):
+    """
+    Returns:
+        dict: {node: (file path, parameter, is_expression)}, the expression flag queried after the traversal
+    """
+    texture_nodes = {}
+    katana_node_type = LEGACY_TEXTURE_PARAMETERS[render_engine_name][0]
+    for ktnnode in FakeNodegraphAPI.GetAllNodesByType(katana_node_type, includeDeleted=False, sortByName=True):
+        texture_data = legacy_get_texture_from_node(ktnnode, render_engine_name)
+        if texture_data:
+            texture_nodes[ktnnode] = texture_data
+    return dict((node, (data[0], data[1], bool(data[1].isExpression()))) for node, data in texture_nodes.items())
+
+
+def build_scene(node_count, texture_ratio=0.3, expression_ratio=0.05):
+    """ Fill the mocked node graph with the shading nodes of all the render engines, some of them using a texture,
+    and with the edge cases the traversal must survive.
+    """
+    random.seed(0)
+    nodes = []
+    for index in range(node_count):
+        render_engine_name = sorted(LEGACY_TEXTURE_PARAMETERS)[index % len(LEGACY_TEXTURE_PARAMETERS)]
+        katana_node_type, texture_parameters = LEGACY_TEXTURE_PARAMETERS[render_engine_name]
+        if random.random() < texture_ratio:
+            node_type_value = random.choice(sorted(texture_parameters))
+            file_path = "/show/assets/asset{}/textures/tex{}.<UDIM>.tif".format(index % 40, index)
+            parameters = {"nodeType": FakeParameter(node_type_value),
+                          texture_parameters[node_type_value]: FakeParameter(
+                              file_path, expression=random.random() < expression_ratio)}
+        else:
+            parameters = {"nodeType": FakeParameter("surface")}
+        nodes.append(FakeNode("node{}".format(index), katana_node_type, parameters))
+
+    nodes += [
+        FakeNode("no_node_type", "ArnoldShadingNode", {}),
+        FakeNode("broken_node_type", "ArnoldShadingNode", {"nodeType": FakeParameter("", error=RuntimeError("eval")),
+                                                           "parameters.filename": FakeParameter("/show/tex/b.tif")}),
+        FakeNode("no_path_parameter", "ArnoldShadingNode", {"nodeType": FakeParameter("image")}),
+        FakeNode("empty_path", "RedshiftShadingNode", {"nodeType": FakeParameter("TextureSampler"),
+                                                       "parameters.tex0.value": FakeParameter("")}),
+        FakeNode("broken_expression", "DlShadingNode", {
+            "nodeType": FakeParameter("file"),
+            "parameters.fileTextureName.value": FakeParameter("", expression=True, error=RuntimeError("eval"))}),
+        FakeNode("unnormalized", "ArnoldShadingNode", {"nodeType": FakeParameter("image"),
+                                                       "parameters.filename": FakeParameter("/show//tex/./a.tif")}),
+    ]
+    # nodes of other types, skipped by the traversal
+    nodes += [FakeNode("group{}".format(index), "Group", {}) for index in range(node_count // 10)]
+    FakeNodegraphAPI.nodes = nodes
+
+
+@pytest.fixture
+def render_engine(monkeypatch):
+    from textureMonitor.script import render_engine
+    monkeypatch.setattr(render_engine.common, "NodegraphAPI", FakeNodegraphAPI)
+    return render_engine
+
+
+@pytest.mark.parametrize("render_engine_name", sorted(LEGACY_TEXTURE_PARAMETERS))
+def test_same_textures_as_legacy_traversal(render_engine, render_engine_name):
+    build_scene(3000)
+    engine = getattr(render_engine, render_engine_name)
+
+    FakeParameter.reads = 0
+    expected = legacy_get_texture_nodes(render_engine_name)
+    legacy_reads = FakeParameter.reads
+
+    FakeParameter.reads = 0
+    texture_nodes = engine.get_re_texture_nodes()
+    assert FakeParameter.reads <= legacy_reads
+
+    assert expected
+    assert dict((node, tuple(data)) for node, data in texture_nodes.items()) == expected
+
+
+def test_by_engine_same_textures_as_legacy_traversal(render_engine):
+    build_scene(3000)
+    engines = [getattr(render_engine, name) for name in sorted(LEGACY_TEXTURE_PARAMETERS)]
+
+    nodes_by_engine = render_engine.common.get_texture_nodes_by_engine(engines)
+
+    for engine in engines:
+        expected = legacy_get_texture_nodes(engine.name)
+        assert dict((node, tuple(data)) for node, data in nodes_by_engine[engine.name].items()) == expected
+
+
+def test_no_texture(render_engine):
+    FakeNodegraphAPI.nodes = [FakeNode("node", "ArnoldShadingNode", {"nodeType": FakeParameter("surface")})]
+
+    with pytest.raises(ValueError):
+        render_engine.Arnold.get_re_texture_nodes()
@@ -0,0 +1,91 @@
+import os
+import re
+
+from textureMonitor.script import utilities
+from textureMonitor.script.directory_index import DirectoryIndex
+
+PATH_PATTERN = {'<UDIM>': "[1][0-2][0-9][0-9]"}
+
+
+def _touch(directory, *filenames):
+    for filename in filenames:
+        with open(os.path.join(directory, filename), "w"):
+            pass
+
+
+def test_has_sequence_token():
+    assert utilities.has_sequence_token("/show/smoke.####.exr")
+    assert utilities.has_sequence_token("/show/smoke.%04d.exr")
+    assert utilities.has_sequence_token("/show/smoke.<frame>.exr")
+    assert utilities.has_sequence_token("/show/smoke.$F4.exr")
+    assert not utilities.has_sequence_token("/show/color.<UDIM>.tif")
+    assert not utilities.has_sequence_token("/show/####/color.tif")
+
+
+def test_sequence_regex():
+    regex = utilities.get_sequence_regex("smoke.####.exr", path_pattern=PATH_PATTERN)
+    assert regex.match("smoke.1001.exr").group(1) == "1001"
+    assert regex.match("smoke.-0010.exr").group(1) == "-0010"
+    assert not regex.match("smoke.101.exr")
+    assert not regex.match("smoke.1001.exr.bak")
+
+    regex = utilities.get_sequence_regex("smoke.%d.exr", path_pattern=PATH_PATTERN)
+    assert regex.match("smoke.7.exr").group(1) == "7"
+
+    regex = utilities.get_sequence_regex("color.<UDIM>.<f>.tif", path_pattern=PATH_PATTERN)
+    assert regex.match("color.1002.12.tif").group(1) == "12"
+    assert not regex.match("color.2002.12.tif")
+
+    assert utilities.get_sequence_regex("color.tif", path_pattern=PATH_PATTERN) is None
+
+
+def test_glob_to_regex():
+    assert re.match("^{}$".format(utilities._glob_to_regex("tex.[0-9]?.*")), "tex.12.tif")
+    negated = re.compile("^{}$".format(utilities._glob_to_regex("tex.[!0-9].tif")))
+    assert negated.match("tex.a.tif")
+    assert not negated.match("tex.1.tif")
+
+
+def test_return_sequence_textures(tmp_path):
+    directory = str(tmp_path)
+    _touch(directory, "smoke.1001.exr", "smoke.1002.exr", "smoke.1004.exr", "other.1003.exr")
+    file_path = os.path.join(directory, "smoke.####.exr")
+
+    for directory_index in (None, DirectoryIndex()):
+        sequence = utilities.return_sequence_textures(file_path, directory_index=directory_index,
+                                                      path_pattern=PATH_PATTERN)
+        assert sequence.frames == [1001, 1002, 1004]
+        assert sequence.file_paths == [os.path.join(directory, "smoke.{}.exr".format(frame))
+                                       for frame in (1001, 1002, 1004)]
+        assert sequence.frame_range == "1001-1002, 1004"
+        assert sequence.missing_frames == [1003]
+
+    assert utilities.return_sequence_textures(os.path.join(directory, "smoke.exr"),
+                                              path_pattern=PATH_PATTERN) is False
+    missing = utilities.return_sequence_textures(os.path.join(directory, "missing", "smoke.####.exr"),
+                                                 path_pattern=PATH_PATTERN)
+    assert missing.frames == []
+
+
+def test_return_sequence_textures_case_insensitive_os(tmp_path, monkeypatch):
+    """ Behave like glob on Windows, where os.path.normcase lower the names
+    """
+    monkeypatch.setattr(utilities.os.path, "normcase", lambda path: path.lower())
+    directory = str(tmp_path)
+    _touch(directory, "Smoke.1001.EXR")
+
+    sequence = utilities.return_sequence_textures(os.path.join(directory, "smoke.####.exr"),
+                                                  path_pattern=PATH_PATTERN)
+    assert sequence.file_paths == [os.path.join(directory, "Smoke.1001.EXR")]
+
+
+def test_compress_frame_range():
+    assert utilities.compress_frame_range([]) == ""
+    assert utilities.compress_frame_range([1001]) == "1001"
+    assert utilities.compress_frame_range([1, 2, 3, 5, 7, 8]) == "1-3, 5, 7-8"
+
+
+def test_get_missing_frames():
+    assert utilities.get_missing_frames([]) == []
+    assert utilities.get_missing_frames([1001, 1002]) == []
+    assert utilities.get_missing_frames([1, 4, 6]) == [2, 3, 5]